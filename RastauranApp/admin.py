@@ -1,14 +1,14 @@
 # admin.py
-from django.contrib import admin
-from django.http import HttpResponse
-from django.utils import timezone
+from django.contrib import admin, messages
 from django.utils.html import format_html
-import csv
 
 from .models import (
     Restaurant, Menu, Dish, Customer, Address,
-    Driver, Order, OrderItem, Delivery, Payment
+    Driver, Order, OrderItem, Delivery, Payment, ExportJob
 )
+from .services.dispatch import dispatch_waiting
+from .services.exports import export_orders_response
+from .services.orders import recompute_order_totals, transition_orders
 
 
 class AddressInline(admin.TabularInline):
@@ -49,11 +49,12 @@ class RestaurantAdmin(admin.ModelAdmin):
     list_display = ("id", "name", "phone", "email", "rating", "is_active", "created_at")
     search_fields = ("name", "phone", "email")
     list_filter = ("is_active",)
-    readonly_fields = ("created_at", "updated_at")
+    # The rating is derived from comments; see services.ratings.
+    readonly_fields = ("rating", "rating_count", "created_at", "updated_at")
     fieldsets = (
         (None, {"fields": ("name", "description")}),
         ("Contacts", {"fields": ("phone", "email")}),
-        ("Meta", {"fields": ("rating", "is_active", "created_at", "updated_at")}),
+        ("Meta", {"fields": ("rating", "rating_count", "is_active", "created_at", "updated_at")}),
     )
     save_on_top = True
     list_per_page = 25
@@ -123,43 +124,32 @@ def _export_orders_as_csv(modeladmin, request, queryset):
     """
     Export selected orders to CSV. Includes basic fields + status integer.
     """
-    fieldnames = [
-        "id", "customer_id", "customer_name", "restaurant_id", "restaurant_name",
-        "total_amount", "currency", "status", "placed_at", "updated_at", "notes"
-    ]
-    ts = timezone.now().strftime("%Y%m%d_%H%M%S")
-    filename = f"orders_export_{ts}.csv"
-    response = HttpResponse(content_type="text/csv")
-    response["Content-Disposition"] = f'attachment; filename="{filename}"'
-    writer = csv.writer(response)
-    writer.writerow(fieldnames)
-    for order in queryset.select_related("customer", "restaurant"):
-        writer.writerow([
-            order.id,
-            order.customer.id,
-            f"{order.customer.first_name} {order.customer.last_name or ''}".strip(),
-            order.restaurant.id,
-            order.restaurant.name,
-            order.total_amount,
-            order.currency,
-            order.status,
-            order.placed_at.isoformat() if order.placed_at else "",
-            order.updated_at.isoformat() if order.updated_at else "",
-            order.notes or "",
-        ])
-    return response
+    return export_orders_response(queryset, "csv")
 _export_orders_as_csv.short_description = "Export selected orders as CSV"
 
 
+def _export_orders_as_ndjson(modeladmin, request, queryset):
+    return export_orders_response(queryset, "ndjson")
+_export_orders_as_ndjson.short_description = "Export selected orders as NDJSON"
+
+
+def _transition_selected(modeladmin, request, queryset, status, label):
+    moved, rejected, _ = transition_orders(queryset.values_list("id", flat=True), status)
+    modeladmin.message_user(request, f"{len(moved)} order(s) marked as {label}.")
+    if rejected:
+        modeladmin.message_user(
+            request, f"{len(rejected)} order(s) skipped: they can't move to {label} from their current status.",
+            level=messages.WARNING,
+        )
+
+
 def _mark_orders_processing(modeladmin, request, queryset):
-    updated = queryset.update(status=1, updated_at=timezone.now())
-    modeladmin.message_user(request, f"{updated} order(s) marked as Processing.")
+    _transition_selected(modeladmin, request, queryset, 1, "Processing")
 _mark_orders_processing.short_description = "Mark selected orders as Processing"
 
 
 def _mark_orders_delivered(modeladmin, request, queryset):
-    updated = queryset.update(status=2, updated_at=timezone.now())
-    modeladmin.message_user(request, f"{updated} order(s) marked as Delivered.")
+    _transition_selected(modeladmin, request, queryset, 2, "Delivered")
 _mark_orders_delivered.short_description = "Mark selected orders as Delivered"
 
 
@@ -171,11 +161,23 @@ class OrderAdmin(admin.ModelAdmin):
     raw_id_fields = ("customer", "restaurant", "delivery_address")
     readonly_fields = ("placed_at", "updated_at")
     inlines = (OrderItemInline, PaymentInline, DeliveryInline)
-    actions = (_export_orders_as_csv, _mark_orders_processing, _mark_orders_delivered)
+    actions = (_export_orders_as_csv, _export_orders_as_ndjson, _mark_orders_processing, _mark_orders_delivered)
     list_select_related = ("customer", "restaurant")
     ordering = ("-placed_at",)
     list_per_page = 25
 
+    def save_formset(self, request, form, formset, change):
+        if formset.model is OrderItem:
+            for item_form in formset.forms:
+                item = item_form.instance
+                if item.unit_price is not None and item.quantity is not None:
+                    item.total_price = item.unit_price * item.quantity
+        super().save_formset(request, form, formset, change)
+
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        recompute_order_totals([form.instance.pk])
+
     def customer_link(self, obj):
         if obj.customer_id:
             return format_html('<a href="{}">{}</a>', f"/admin/{obj._meta.app_label}/customer/{obj.customer_id}/change/", obj.customer)
@@ -198,9 +200,29 @@ class OrderItemAdmin(admin.ModelAdmin):
     list_select_related = ("order",)
     list_per_page = 50
 
+    def save_model(self, request, obj, form, change):
+        super().save_model(request, obj, form, change)
+        recompute_order_totals([obj.order_id])
+
+    def delete_model(self, request, obj):
+        super().delete_model(request, obj)
+        recompute_order_totals([obj.order_id])
+
+    def delete_queryset(self, request, queryset):
+        order_ids = set(queryset.values_list("order_id", flat=True))
+        super().delete_queryset(request, queryset)
+        recompute_order_totals(order_ids)
+
+
+def _auto_assign_deliveries(modeladmin, request, queryset):
+    assignments = dispatch_waiting(delivery_ids=list(queryset.values_list("id", flat=True)))
+    modeladmin.message_user(request, f"{len(assignments)} delivery(ies) assigned to the nearest free drivers.")
+_auto_assign_deliveries.short_description = "Auto-assign selected waiting deliveries"
+
 
 @admin.register(Delivery)
 class DeliveryAdmin(admin.ModelAdmin):
+    actions = (_auto_assign_deliveries,)
     list_display = ("id", "order", "driver", "status", "assigned_at", "picked_at", "delivered_at")
     search_fields = ("order__id", "driver__first_name", "driver__last_name")
     list_filter = ("status", "driver")
@@ -218,4 +240,17 @@ class PaymentAdmin(admin.ModelAdmin):
     raw_id_fields = ("order",)
     readonly_fields = ("created_at",)
     list_select_related = ("order",)
-    list_per_page = 50
\ No newline at end of file
+    list_per_page = 50
+
+
+@admin.register(ExportJob)
+class ExportJobAdmin(admin.ModelAdmin):
+    list_display = ("id", "kind", "file_format", "status", "exported_rows", "total_rows", "requested_by", "created_at")
+    list_filter = ("status", "kind", "file_format")
+    raw_id_fields = ("requested_by",)
+    readonly_fields = (
+        "max_id", "total_rows", "exported_rows", "last_exported_id", "chunk_count",
+        "heartbeat_at", "started_at", "finished_at", "created_at", "updated_at",
+    )
+    list_select_related = ("requested_by",)
+    list_per_page = 25
@@ -0,0 +1,116 @@
+import hashlib
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from django.utils.cache import get_conditional_response
+from django.utils.http import parse_http_date_safe
+from rest_framework.response import Response
+
+CACHE_ALIAS = getattr(settings, "CATALOG_CACHE_ALIAS", "default")
+CACHE_TIMEOUT = getattr(settings, "CATALOG_CACHE_TIMEOUT", 300)
+STATS_KEYS = {"hits": "catalog:stats:hits", "misses": "catalog:stats:misses"}
+
+
+def _cache():
+    return caches[CACHE_ALIAS]
+
+
+def _version_key(scope):
+    return f"catalog:version:{scope}"
+
+
+def scope_version(scope):
+    # Versions are opaque tokens rather than counters: if the version key is
+    # evicted we mint a new token instead of resurrecting entries written
+    # under an old one.
+    cache = _cache()
+    token = cache.get(_version_key(scope))
+    if token is None:
+        token = str(time.time_ns())
+        if not cache.add(_version_key(scope), token, None):
+            token = cache.get(_version_key(scope), token)
+    return token
+
+
+# Which writes invalidate cached payloads:
+#   - model save()/delete() of Restaurant, Menu, Dish and Comment, through the
+#     receivers in signals.py (including the rating aggregates that Comment
+#     writes move with services.ratings.apply_rating_changes);
+#   - services.ratings.rebuild_ratings, which bumps the restaurants it repairs.
+# Everything else relies on CACHE_TIMEOUT expiry: QuerySet.update() and
+# bulk_create() on those models, and the SQL backfills in migrations (0002's
+# reaction counters are not part of any cached payload; 0009 rewrites every
+# restaurant's rating). Clear the cache after deploying such a migration, and
+# call bump_scopes() from any new set-based writer of cached fields.
+def bump_scopes(*scopes):
+    # Only once the write is visible: bumping inside the transaction would let
+    # a concurrent reader cache pre-commit rows under the new version for good.
+    transaction.on_commit(
+        lambda: _cache().set_many({_version_key(scope): str(time.time_ns()) for scope in scopes}, None)
+    )
+
+
+def _count(stat):
+    cache = _cache()
+    cache.add(STATS_KEYS[stat], 0, None)
+    try:
+        cache.incr(STATS_KEYS[stat])
+    except ValueError:
+        cache.set(STATS_KEYS[stat], 1, None)
+
+
+def stats():
+    values = _cache().get_many(STATS_KEYS.values())
+    return {stat: values.get(key, 0) for stat, key in STATS_KEYS.items()}
+
+
+def normalized_query(request):
+    params = sorted((key, value) for key, values in request.query_params.lists() for value in values)
+    return "&".join(f"{key}={value}" for key, value in params)
+
+
+class CachedResponseMixin:
+    """
+    Caches the serialized ``GET`` payload of read-mostly catalog views. Keys
+    combine the view, path, normalized query string, media type and the
+    current version of every scope in ``get_cache_scopes()``; signals bump
+    those versions on writes. Goes before ``ConditionalGetMixin``: the
+    ETag/Last-Modified of the cached response are stored with it, so a hit
+    answers ``304 Not Modified`` without recomputing them.
+    """
+
+    cache_scopes = ()
+
+    def get_cache_scopes(self):
+        return [scope.format(**self.kwargs) for scope in self.cache_scopes]
+
+    def get_cache_key(self, request):
+        versions = ":".join(f"{scope}={scope_version(scope)}" for scope in self.get_cache_scopes())
+        raw = f"{request.get_host()}{request.path}?{normalized_query(request)}|{request.accepted_media_type}|{versions}"
+        return f"catalog:response:{type(self).__name__}:{hashlib.sha1(raw.encode()).hexdigest()}"
+
+    def get(self, request, *args, **kwargs):
+        key = self.get_cache_key(request)
+        cached = _cache().get(key)
+        if cached is not None:
+            _count("hits")
+            data, validators = cached
+            response = get_conditional_response(
+                request._request, etag=validators.get("ETag"),
+                last_modified=parse_http_date_safe(validators.get("Last-Modified")),
+            )
+            if response is None:
+                response = Response(data)
+            for header, value in {**validators, "X-Cache": "HIT"}.items():
+                response[header] = value
+            return response
+
+        _count("misses")
+        response = super().get(request, *args, **kwargs)
+        if response.status_code == 200:
+            validators = {header: response[header] for header in ("ETag", "Last-Modified") if header in response}
+            _cache().set(key, (response.data, validators), CACHE_TIMEOUT)
+        response["X-Cache"] = "MISS"
+        return response
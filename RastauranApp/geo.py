@@ -0,0 +1,67 @@
+import math
+from decimal import Decimal
+
+from django.db import models
+from django.db.models import F, FloatField, Q, Value
+from django.db.models.functions import ASin, Cast, Cos, Floor, Least, Power, Radians, Sin, Sqrt
+
+# The globe is cut into CELL_DEGREES x CELL_DEGREES cells (about 1.1 km north
+# to south) numbered row by row; ``location_cell`` columns store that number so
+# a radius search becomes a handful of index range scans.
+CELL_DEGREES = Decimal("0.01")
+GRID_COLUMNS = int(360 / CELL_DEGREES)
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+
+def grid_cell_expression(latitude, longitude):
+    """The database side of :func:`grid_cell`, used by generated columns."""
+    row = Floor((F(latitude) + 90) / CELL_DEGREES)
+    column = Floor((F(longitude) + 180) / CELL_DEGREES)
+    return Cast(row * GRID_COLUMNS + column, models.BigIntegerField())
+
+
+def _cell_coordinates(latitude, longitude):
+    row = math.floor((Decimal(str(latitude)) + 90) / CELL_DEGREES)
+    column = math.floor((Decimal(str(longitude)) + 180) / CELL_DEGREES)
+    return row, column
+
+
+def grid_cell(latitude, longitude):
+    row, column = _cell_coordinates(latitude, longitude)
+    return row * GRID_COLUMNS + column
+
+
+def cell_ranges(latitude, longitude, radius_km):
+    """
+    ``(first, last)`` cell numbers, one pair per grid row, covering every point
+    within ``radius_km``. Cells narrow towards the poles, so the column span is
+    sized for the latitude in the square farthest from the equator. Searches
+    do not wrap around the antimeridian.
+    """
+    row, column = _cell_coordinates(latitude, longitude)
+    cell = float(CELL_DEGREES)
+    rows = math.ceil(radius_km / KM_PER_DEGREE / cell)
+    widest = min(abs(latitude) + radius_km / KM_PER_DEGREE, 89.9)
+    columns = math.ceil(radius_km / (KM_PER_DEGREE * math.cos(math.radians(widest))) / cell)
+    first, last = max(column - columns, 0), min(column + columns, GRID_COLUMNS - 1)
+    return [(r * GRID_COLUMNS + first, r * GRID_COLUMNS + last) for r in range(row - rows, row + rows + 1)]
+
+
+def within_cells(field, latitude, longitude, radius_km):
+    query = Q()
+    for first, last in cell_ranges(latitude, longitude, radius_km):
+        query |= Q(**{f"{field}__range": (first, last)})
+    return query
+
+
+def haversine_km(latitude, longitude, lat, lng):
+    """Great-circle distance in km from the row's coordinates to ``(lat, lng)``."""
+    row_lat = Radians(Cast(latitude, FloatField()))
+    row_lng = Radians(Cast(longitude, FloatField()))
+    lat, lng = math.radians(lat), math.radians(lng)
+    a = (
+        Power(Sin((row_lat - Value(lat)) / 2), 2)
+        + Value(math.cos(lat)) * Cos(row_lat) * Power(Sin((row_lng - Value(lng)) / 2), 2)
+    )
+    return Value(2 * EARTH_RADIUS_KM) * ASin(Least(Sqrt(a), Value(1.0)))
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from RastauranApp.services.dispatch import dispatch_waiting
+
+
+class Command(BaseCommand):
+    help = "Assign waiting deliveries to the nearest available drivers in batches."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Run a single dispatch round and exit.")
+        parser.add_argument("--interval", type=float, default=10.0, help="Seconds between dispatch rounds.")
+        parser.add_argument("--batch-size", type=int, default=None, help="Deliveries per round (defaults to DISPATCH_BATCH_SIZE).")
+        parser.add_argument("--matching", choices=("greedy", "hungarian"), default=None)
+
+    def handle(self, *args, **options):
+        while True:
+            started = time.monotonic()
+            assignments = dispatch_waiting(batch_size=options["batch_size"], matching=options["matching"])
+            if assignments:
+                mean_km = sum(distance for _, _, distance in assignments) / len(assignments)
+                self.stdout.write(f"Assigned {len(assignments)} delivery(ies), mean pickup distance {mean_km:.2f} km.")
+            if options["once"]:
+                return
+            time.sleep(max(options["interval"] - (time.monotonic() - started), 0))
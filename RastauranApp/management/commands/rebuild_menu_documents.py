@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from RastauranApp.models import Restaurant
+from RastauranApp.services.menus import rebuild_menu_documents
+
+
+class Command(BaseCommand):
+    help = "Rebuild the stored full-menu documents served by restaurants/<id>/menu/."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--restaurant", type=int, action="append", help="Only this restaurant id (repeatable).")
+
+    def handle(self, *args, **options):
+        ids = options["restaurant"] or Restaurant.objects.values_list("id", flat=True)
+        built = rebuild_menu_documents(ids)
+        self.stdout.write(self.style.SUCCESS(f"Rebuilt {built} menu document(s)."))
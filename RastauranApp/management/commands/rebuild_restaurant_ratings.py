@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Max
+
+from RastauranApp.models import Restaurant
+from RastauranApp.services.ratings import rebuild_ratings
+
+
+class Command(BaseCommand):
+    help = "Recompute Restaurant.rating_sum/rating_count/rating from active comments and repair drifted rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=1000, help="Restaurant ids scanned per statement.")
+        parser.add_argument("--dry-run", action="store_true", help="Report drifted restaurants without fixing them.")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        dry_run = options["dry_run"]
+        max_id = Restaurant.objects.aggregate(max_id=Max("id"))["max_id"] or 0
+
+        repaired = 0
+        for low in range(0, max_id, batch_size):
+            with transaction.atomic():
+                repaired += rebuild_ratings(low, low + batch_size, dry_run=dry_run)
+
+        verb = "Found" if dry_run else "Repaired"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {repaired} restaurant(s) with drifted ratings."))
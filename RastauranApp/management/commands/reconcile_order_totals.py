@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from RastauranApp.services.orders import find_total_mismatches, recompute_order_totals
+
+
+class Command(BaseCommand):
+    help = "Report orders whose totals disagree with their items and optionally repair them in SQL."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--fix", action="store_true", help="Rewrite drifted item and order totals.")
+        parser.add_argument("--show", type=int, default=20, help="How many mismatching orders to list.")
+
+    def handle(self, *args, **options):
+        mismatches, order_mismatches, item_mismatches = find_total_mismatches(limit=options["show"])
+        for order_id, stored, computed in mismatches:
+            self.stdout.write(f"order {order_id}: stored {stored}, items sum to {computed}")
+
+        if not options["fix"]:
+            self.stdout.write(f"{item_mismatches} item total(s) and {order_mismatches} order total(s) drifted.")
+            return
+
+        with transaction.atomic():
+            items_fixed, orders_fixed = recompute_order_totals()
+        self.stdout.write(self.style.SUCCESS(f"Repaired {items_fixed} item total(s) and {orders_fixed} order total(s)."))
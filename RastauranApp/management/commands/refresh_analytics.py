@@ -0,0 +1,27 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from RastauranApp.services.analytics import refresh_daily_stats
+
+
+class Command(BaseCommand):
+    help = "Refresh the daily restaurant and dish rollups for days touched since the last run."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Run a single refresh and exit.")
+        parser.add_argument("--interval", type=float, default=300.0, help="Seconds between refreshes.")
+        parser.add_argument("--full", action="store_true", help="Rebuild every day from scratch, then exit.")
+
+    def handle(self, *args, **options):
+        if options["full"]:
+            self.stdout.write(self.style.SUCCESS(f"Rebuilt {refresh_daily_stats(full=True)} restaurant-day(s)."))
+            return
+        while True:
+            started = time.monotonic()
+            refreshed = refresh_daily_stats()
+            if refreshed:
+                self.stdout.write(f"Refreshed {refreshed} restaurant-day(s).")
+            if options["once"]:
+                return
+            time.sleep(max(options["interval"] - (time.monotonic() - started), 0))
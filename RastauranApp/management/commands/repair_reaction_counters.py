@@ -0,0 +1,52 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count, F, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+from RastauranApp.models import Comment, Reaction
+
+
+def _reaction_count(is_like):
+    return Coalesce(
+        Subquery(
+            Reaction.objects.filter(comment=OuterRef("pk"), is_like=is_like)
+            .order_by()
+            .values("comment")
+            .annotate(total=Count("id"))
+            .values("total")
+        ),
+        0,
+    )
+
+
+class Command(BaseCommand):
+    help = "Recompute Comment.likes_count/dislikes_count from reactions and repair drifted rows."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=10000, help="Comment ids scanned per statement.")
+        parser.add_argument("--dry-run", action="store_true", help="Report drifted comments without fixing them.")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        dry_run = options["dry_run"]
+        max_id = Comment.objects.aggregate(max_id=Max("id"))["max_id"] or 0
+
+        drifted = (
+            Comment.objects.annotate(actual_likes=_reaction_count(True), actual_dislikes=_reaction_count(False))
+            .exclude(likes_count=F("actual_likes"), dislikes_count=F("actual_dislikes"))
+            .order_by()
+        )
+
+        repaired = 0
+        for low in range(0, max_id, batch_size):
+            with transaction.atomic():
+                ids = list(drifted.filter(id__gt=low, id__lte=low + batch_size).values_list("id", flat=True))
+                if ids and not dry_run:
+                    Comment.objects.filter(id__in=ids).update(
+                        likes_count=_reaction_count(True),
+                        dislikes_count=_reaction_count(False),
+                    )
+            repaired += len(ids)
+
+        verb = "Found" if dry_run else "Repaired"
+        self.stdout.write(self.style.SUCCESS(f"{verb} {repaired} comment(s) with drifted reaction counters."))
@@ -0,0 +1,31 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from RastauranApp.models import ExportJob
+from RastauranApp.services.export_jobs import claim_next_job, run_job
+
+
+class Command(BaseCommand):
+    help = "Process queued export jobs, writing each one as gzip chunks under EXPORT_ROOT."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--once", action="store_true", help="Exit once the queue is empty instead of polling.")
+        parser.add_argument("--poll-interval", type=float, default=5.0, help="Seconds to sleep when the queue is empty.")
+        parser.add_argument("--chunk-rows", type=int, default=None, help="Rows per chunk file (defaults to EXPORT_CHUNK_ROWS).")
+
+    def handle(self, *args, **options):
+        while True:
+            job = claim_next_job()
+            if job is None:
+                if options["once"]:
+                    return
+                time.sleep(options["poll_interval"])
+                continue
+
+            run_job(job, options["chunk_rows"])
+            message = f"Export {job.pk} {job.get_status_display().lower()}: {job.exported_rows} row(s) in {job.chunk_count} chunk(s)"
+            if job.status == ExportJob.FAILED:
+                self.stderr.write(f"{message} ({job.error})")
+            else:
+                self.stdout.write(self.style.SUCCESS(message))
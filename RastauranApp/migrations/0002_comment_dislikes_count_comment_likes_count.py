@@ -0,0 +1,31 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('RastauranApp', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='comment',
+            name='dislikes_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='comment',
+            name='likes_count',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunSQL(
+            sql="""
+                UPDATE comments SET
+                    likes_count = (SELECT COUNT(*) FROM reactions WHERE reactions.comment_id = comments.id AND reactions.is_like),
+                    dislikes_count = (SELECT COUNT(*) FROM reactions WHERE reactions.comment_id = comments.id AND NOT reactions.is_like)
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,92 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:14
+
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    # Build indexes without locking the hot tables against writes.
+    atomic = False
+
+    dependencies = [
+        ('RastauranApp', '0002_comment_dislikes_count_comment_likes_count'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='address',
+            index=models.Index(fields=['-created_at', 'id'], name='addresses_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='comment',
+            index=models.Index(fields=['restaurant', '-created_at', 'id'], name='comments_rest_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='customer',
+            index=models.Index(fields=['-created_at', 'id'], name='customers_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='delivery',
+            index=models.Index(fields=['-created_at', 'id'], name='deliveries_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='delivery',
+            index=models.Index(fields=['status'], name='deliveries_status_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='delivery',
+            index=models.Index(condition=models.Q(('status', 0)), fields=['created_at'], name='deliveries_waiting_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='dish',
+            index=models.Index(fields=['-created_at', 'id'], name='dishes_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='driver',
+            index=models.Index(fields=['-created_at', 'id'], name='drivers_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='menu',
+            index=models.Index(fields=['-created_at', 'id'], name='menus_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='order',
+            index=models.Index(fields=['-placed_at', 'id'], name='orders_placed_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='order',
+            index=models.Index(fields=['restaurant', 'status', '-placed_at'], name='orders_rest_status_placed_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='order',
+            index=models.Index(condition=models.Q(('status', 0)), fields=['placed_at'], name='orders_pending_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='orderitem',
+            index=models.Index(fields=['-created_at', 'id'], name='order_items_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='payment',
+            index=models.Index(fields=['-created_at', 'id'], name='payments_created_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='payment',
+            index=models.Index(fields=['status', 'provider'], name='payments_status_provider_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='restaurant',
+            index=models.Index(fields=['name', 'id'], name='restaurants_name_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='restaurant',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['name', 'id'], name='restaurants_active_name_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='restaurant',
+            index=models.Index(fields=['-rating', 'id'], name='restaurants_rating_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='restaurant',
+            index=models.Index(fields=['-created_at', 'id'], name='restaurants_created_idx'),
+        ),
+    ]
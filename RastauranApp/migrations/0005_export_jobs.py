@@ -0,0 +1,42 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:28
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('RastauranApp', '0004_search_vectors'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ExportJob',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('kind', models.CharField(choices=[('orders', 'Orders'), ('order_items', 'Order items'), ('payments', 'Payments')], max_length=20)),
+                ('file_format', models.CharField(choices=[('csv', 'CSV'), ('ndjson', 'NDJSON')], default='csv', max_length=10)),
+                ('filters', models.JSONField(blank=True, default=dict)),
+                ('status', models.IntegerField(choices=[(0, 'Queued'), (1, 'Running'), (2, 'Completed'), (3, 'Failed')], default=0)),
+                ('max_id', models.BigIntegerField(blank=True, null=True)),
+                ('total_rows', models.IntegerField(blank=True, null=True)),
+                ('exported_rows', models.IntegerField(default=0)),
+                ('last_exported_id', models.BigIntegerField(default=0)),
+                ('chunk_count', models.IntegerField(default=0)),
+                ('error', models.TextField(blank=True, null=True)),
+                ('heartbeat_at', models.DateTimeField(blank=True, null=True)),
+                ('started_at', models.DateTimeField(blank=True, null=True)),
+                ('finished_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('requested_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='export_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'db_table': 'export_jobs',
+                'indexes': [models.Index(fields=['-created_at', 'id'], name='export_jobs_created_idx'), models.Index(condition=models.Q(('status__in', [0, 1])), fields=['created_at'], name='export_jobs_open_idx')],
+            },
+        ),
+    ]
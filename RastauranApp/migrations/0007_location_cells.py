@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:34
+
+import django.db.models.expressions
+import django.db.models.functions.comparison
+import django.db.models.functions.math
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('RastauranApp', '0006_driver_location_updated_at'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='address',
+            name='location_cell',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.comparison.Cast(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.functions.math.Floor(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('latitude'), '+', models.Value(90)), '/', models.Value(Decimal('0.01')))), '*', models.Value(36000)), '+', django.db.models.functions.math.Floor(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('longitude'), '+', models.Value(180)), '/', models.Value(Decimal('0.01'))))), models.BigIntegerField()), output_field=models.BigIntegerField(null=True)),
+        ),
+        migrations.AddField(
+            model_name='driver',
+            name='location_cell',
+            field=models.GeneratedField(db_persist=True, expression=django.db.models.functions.comparison.Cast(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(django.db.models.functions.math.Floor(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('current_location_latitude'), '+', models.Value(90)), '/', models.Value(Decimal('0.01')))), '*', models.Value(36000)), '+', django.db.models.functions.math.Floor(django.db.models.expressions.CombinedExpression(django.db.models.expressions.CombinedExpression(models.F('current_location_longitude'), '+', models.Value(180)), '/', models.Value(Decimal('0.01'))))), models.BigIntegerField()), output_field=models.BigIntegerField(null=True)),
+        ),
+        migrations.AddIndex(
+            model_name='address',
+            index=models.Index(fields=['location_cell'], name='addresses_cell_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='driver',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['location_cell'], name='drivers_active_cell_idx'),
+        ),
+    ]
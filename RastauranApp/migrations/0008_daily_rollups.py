@@ -0,0 +1,77 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('RastauranApp', '0007_location_cells'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AnalyticsWatermark',
+            fields=[
+                ('name', models.CharField(max_length=50, primary_key=True, serialize=False)),
+                ('refreshed_through', models.DateTimeField(blank=True, null=True)),
+            ],
+            options={
+                'db_table': 'analytics_watermarks',
+            },
+        ),
+        migrations.CreateModel(
+            name='DishDailyStats',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('day', models.DateField()),
+                ('orders_count', models.IntegerField(default=0)),
+                ('quantity', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+            options={
+                'db_table': 'dish_daily_stats',
+            },
+        ),
+        migrations.CreateModel(
+            name='RestaurantDailyStats',
+            fields=[
+                ('id', models.BigAutoField(primary_key=True, serialize=False)),
+                ('day', models.DateField()),
+                ('orders_count', models.IntegerField(default=0)),
+                ('items_count', models.IntegerField(default=0)),
+                ('revenue', models.DecimalField(decimal_places=2, default=0, max_digits=14)),
+            ],
+            options={
+                'db_table': 'restaurant_daily_stats',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='order',
+            index=models.Index(fields=['updated_at'], name='orders_updated_idx'),
+        ),
+        migrations.AddField(
+            model_name='dishdailystats',
+            name='dish',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='RastauranApp.dish'),
+        ),
+        migrations.AddField(
+            model_name='dishdailystats',
+            name='restaurant',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='dish_daily_stats', to='RastauranApp.restaurant'),
+        ),
+        migrations.AddField(
+            model_name='restaurantdailystats',
+            name='restaurant',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='daily_stats', to='RastauranApp.restaurant'),
+        ),
+        migrations.AddConstraint(
+            model_name='dishdailystats',
+            constraint=models.UniqueConstraint(fields=('restaurant', 'day', 'dish'), name='dish_daily_stats_uniq'),
+        ),
+        migrations.AddConstraint(
+            model_name='restaurantdailystats',
+            constraint=models.UniqueConstraint(fields=('restaurant', 'day'), name='restaurant_daily_stats_uniq'),
+        ),
+    ]
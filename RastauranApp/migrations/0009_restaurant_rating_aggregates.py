@@ -0,0 +1,37 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('RastauranApp', '0008_daily_rollups'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='restaurant',
+            name='rating_count',
+            field=models.IntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='restaurant',
+            name='rating_sum',
+            field=models.BigIntegerField(default=0),
+        ),
+        migrations.RunSQL(
+            sql="""
+                UPDATE restaurants SET rating_sum = a.total, rating_count = a.n,
+                    rating = CASE WHEN a.n > 0 THEN ROUND(a.total::numeric / a.n, 2) END
+                FROM (
+                    SELECT r.id, COALESCE(SUM(c.rating), 0) AS total, COUNT(c.rating) AS n
+                    FROM restaurants AS r
+                    LEFT JOIN comments AS c ON c.restaurant_id = r.id AND c.is_active
+                    GROUP BY r.id
+                ) AS a
+                WHERE restaurants.id = a.id
+            """,
+            reverse_sql=migrations.RunSQL.noop,
+        ),
+    ]
@@ -0,0 +1,25 @@
+# Generated by Django 5.2.18 on 2026-10-18 13:58
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('RastauranApp', '0009_restaurant_rating_aggregates'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='MenuDocument',
+            fields=[
+                ('restaurant', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='menu_document', serialize=False, to='RastauranApp.restaurant')),
+                ('document', models.JSONField()),
+                ('built_at', models.DateTimeField()),
+            ],
+            options={
+                'db_table': 'menu_documents',
+            },
+        ),
+    ]
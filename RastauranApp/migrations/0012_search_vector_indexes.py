@@ -0,0 +1,31 @@
+import django.contrib.postgres.indexes
+from django.contrib.postgres.operations import AddIndexConcurrently
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+    # Build the search indexes without locking the tables against writes.
+    atomic = False
+
+    dependencies = [
+        ('RastauranApp', '0011_counters_not_editable'),
+    ]
+
+    operations = [
+        AddIndexConcurrently(
+            model_name='dish',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='dishes_search_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='dish',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='dishes_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+        AddIndexConcurrently(
+            model_name='restaurant',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['search_vector'], name='restaurants_search_idx'),
+        ),
+        AddIndexConcurrently(
+            model_name='restaurant',
+            index=django.contrib.postgres.indexes.GinIndex(fields=['name'], name='restaurants_name_trgm_idx', opclasses=['gin_trgm_ops']),
+        ),
+    ]
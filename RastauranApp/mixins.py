@@ -0,0 +1,316 @@
+import hashlib
+from functools import lru_cache
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Count, Max
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+from rest_framework import serializers
+from rest_framework.exceptions import ValidationError
+from rest_framework.response import Response
+
+
+def _model_field(model, source):
+    try:
+        return model._meta.get_field(source)
+    except FieldDoesNotExist:
+        return None
+
+
+def _plan(serializer, model, prefix="", names=None):
+    """
+    Walk the serializer fields and collect the forward relations to join and the
+    columns to load. ``only`` is None when some field may read columns we can't
+    see (method fields, dotted sources), in which case every column is loaded.
+    """
+    related, only = [], []
+    for name, field in serializer.fields.items():
+        if field.write_only or (names is not None and name not in names):
+            continue
+        if isinstance(field, serializers.SerializerMethodField) or field.source == "*" or "." in field.source:
+            only = None
+            continue
+        model_field = _model_field(model, field.source)
+        if model_field is None:
+            # Annotations such as ``comments_count`` are not columns.
+            continue
+        path = prefix + field.source
+        if isinstance(field, serializers.BaseSerializer):
+            if isinstance(field, serializers.ListSerializer) or not (model_field.many_to_one or model_field.one_to_one) or not model_field.concrete:
+                only = None
+                continue
+            nested_related, nested_only = _plan(field, model_field.related_model, path + "__")
+            related.append(path)
+            related.extend(nested_related)
+            if only is not None and nested_only is not None:
+                only.append(path)
+                only.extend(nested_only)
+            else:
+                only = None
+        elif model_field.concrete and only is not None:
+            only.append(path)
+    return related, only
+
+
+@lru_cache(maxsize=None)
+def serializer_field_names(serializer_class):
+    return frozenset(serializer_class().fields)
+
+
+@lru_cache(maxsize=None)
+def plan_for(serializer_class, names=None):
+    serializer = serializer_class()
+    related, only = _plan(serializer, serializer.Meta.model, names=names)
+    return tuple(related), (tuple(only) if only is not None else None)
+
+
+def plan_queryset(queryset, serializer_class, names=None, extra_columns=()):
+    related, only = plan_for(serializer_class, names)
+    if related:
+        queryset = queryset.select_related(*related)
+    if only is not None:
+        queryset = queryset.only(*only, *extra_columns)
+    return queryset
+
+
+class QueryPlanMixin:
+    """
+    Applies the ``select_related``/``only`` plan derived from the view's
+    serializer so nested ``CustomDepth*`` fields don't cost a query per row.
+    """
+
+    def get_plan_fields(self):
+        return None
+
+    def get_plan_extra_columns(self):
+        return ()
+
+    def get_queryset(self):
+        return plan_queryset(
+            super().get_queryset(),
+            self.get_serializer_class(),
+            self.get_plan_fields(),
+            self.get_plan_extra_columns(),
+        )
+
+
+class SparseFieldsMixin(QueryPlanMixin):
+    """
+    Sparse fieldsets for list views: ``?fields=id,name,rating`` trims both the
+    serialized output and the SELECT list.
+    """
+
+    fields_query_param = "fields"
+
+    def get_plan_fields(self):
+        raw = self.request.query_params.get(self.fields_query_param, "")
+        requested = frozenset(name.strip() for name in raw.split(",") if name.strip())
+        if not requested:
+            return None
+        unknown = requested - serializer_field_names(self.get_serializer_class())
+        if unknown:
+            raise ValidationError({self.fields_query_param: [f"Unknown field(s): {', '.join(sorted(unknown))}."]})
+        return requested
+
+    def get_plan_extra_columns(self):
+        # Ordering columns are read back from the page to build cursors, so they
+        # have to be loaded even when the client did not ask for them.
+        ordering = list(getattr(self.pagination_class, "ordering", ()))
+        ordering_fields = getattr(self, "ordering_fields", None)
+        if isinstance(ordering_fields, (list, tuple)):
+            ordering.extend(ordering_fields)
+        return tuple(field.lstrip("-") for field in ordering)
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        requested = self.get_plan_fields()
+        if requested:
+            child = getattr(serializer, "child", serializer)
+            for name in set(child.fields) - requested:
+                child.fields.pop(name)
+        return serializer
+
+
+# Fields whose to_representation() returns database values unchanged.
+_PASSTHROUGH_FIELDS = (
+    serializers.IntegerField, serializers.CharField, serializers.BooleanField, serializers.ChoiceField,
+    serializers.JSONField, serializers.PrimaryKeyRelatedField, serializers.ReadOnlyField,
+)
+
+
+def _values_fields(serializer, model, columns, prefix="", names=None):
+    """
+    Compile the serializer's fields into ``(name, column, convert, nested)``
+    entries over a flat ``values_list`` row, registering each column path in
+    ``columns``. Returns None when a field can't be read from plain columns.
+    """
+    fields = []
+    for name, field in serializer.fields.items():
+        if field.write_only or (names is not None and name not in names):
+            continue
+        if isinstance(field, serializers.SerializerMethodField) or field.source == "*" or "." in field.source:
+            return None
+        model_field = _model_field(model, field.source)
+        if model_field is None or not model_field.concrete or isinstance(field, (serializers.ListSerializer, serializers.ManyRelatedField)):
+            return None
+        path = prefix + field.source
+        nested = None
+        if isinstance(field, serializers.BaseSerializer):
+            if not (model_field.many_to_one or model_field.one_to_one):
+                return None
+            nested = _values_fields(field, model_field.related_model, columns, path + "__")
+            if nested is None:
+                return None
+            # A NULL foreign key renders the nested serializer as None.
+            path = prefix + model_field.attname
+        elif model_field.is_relation:
+            path = prefix + model_field.attname
+        columns.setdefault(path, len(columns))
+        convert = None if nested is not None or isinstance(field, _PASSTHROUGH_FIELDS) else field.to_representation
+        fields.append((name, columns[path], convert, nested))
+    return fields
+
+
+def _render_row(fields, row):
+    data = {}
+    for name, column, convert, nested in fields:
+        value = row[column]
+        if value is None:
+            data[name] = None
+        elif nested is not None:
+            data[name] = _render_row(nested, row)
+        elif convert is None:
+            data[name] = value
+        else:
+            data[name] = convert(value)
+    return data
+
+
+class ValuesPlan:
+    """
+    A serializer's read path compiled against ``values_list()`` rows: the
+    same keys, nesting and field formatting, without model instances or
+    per-row serializer machinery.
+    """
+
+    def __init__(self, columns, fields):
+        self.columns = tuple(columns)
+        self.fields = fields
+
+    def rows(self, queryset, extra_columns=()):
+        extra = [column for column in dict.fromkeys(extra_columns) if column not in self.columns]
+        return queryset.values_list(*self.columns, *extra, named=True)
+
+    def render(self, rows):
+        fields = self.fields
+        return [_render_row(fields, row) for row in rows]
+
+
+@lru_cache(maxsize=None)
+def values_plan_for(serializer_class, names=None):
+    serializer = serializer_class()
+    columns = {}
+    fields = _values_fields(serializer, serializer.Meta.model, columns, names=names)
+    return ValuesPlan(columns, fields) if fields is not None else None
+
+
+class ValuesListMixin(SparseFieldsMixin):
+    """
+    Read-only fast path for high-volume list views: rows are fetched with
+    ``values_list()`` and rendered by the :class:`ValuesPlan` compiled from the
+    view's serializer, so the output matches the serializer's byte for byte.
+    Serializers with fields that need model instances use the normal path.
+    """
+
+    def list(self, request, *args, **kwargs):
+        plan = values_plan_for(self.get_serializer_class(), self.get_plan_fields())
+        if plan is None:
+            return super().list(request, *args, **kwargs)
+        queryset = self.filter_queryset(self.get_queryset())
+        # Cursor pagination reads its ordering columns back from the rows,
+        # including annotations such as the search rank.
+        rows = plan.rows(queryset, (*self.get_plan_extra_columns(), *queryset.query.annotations))
+        page = self.paginate_queryset(rows)
+        if page is not None:
+            return self.get_paginated_response(plan.render(page))
+        return Response(plan.render(rows))
+
+
+@lru_cache(maxsize=None)
+def nested_validator_lookups(serializer_class, validator_field):
+    """
+    ``relation__<validator_field>`` lookups for the nested model serializers
+    the payload embeds (the restaurant name in a dish, ...), so the
+    validators move when an embedded row changes.
+    """
+    def walk(serializer, prefix):
+        lookups = []
+        for field in serializer.fields.values():
+            if not isinstance(field, serializers.ModelSerializer) or field.source == "*" or "." in field.source:
+                continue
+            lookup = f"{prefix}{field.source}"
+            if _model_field(field.Meta.model, validator_field) is not None:
+                lookups.append(f"{lookup}__{validator_field}")
+            lookups.extend(walk(field, f"{lookup}__"))
+        return lookups
+
+    return tuple(walk(serializer_class(), ""))
+
+
+class ConditionalGetMixin:
+    """
+    ETag/Last-Modified validators from ``updated_at``. Detail views read the
+    row's timestamp, list views the ``MAX(updated_at)`` and row count of the
+    filtered queryset, both together with the timestamps of the nested rows
+    the serializer embeds; either way one small query decides whether to
+    answer ``304 Not Modified`` before anything is serialized.
+    """
+
+    validator_field = "updated_at"
+    # Timestamps of embedded rows the nested serializer walk can't see, such
+    # as relations rendered by a SerializerMethodField.
+    validator_related_lookups = ()
+    # Annotations rendered by the detail view that don't move updated_at.
+    validator_extra_fields = ()
+
+    def get_validator_state(self):
+        queryset = self.filter_queryset(self.get_queryset()).order_by()
+        nested = (*nested_validator_lookups(self.get_serializer_class(), self.validator_field), *self.validator_related_lookups)
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        if lookup_url_kwarg in self.kwargs:
+            row = (
+                queryset.filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+                .values_list(self.validator_field, *nested, *self.validator_extra_fields)
+                .first()
+            )
+            if row is None:
+                return None
+            timestamps, extra = row[:len(nested) + 1], row[len(nested) + 1:]
+        else:
+            lookups = (self.validator_field, *nested)
+            state = queryset.aggregate(count=Count("pk"), **{f"max_{i}": Max(lookup) for i, lookup in enumerate(lookups)})
+            timestamps, extra = [state[f"max_{i}"] for i in range(len(lookups))], [state["count"]]
+        present = [timestamp for timestamp in timestamps if timestamp is not None]
+        fingerprint = ",".join(str(value) for value in (*timestamps[1:], *extra))
+        return (max(present) if present else None), fingerprint
+
+    def get(self, request, *args, **kwargs):
+        state = self.get_validator_state()
+        if state is None:
+            return super().get(request, *args, **kwargs)
+
+        last_modified, fingerprint = state
+        raw = "|".join([
+            request.get_full_path(), request.accepted_media_type or "",
+            last_modified.isoformat() if last_modified else "", fingerprint,
+        ])
+        etag = quote_etag(hashlib.sha1(raw.encode()).hexdigest())
+        timestamp = int(last_modified.timestamp()) if last_modified else None
+
+        response = get_conditional_response(request._request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = super().get(request, *args, **kwargs)
+        response["ETag"] = etag
+        if timestamp is not None:
+            response["Last-Modified"] = http_date(timestamp)
+        return response
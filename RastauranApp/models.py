@@ -1,23 +1,71 @@
-from django.db import models
+from django.conf import settings
+from django.contrib.postgres.indexes import GinIndex
+from django.contrib.postgres.search import SearchVector, SearchVectorField
+from django.db import models, transaction
+from django.db.models import Q
 from django.core.validators import MinValueValidator, MaxValueValidator
 
+from .geo import grid_cell_expression
+
+
+def _without_counters(instance, kwargs):
+    """
+    ``save()`` kwargs that leave ``instance.counter_fields`` alone on updates.
+    Those columns move with relative UPDATEs elsewhere, so writing back the
+    values loaded with a stale instance would undo concurrent increments.
+    """
+    if instance._state.adding or kwargs.get("update_fields") is not None or kwargs.get("force_insert"):
+        return kwargs
+    update_fields = [
+        field.name for field in instance._meta.concrete_fields
+        if not field.primary_key and not field.generated and field.name not in instance.counter_fields
+    ]
+    return {**kwargs, "update_fields": update_fields}
+
 class Restaurant(models.Model):
     id = models.BigAutoField(primary_key=True)
     name = models.TextField()
     phone = models.TextField(null=True, blank=True)
     email = models.TextField(null=True, blank=True)
     description = models.TextField(null=True, blank=True)
-    rating = models.DecimalField(max_digits=3, decimal_places=2, null=True, blank=True)
+    # Average of active comment ratings, kept in step with rating_sum and
+    # rating_count by Comment.save()/delete (see services.ratings).
+    rating = models.DecimalField(max_digits=3, decimal_places=2, null=True, blank=True, editable=False)
+    rating_sum = models.BigIntegerField(default=0, editable=False)
+    rating_count = models.IntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector("name", weight="A", config="english")
+            + SearchVector("description", weight="B", config="english")
+            + SearchVector("email", weight="C", config="simple")
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     class Meta:
         db_table = "restaurants"
+        indexes = [
+            GinIndex(fields=["search_vector"], name="restaurants_search_idx"),
+            GinIndex(fields=["name"], name="restaurants_name_trgm_idx", opclasses=["gin_trgm_ops"]),
+            models.Index(fields=["name", "id"], name="restaurants_name_idx"),
+            models.Index(fields=["name", "id"], name="restaurants_active_name_idx", condition=Q(is_active=True)),
+            models.Index(fields=["-rating", "id"], name="restaurants_rating_idx"),
+            models.Index(fields=["-created_at", "id"], name="restaurants_created_idx"),
+        ]
+
+    # Moved by services.ratings with relative UPDATEs.
+    counter_fields = ("rating", "rating_sum", "rating_count")
 
     def __str__(self):
         return self.name
 
+    def save(self, *args, **kwargs):
+        super().save(*args, **_without_counters(self, kwargs))
+
 class Menu(models.Model):
     id = models.BigAutoField(primary_key=True)
     restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, related_name="menus")
@@ -28,6 +76,9 @@ class Menu(models.Model):
 
     class Meta:
         db_table = "menus"
+        indexes = [
+            models.Index(fields=["-created_at", "id"], name="menus_created_idx"),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.restaurant.name})"
@@ -44,9 +95,22 @@ class Dish(models.Model):
     prep_time_minutes = models.IntegerField(null=True, blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    search_vector = models.GeneratedField(
+        expression=(
+            SearchVector("name", weight="A", config="english")
+            + SearchVector("description", weight="B", config="english")
+        ),
+        output_field=SearchVectorField(),
+        db_persist=True,
+    )
 
     class Meta:
         db_table = "dishes"
+        indexes = [
+            GinIndex(fields=["search_vector"], name="dishes_search_idx"),
+            GinIndex(fields=["name"], name="dishes_name_trgm_idx", opclasses=["gin_trgm_ops"]),
+            models.Index(fields=["-created_at", "id"], name="dishes_created_idx"),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.restaurant.name})"
@@ -63,6 +127,9 @@ class Customer(models.Model):
 
     class Meta:
         db_table = "customers"
+        indexes = [
+            models.Index(fields=["-created_at", "id"], name="customers_created_idx"),
+        ]
 
     def __str__(self):
         return f"{self.first_name} {self.last_name or ''}".strip()
@@ -79,10 +146,19 @@ class Address(models.Model):
     country = models.TextField(null=True, blank=True)
     latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
     longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    location_cell = models.GeneratedField(
+        expression=grid_cell_expression("latitude", "longitude"),
+        output_field=models.BigIntegerField(null=True),
+        db_persist=True,
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         db_table = "addresses"
+        indexes = [
+            models.Index(fields=["-created_at", "id"], name="addresses_created_idx"),
+            models.Index(fields=["location_cell"], name="addresses_cell_idx"),
+        ]
 
     def __str__(self):
         return f"{self.street}, {self.city or ''}, {self.country or ''}".strip(", ")
@@ -97,10 +173,20 @@ class Driver(models.Model):
     is_active = models.BooleanField(default=True)
     current_location_latitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
     current_location_longitude = models.DecimalField(max_digits=9, decimal_places=6, null=True, blank=True)
+    location_updated_at = models.DateTimeField(null=True, blank=True)
+    location_cell = models.GeneratedField(
+        expression=grid_cell_expression("current_location_latitude", "current_location_longitude"),
+        output_field=models.BigIntegerField(null=True),
+        db_persist=True,
+    )
     created_at = models.DateTimeField(auto_now_add=True)
 
     class Meta:
         db_table = "drivers"
+        indexes = [
+            models.Index(fields=["-created_at", "id"], name="drivers_created_idx"),
+            models.Index(fields=["location_cell"], name="drivers_active_cell_idx", condition=Q(is_active=True)),
+        ]
 
     def __str__(self):
         return f"{self.first_name} {self.last_name or ''}".strip()
@@ -125,6 +211,12 @@ class Order(models.Model):
 
     class Meta:
         db_table = "orders"
+        indexes = [
+            models.Index(fields=["-placed_at", "id"], name="orders_placed_idx"),
+            models.Index(fields=["restaurant", "status", "-placed_at"], name="orders_rest_status_placed_idx"),
+            models.Index(fields=["placed_at"], name="orders_pending_idx", condition=Q(status=0)),
+            models.Index(fields=["updated_at"], name="orders_updated_idx"),
+        ]
 
     def __str__(self):
         return f"Order {self.id} by {self.customer}"
@@ -141,6 +233,9 @@ class OrderItem(models.Model):
 
     class Meta:
         db_table = "order_items"
+        indexes = [
+            models.Index(fields=["-created_at", "id"], name="order_items_created_idx"),
+        ]
 
     def __str__(self):
         return f"{self.name} (x{self.quantity}) for Order {self.order.id}"
@@ -167,6 +262,11 @@ class Delivery(models.Model):
 
     class Meta:
         db_table = "deliveries"
+        indexes = [
+            models.Index(fields=["-created_at", "id"], name="deliveries_created_idx"),
+            models.Index(fields=["status"], name="deliveries_status_idx"),
+            models.Index(fields=["created_at"], name="deliveries_waiting_idx", condition=Q(status=0)),
+        ]
 
     def __str__(self):
         return f"Delivery for Order {self.order.id}"
@@ -190,6 +290,10 @@ class Payment(models.Model):
 
     class Meta:
         db_table = "payments"
+        indexes = [
+            models.Index(fields=["-created_at", "id"], name="payments_created_idx"),
+            models.Index(fields=["status", "provider"], name="payments_status_provider_idx"),
+        ]
 
     def __str__(self):
         return f"Payment for Order {self.order.id}"
@@ -203,14 +307,43 @@ class Comment(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     is_active = models.BooleanField(default=True)
+    likes_count = models.PositiveIntegerField(default=0, editable=False)
+    dislikes_count = models.PositiveIntegerField(default=0, editable=False)
 
     class Meta:
         db_table = 'comments'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['restaurant', '-created_at', 'id'], name='comments_rest_created_idx'),
+        ]
 
     def __str__(self):
         return f"Comment by {self.customer} on {self.restaurant}"
 
+    # Moved by CommentReactView with F() updates.
+    counter_fields = ("likes_count", "dislikes_count")
+
+    def save(self, *args, **kwargs):
+        from .services.ratings import apply_rating_changes, rating_contribution
+
+        kwargs = _without_counters(self, kwargs)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is not None and not {"restaurant", "restaurant_id", "rating", "is_active"} & set(update_fields):
+            return super().save(*args, **kwargs)
+        with transaction.atomic():
+            before = None
+            if not self._state.adding:
+                # Locking the stored row makes concurrent edits of this comment apply their deltas in turn.
+                before = (
+                    Comment.objects.select_for_update().filter(pk=self.pk)
+                    .values_list("restaurant_id", "rating", "is_active").first()
+                )
+            super().save(*args, **kwargs)
+            apply_rating_changes(
+                rating_contribution(*before) if before else None,
+                rating_contribution(self.restaurant_id, self.rating, self.is_active),
+            )
+
 class Reaction(models.Model):
     id = models.BigAutoField(primary_key=True)
     customer = models.ForeignKey(Customer, on_delete=models.CASCADE, related_name='reactions')
@@ -224,4 +357,118 @@ class Reaction(models.Model):
 
     def __str__(self):
         reaction_type = "Like" if self.is_like else "Dislike"
-        return f"{self.customer} {reaction_type} comment {self.comment.id}"
\ No newline at end of file
+        return f"{self.customer} {reaction_type} comment {self.comment.id}"
+
+
+class ExportJob(models.Model):
+    QUEUED, RUNNING, COMPLETED, FAILED = range(4)
+    STATUS_CHOICES = (
+        (QUEUED, "Queued"),
+        (RUNNING, "Running"),
+        (COMPLETED, "Completed"),
+        (FAILED, "Failed"),
+    )
+    KIND_CHOICES = (
+        ("orders", "Orders"),
+        ("order_items", "Order items"),
+        ("payments", "Payments"),
+    )
+    FORMAT_CHOICES = (
+        ("csv", "CSV"),
+        ("ndjson", "NDJSON"),
+    )
+
+    id = models.BigAutoField(primary_key=True)
+    requested_by = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.SET_NULL, null=True, blank=True, related_name="export_jobs"
+    )
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    file_format = models.CharField(max_length=10, choices=FORMAT_CHOICES, default="csv")
+    filters = models.JSONField(default=dict, blank=True)
+    status = models.IntegerField(choices=STATUS_CHOICES, default=QUEUED)
+    # Rows with ids above this bound were created after the job started.
+    max_id = models.BigIntegerField(null=True, blank=True)
+    total_rows = models.IntegerField(null=True, blank=True)
+    exported_rows = models.IntegerField(default=0)
+    last_exported_id = models.BigIntegerField(default=0)
+    chunk_count = models.IntegerField(default=0)
+    error = models.TextField(null=True, blank=True)
+    heartbeat_at = models.DateTimeField(null=True, blank=True)
+    started_at = models.DateTimeField(null=True, blank=True)
+    finished_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = "export_jobs"
+        indexes = [
+            models.Index(fields=["-created_at", "id"], name="export_jobs_created_idx"),
+            models.Index(fields=["created_at"], name="export_jobs_open_idx", condition=Q(status__in=[0, 1])),
+        ]
+
+    def __str__(self):
+        return f"Export {self.id} of {self.kind}"
+
+
+class RestaurantDailyStats(models.Model):
+    """One row per restaurant and local day, rebuilt by ``manage.py refresh_analytics``."""
+    id = models.BigAutoField(primary_key=True)
+    restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, related_name="daily_stats")
+    day = models.DateField()
+    orders_count = models.IntegerField(default=0)
+    items_count = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        db_table = "restaurant_daily_stats"
+        constraints = [
+            models.UniqueConstraint(fields=["restaurant", "day"], name="restaurant_daily_stats_uniq"),
+        ]
+
+    def __str__(self):
+        return f"{self.restaurant_id} on {self.day}"
+
+
+class DishDailyStats(models.Model):
+    id = models.BigAutoField(primary_key=True)
+    restaurant = models.ForeignKey(Restaurant, on_delete=models.CASCADE, related_name="dish_daily_stats")
+    dish = models.ForeignKey(Dish, on_delete=models.CASCADE, related_name="daily_stats")
+    day = models.DateField()
+    orders_count = models.IntegerField(default=0)
+    quantity = models.IntegerField(default=0)
+    revenue = models.DecimalField(max_digits=14, decimal_places=2, default=0)
+
+    class Meta:
+        db_table = "dish_daily_stats"
+        constraints = [
+            models.UniqueConstraint(fields=["restaurant", "day", "dish"], name="dish_daily_stats_uniq"),
+        ]
+
+    def __str__(self):
+        return f"Dish {self.dish_id} on {self.day}"
+
+
+class AnalyticsWatermark(models.Model):
+    # Orders updated at or after this point have not been rolled up yet.
+    name = models.CharField(max_length=50, primary_key=True)
+    refreshed_through = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        db_table = "analytics_watermarks"
+
+    def __str__(self):
+        return f"{self.name} through {self.refreshed_through}"
+
+
+class MenuDocument(models.Model):
+    # The restaurant's active menus and available dishes as served by the
+    # full-menu endpoint, rebuilt by services.menus when any of them change.
+    restaurant = models.OneToOneField(Restaurant, on_delete=models.CASCADE, primary_key=True, related_name="menu_document")
+    document = models.JSONField()
+    built_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "menu_documents"
+
+    def __str__(self):
+        return f"Menu of restaurant {self.restaurant_id} built at {self.built_at}"
@@ -0,0 +1,170 @@
+import json
+from base64 import b64decode, b64encode
+from urllib import parse
+
+from django.core.exceptions import FieldDoesNotExist
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import CursorPagination, Cursor
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+from .search import FullTextSearchFilter
+
+
+def _after(ordering, position, nullable):
+    """
+    ``Q`` for the rows strictly after ``position`` (one value per ordering
+    field) in ``ordering``, following PostgreSQL's default NULL placement:
+    NULLs sort as the largest value, last ascending and first descending.
+    Fields not in ``nullable`` skip the NULL branches.
+    """
+    field = ordering[0]
+    name, descending = field.lstrip("-"), field.startswith("-")
+    value = position[0]
+    if value is None:
+        beyond = Q(**{f"{name}__isnull": False}) if descending else Q(pk__in=[])
+        tied = Q(**{f"{name}__isnull": True})
+    else:
+        beyond = Q(**{f"{name}__lt": value}) if descending else Q(**{f"{name}__gt": value})
+        if not descending and name in nullable:
+            beyond |= Q(**{f"{name}__isnull": True})
+        tied = Q(**{name: value})
+    if len(ordering) == 1:
+        return beyond
+    return beyond | (tied & _after(ordering[1:], position[1:], nullable))
+
+
+def _leading_bound(ordering, position, nullable):
+    """
+    The range on the leading ordering field that ``_after`` implies. The OR
+    chain alone gives PostgreSQL no index bound, so ANDing this in lets a
+    ``(field, id)`` index be range-scanned from the cursor instead of from
+    the top of the ordering.
+    """
+    name, descending = ordering[0].lstrip("-"), ordering[0].startswith("-")
+    value = position[0]
+    if value is None:
+        return Q() if descending else Q(**{f"{name}__isnull": True})
+    bound = Q(**{f"{name}__lte": value}) if descending else Q(**{f"{name}__gte": value})
+    if not descending and name in nullable:
+        bound |= Q(**{f"{name}__isnull": True})
+    return bound
+
+
+def _nullable_fields(model, ordering):
+    nullable = set()
+    for field in ordering:
+        name = field.lstrip("-")
+        try:
+            if model._meta.get_field(name).null:
+                nullable.add(name)
+        except FieldDoesNotExist:
+            # Annotations (the search rank) and "pk": assume NULLs are possible.
+            if name != "pk":
+                nullable.add(name)
+    return frozenset(nullable)
+
+
+class StableCursorPagination(CursorPagination):
+    """
+    Keyset pagination over the full ordering. The ordering always ends with
+    the primary key, so the cursor holds the last row's value of every
+    ordering field and the next page starts strictly after that row: ties on
+    the leading field and NULLs page through without an OFFSET.
+    """
+    page_size = 50
+    page_size_query_param = "page_size"
+    max_page_size = 200
+    ordering = ("-created_at", "id")
+
+    def get_ordering(self, request, queryset, view):
+        rank = FullTextSearchFilter.rank_annotation
+        if rank in queryset.query.annotations and not request.query_params.get(api_settings.ORDERING_PARAM):
+            ordering = [f"-{rank}"]
+        else:
+            ordering = list(super().get_ordering(request, queryset, view))
+        # Client ordering from OrderingFilter may not be unique, so always
+        # finish with the primary key to keep page boundaries deterministic.
+        if not any(field.lstrip("-") in ("id", "pk") for field in ordering):
+            ordering.append("id")
+        return tuple(ordering)
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.page_size = self.get_page_size(request)
+        if not self.page_size:
+            return None
+
+        self.base_url = request.build_absolute_uri()
+        self.ordering = self.get_ordering(request, queryset, view)
+        self.cursor = self.decode_cursor(request)
+        reverse, position = (self.cursor.reverse, self.cursor.position) if self.cursor else (False, None)
+
+        ordering = tuple(field[1:] if field.startswith("-") else f"-{field}" for field in self.ordering) if reverse else self.ordering
+        queryset = queryset.order_by(*ordering)
+        if position is not None:
+            nullable = _nullable_fields(queryset.model, ordering)
+            queryset = queryset.filter(_leading_bound(ordering, position, nullable) & _after(ordering, position, nullable))
+
+        results = list(queryset[:self.page_size + 1])
+        self.page = results[:self.page_size]
+        has_more = len(results) > self.page_size
+        if reverse:
+            self.page.reverse()
+        self.has_next = position is not None if reverse else has_more
+        self.has_previous = has_more if reverse else position is not None
+        self.current_position = position
+
+        if (self.has_previous or self.has_next) and self.template is not None:
+            self.display_page_controls = True
+        return self.page
+
+    def get_next_link(self):
+        if not self.has_next:
+            return None
+        position = self._get_position_from_instance(self.page[-1], self.ordering) if self.page else self.current_position
+        return self.encode_cursor(Cursor(offset=0, reverse=False, position=position))
+
+    def get_previous_link(self):
+        if not self.has_previous:
+            return None
+        position = self._get_position_from_instance(self.page[0], self.ordering) if self.page else self.current_position
+        return self.encode_cursor(Cursor(offset=0, reverse=True, position=position))
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if encoded is None:
+            return None
+        try:
+            tokens = parse.parse_qs(b64decode(encoded.encode("ascii")).decode("ascii"), keep_blank_values=True)
+            reverse = bool(int(tokens.get("r", ["0"])[0]))
+            position = json.loads(tokens["p"][0])
+        except (TypeError, ValueError, KeyError):
+            raise NotFound(self.invalid_cursor_message)
+        # A cursor minted for another ordering (the client changed ?ordering=) is stale.
+        if (
+            not isinstance(position, list) or len(position) != len(self.ordering)
+            or not all(value is None or isinstance(value, str) for value in position)
+        ):
+            raise NotFound(self.invalid_cursor_message)
+        return Cursor(offset=0, reverse=reverse, position=position)
+
+    def encode_cursor(self, cursor):
+        tokens = {"p": json.dumps(cursor.position, separators=(",", ":"))}
+        if cursor.reverse:
+            tokens["r"] = "1"
+        encoded = b64encode(parse.urlencode(tokens).encode("ascii")).decode("ascii")
+        return replace_query_param(self.base_url, self.cursor_query_param, encoded)
+
+    def _get_position_from_instance(self, instance, ordering):
+        values = []
+        for field in ordering:
+            name = field.lstrip("-")
+            value = instance[name] if isinstance(instance, dict) else getattr(instance, name)
+            values.append(None if value is None else str(value))
+        return values
+
+
+class OrderCursorPagination(StableCursorPagination):
+    ordering = ("-placed_at", "id")
@@ -0,0 +1,193 @@
+"""
+Pub/sub fan-out for live delivery tracking. Writers publish small events to
+topics (``delivery:<id>``, ``driver:<id>``); every open tracking stream that
+listens to the topic gets a copy without touching the database.
+
+The default :class:`InProcessBroker` only reaches streams served by the same
+process, so events published elsewhere (``manage.py dispatch_deliveries``,
+other web nodes) never arrive. :class:`PostgresBroker` relays them through
+PostgreSQL ``LISTEN/NOTIFY``; other shared channels (Redis pub/sub, ...) fit
+the same shape: a :class:`BaseBroker` that sends ``publish`` out and hands
+what it receives to ``deliver_local``.
+"""
+import asyncio
+import json
+import logging
+import threading
+from collections import defaultdict
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import DEFAULT_DB_ALIAS, connection, connections, transaction
+from django.utils.module_loading import import_string
+
+logger = logging.getLogger(__name__)
+
+
+class Subscription:
+    """A bounded inbox owned by one event loop; slow readers lose the oldest events."""
+
+    def __init__(self, broker, maxsize):
+        self.broker = broker
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize)
+        self.topics = set()
+
+    def listen(self, topic):
+        self.topics.add(topic)
+        self.broker._attach(self, topic)
+
+    def unlisten(self, topic):
+        self.topics.discard(topic)
+        self.broker._detach(self, topic)
+
+    def deliver(self, message):
+        try:
+            self.loop.call_soon_threadsafe(self._put, message)
+        except RuntimeError:
+            # The stream's loop is gone; it will detach itself.
+            pass
+
+    def _put(self, message):
+        if self.queue.full():
+            self.queue.get_nowait()
+        self.queue.put_nowait(message)
+
+    async def get(self, timeout):
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+    def close(self):
+        for topic in list(self.topics):
+            self.unlisten(topic)
+
+
+class BaseBroker:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = defaultdict(set)
+
+    def subscribe(self, *topics, maxsize=100):
+        subscription = Subscription(self, maxsize)
+        for topic in topics:
+            subscription.listen(topic)
+        return subscription
+
+    def publish(self, topic, message):
+        raise NotImplementedError
+
+    def deliver_local(self, topic, message):
+        with self._lock:
+            subscribers = list(self._subscribers.get(topic, ()))
+        for subscription in subscribers:
+            subscription.deliver(message)
+        return len(subscribers)
+
+    def subscriber_count(self, topic):
+        with self._lock:
+            return len(self._subscribers.get(topic, ()))
+
+    def _attach(self, subscription, topic):
+        with self._lock:
+            self._subscribers[topic].add(subscription)
+
+    def _detach(self, subscription, topic):
+        with self._lock:
+            subscribers = self._subscribers.get(topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[topic]
+
+
+class InProcessBroker(BaseBroker):
+    def publish(self, topic, message):
+        return self.deliver_local(topic, message)
+
+
+class PostgresBroker(BaseBroker):
+    """
+    Relays events between processes over one ``LISTEN/NOTIFY`` channel:
+    ``publish`` sends a ``NOTIFY`` on the default database, and a listener
+    thread, started with the first subscription on its own connection, hands
+    every notification (this process's included) to the local streams.
+    Messages travel as JSON, so datetimes and Decimals arrive as the strings
+    the event stream would render anyway. Needs psycopg 3; NOTIFY payloads
+    are limited to 8000 bytes.
+    """
+    channel = "realtime_events"
+    reconnect_delay = 1.0
+
+    def __init__(self):
+        super().__init__()
+        self._listener = None
+        self._stopping = threading.Event()
+        self.listening = threading.Event()
+
+    def publish(self, topic, message):
+        payload = json.dumps({"topic": topic, "message": message}, cls=DjangoJSONEncoder)
+        with connection.cursor() as cursor:
+            cursor.execute("SELECT pg_notify(%s, %s)", [self.channel, payload])
+
+    def subscribe(self, *topics, maxsize=100):
+        with self._lock:
+            if self._listener is None or not self._listener.is_alive():
+                self._listener = threading.Thread(target=self._listen, name="realtime-listener", daemon=True)
+                self._listener.start()
+        return super().subscribe(*topics, maxsize=maxsize)
+
+    def stop(self):
+        """Stop the listener thread and close its connection."""
+        self._stopping.set()
+        if self._listener is not None:
+            self._listener.join()
+
+    def _listen(self):
+        while not self._stopping.is_set():
+            listener = connections.create_connection(DEFAULT_DB_ALIAS)
+            try:
+                listener.ensure_connection()
+                listener.connection.execute(f"LISTEN {self.channel}")
+                self.listening.set()
+                while not self._stopping.is_set():
+                    for notification in listener.connection.notifies(timeout=1.0):
+                        event = json.loads(notification.payload)
+                        self.deliver_local(event["topic"], event["message"])
+            except Exception:
+                logger.exception("Realtime listener lost its connection; reconnecting.")
+                self._stopping.wait(self.reconnect_delay)
+            finally:
+                self.listening.clear()
+                listener.close()
+
+
+@lru_cache(maxsize=None)
+def _broker(path):
+    return import_string(path)()
+
+
+def get_broker():
+    return _broker(settings.REALTIME_BROKER)
+
+
+def publish(topic, message):
+    """Publish once the surrounding transaction commits, so watchers never see rolled-back state."""
+    transaction.on_commit(lambda: get_broker().publish(topic, message))
+
+
+def delivery_topic(delivery_id):
+    return f"delivery:{delivery_id}"
+
+
+def driver_topic(driver_id):
+    return f"driver:{driver_id}"
+
+
+def publish_delivery(delivery_id, **fields):
+    publish(delivery_topic(delivery_id), {"type": "delivery", "delivery": delivery_id, **fields})
+
+
+def publish_driver_location(driver_id, latitude, longitude, recorded_at):
+    publish(driver_topic(driver_id), {
+        "type": "location", "driver": driver_id, "latitude": latitude, "longitude": longitude, "recorded_at": recorded_at,
+    })
@@ -0,0 +1,37 @@
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # optional speed-up; the stdlib path below is always available
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Drop-in replacement for DRF's ``JSONRenderer`` that encodes with orjson
+    when it is installed. Datetimes, dates, UUIDs and ``JSONField`` contents
+    (plain dicts and lists) are encoded natively; everything else (Decimals,
+    lazy strings, timedeltas, querysets, ...) goes through DRF's own encoder,
+    so the bytes match the stock renderer. Two documented differences remain:
+    floats that Python writes in exponent form (``1e-05``, ``1e+16``) come out
+    as ``1e-5`` and ``1e16``, the same numbers; and NaN/Infinity become
+    ``null`` rather than raising.
+
+    Indented output (``; indent=4``, the browsable API), non-compact or ASCII
+    settings, and anything orjson cannot encode (integers beyond 64 bits, ...)
+    fall back to the stdlib renderer.
+    """
+    options = (orjson.OPT_UTC_Z | orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATACLASS) if orjson else 0
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None or data is None or self.ensure_ascii or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+        try:
+            ret = orjson.dumps(data, default=self.encoder_class().default, option=self.options)
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+        # Same JavaScript-safe escaping as the stock renderer.
+        return ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(b"\xe2\x80\xa9", b"\\u2029")
@@ -1,6 +1,10 @@
+from datetime import timedelta
+
 from rest_framework import serializers
-from .models import Restaurant, Menu, Dish, Customer, Address, Driver, Order, OrderItem, Delivery, Payment, Comment, Reaction
-from django_filters.rest_framework import FilterSet, CharFilter, BooleanFilter
+from django.urls import reverse
+from django.utils import timezone
+from .models import Restaurant, Menu, Dish, Customer, Address, Driver, Order, OrderItem, Delivery, Payment, Comment, Reaction, ExportJob
+from django_filters.rest_framework import FilterSet, CharFilter, BooleanFilter, IsoDateTimeFilter
 
 
 class CustomDepthRestaurant(serializers.ModelSerializer):
@@ -40,6 +44,16 @@ class RestaurantSerializer(serializers.ModelSerializer):
         read_only_fields = ["comments_count"]
 
 
+class RestaurantDetailSerializer(RestaurantSerializer):
+    average_rating = serializers.DecimalField(max_digits=3, decimal_places=2, read_only=True)
+    menus_count = serializers.IntegerField(read_only=True)
+    active_dishes_count = serializers.IntegerField(read_only=True)
+
+    class Meta(RestaurantSerializer.Meta):
+        fields = RestaurantSerializer.Meta.fields + ["average_rating", "menus_count", "active_dishes_count"]
+        read_only_fields = ["comments_count", "average_rating", "menus_count", "active_dishes_count"]
+
+
 class RestaurantFilter(FilterSet):
     name = CharFilter(field_name='name', lookup_expr='icontains')
     is_active = BooleanFilter(field_name='is_active')
@@ -49,6 +63,15 @@ class RestaurantFilter(FilterSet):
         fields = ['name', 'is_active']
 
 
+class OrderExportFilter(FilterSet):
+    placed_after = IsoDateTimeFilter(field_name='placed_at', lookup_expr='gte')
+    placed_before = IsoDateTimeFilter(field_name='placed_at', lookup_expr='lt')
+
+    class Meta:
+        model = Order
+        fields = ['restaurant', 'status', 'placed_after', 'placed_before']
+
+
 class MenuSerializer(serializers.ModelSerializer):
     restaurant = CustomDepthRestaurant()
 
@@ -61,7 +84,27 @@ class DishSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = Dish
-        fields = '__all__'
+        exclude = ['search_vector']
+
+class MenuDocumentDishSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = Dish
+        fields = ["id", "name", "description", "price", "currency", "prep_time_minutes"]
+
+class MenuDocumentMenuSerializer(serializers.ModelSerializer):
+    dishes = MenuDocumentDishSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Menu
+        fields = ["id", "name", "description", "dishes"]
+
+class MenuDocumentSerializer(serializers.ModelSerializer):
+    """The full menu: expects ``menus`` and their ``dishes`` prefetched already filtered."""
+    menus = MenuDocumentMenuSerializer(many=True, read_only=True)
+
+    class Meta:
+        model = Restaurant
+        fields = ["id", "name", "phone", "email", "description", "menus"]
 
 class CustomerSerializer(serializers.ModelSerializer):
     class Meta:
@@ -83,6 +126,70 @@ class DriverSerializer(serializers.ModelSerializer):
         model = Driver
         fields = '__all__'
 
+class NearestDriverQuerySerializer(serializers.Serializer):
+    latitude = serializers.FloatField(min_value=-90, max_value=90, required=False)
+    longitude = serializers.FloatField(min_value=-180, max_value=180, required=False)
+    restaurant = serializers.IntegerField(required=False)
+    address = serializers.IntegerField(required=False)
+    k = serializers.IntegerField(min_value=1, max_value=50, default=5)
+    radius_km = serializers.FloatField(min_value=0.1, max_value=100, required=False)
+    max_age = serializers.IntegerField(min_value=1, required=False)
+
+    def validate(self, attrs):
+        origins = [name for name in ("restaurant", "address") if name in attrs]
+        has_point = "latitude" in attrs and "longitude" in attrs
+        if len(origins) + has_point != 1:
+            raise serializers.ValidationError("Give either latitude and longitude, a restaurant or an address.")
+        return attrs
+
+class RestaurantAnalyticsQuerySerializer(serializers.Serializer):
+    start = serializers.DateField(required=False)
+    end = serializers.DateField(required=False)
+    top = serializers.IntegerField(min_value=1, max_value=50, default=5)
+
+    def validate(self, attrs):
+        attrs.setdefault("end", timezone.localdate())
+        attrs.setdefault("start", attrs["end"] - timedelta(days=29))
+        if attrs["start"] > attrs["end"]:
+            raise serializers.ValidationError("start must not be after end.")
+        return attrs
+
+class DailyStatsSerializer(serializers.Serializer):
+    day = serializers.DateField()
+    orders_count = serializers.IntegerField()
+    items_count = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+    average_basket = serializers.DecimalField(max_digits=14, decimal_places=2, allow_null=True)
+
+class TopDishSerializer(serializers.Serializer):
+    dish = serializers.IntegerField()
+    name = serializers.CharField()
+    quantity = serializers.IntegerField()
+    orders_count = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+
+class RestaurantAnalyticsSerializer(serializers.Serializer):
+    restaurant = serializers.IntegerField()
+    start = serializers.DateField()
+    end = serializers.DateField()
+    refreshed_through = serializers.DateTimeField(allow_null=True)
+    orders_count = serializers.IntegerField()
+    items_count = serializers.IntegerField()
+    revenue = serializers.DecimalField(max_digits=14, decimal_places=2)
+    average_basket = serializers.DecimalField(max_digits=14, decimal_places=2, allow_null=True)
+    days = DailyStatsSerializer(many=True)
+    top_dishes = TopDishSerializer(many=True)
+
+class NearestDriverSerializer(serializers.ModelSerializer):
+    distance_km = serializers.FloatField(read_only=True)
+
+    class Meta:
+        model = Driver
+        fields = [
+            "id", "first_name", "last_name", "phone", "vehicle_info", "current_location_latitude",
+            "current_location_longitude", "location_updated_at", "distance_km",
+        ]
+
 class OrderSerializer(serializers.ModelSerializer):
     restaurant = CustomDepthRestaurant()
     delivery_address = CustomDepthAddress()
@@ -99,6 +206,55 @@ class OrderItemSerializer(serializers.ModelSerializer):
         model = OrderItem
         fields = '__all__'
 
+class CartItemSerializer(serializers.Serializer):
+    dish = serializers.IntegerField()
+    quantity = serializers.IntegerField(min_value=1)
+    unit_price = serializers.DecimalField(max_digits=10, decimal_places=2, required=False)
+
+
+class CartSerializer(serializers.Serializer):
+    customer = serializers.IntegerField()
+    restaurant = serializers.IntegerField()
+    delivery_address = serializers.IntegerField(required=False, allow_null=True)
+    currency = serializers.CharField(max_length=3, default="USD")
+    notes = serializers.CharField(required=False, allow_blank=True, allow_null=True)
+    provider = serializers.CharField(required=False, allow_null=True)
+    items = CartItemSerializer(many=True, allow_empty=False, max_length=200)
+
+
+class OrderTransitionSerializer(serializers.Serializer):
+    order_ids = serializers.ListField(child=serializers.IntegerField(), allow_empty=False, max_length=5000)
+    status = serializers.ChoiceField(choices=[(1, "Processing"), (2, "Delivered")])
+
+
+class DriverPingSerializer(serializers.Serializer):
+    driver = serializers.IntegerField()
+    latitude = serializers.FloatField(min_value=-90, max_value=90)
+    longitude = serializers.FloatField(min_value=-180, max_value=180)
+    recorded_at = serializers.DateTimeField(required=False)
+
+
+class DriverLocationBatchSerializer(serializers.Serializer):
+    pings = DriverPingSerializer(many=True, allow_empty=False, max_length=5000)
+
+
+class PlacedOrderItemSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = OrderItem
+        fields = ["id", "dish", "name", "unit_price", "quantity", "total_price"]
+
+
+class PlacedOrderSerializer(serializers.ModelSerializer):
+    items = PlacedOrderItemSerializer(source="placed_items", many=True)
+    payment = serializers.IntegerField(source="placed_payment.id")
+
+    class Meta:
+        model = Order
+        fields = [
+            "id", "customer", "restaurant", "delivery_address", "total_amount", "currency",
+            "status", "placed_at", "notes", "items", "payment",
+        ]
+
 class DeliverySerializer(serializers.ModelSerializer):
     class Meta:
         model = Delivery
@@ -112,8 +268,8 @@ class PaymentSerializer(serializers.ModelSerializer):
         fields = '__all__'
 
 class CommentSerializer(serializers.ModelSerializer):
-    likes = serializers.SerializerMethodField()
-    dislikes = serializers.SerializerMethodField()
+    likes = serializers.IntegerField(source="likes_count", read_only=True)
+    dislikes = serializers.IntegerField(source="dislikes_count", read_only=True)
     author = serializers.SerializerMethodField()
 
     class Meta:
@@ -124,15 +280,56 @@ class CommentSerializer(serializers.ModelSerializer):
         ]
         read_only_fields = ["id", "created_at", "updated_at", "likes", "dislikes", "author"]
 
-    def get_likes(self, obj):
-        return obj.reactions.filter(is_like=True).count()
-
-    def get_dislikes(self, obj):
-        return obj.reactions.filter(is_like=False).count()
-
     def get_author(self, obj):
         return {
             "id": obj.customer.id,
             "first_name": obj.customer.first_name,
             "last_name": obj.customer.last_name,
-        }
\ No newline at end of file
+        }
+
+
+class ExportJobFilterSerializer(serializers.Serializer):
+    placed_after = serializers.DateTimeField(required=False)
+    placed_before = serializers.DateTimeField(required=False)
+    restaurant = serializers.IntegerField(required=False)
+    status = serializers.ChoiceField(choices=Order.STATUS_CHOICES, required=False)
+
+
+class ExportJobSerializer(serializers.ModelSerializer):
+    filters = serializers.JSONField(required=False)
+    progress = serializers.SerializerMethodField()
+    download_url = serializers.SerializerMethodField()
+
+    class Meta:
+        model = ExportJob
+        fields = [
+            "id", "kind", "file_format", "filters", "status", "progress", "total_rows", "exported_rows",
+            "chunk_count", "error", "created_at", "started_at", "finished_at", "download_url",
+        ]
+        read_only_fields = [
+            "id", "status", "progress", "total_rows", "exported_rows", "chunk_count", "error",
+            "created_at", "started_at", "finished_at", "download_url",
+        ]
+
+    def validate_filters(self, value):
+        serializer = ExportJobFilterSerializer(data=value)
+        serializer.is_valid(raise_exception=True)
+        # Stored as JSON, so keep the datetimes in their ISO form.
+        return {
+            name: value.isoformat() if hasattr(value, "isoformat") else value
+            for name, value in serializer.validated_data.items()
+        }
+
+    def get_progress(self, obj):
+        if obj.status == ExportJob.COMPLETED:
+            return 100.0
+        if not obj.total_rows:
+            return 0.0
+        return round(min(obj.exported_rows / obj.total_rows, 1) * 100, 1)
+
+    def get_download_url(self, obj):
+        if obj.status != ExportJob.COMPLETED:
+            return None
+        url = reverse("export-job-download", args=[obj.pk])
+        request = self.context.get("request")
+        return request.build_absolute_uri(url) if request else url
@@ -0,0 +1,146 @@
+from datetime import timedelta
+from decimal import Decimal
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import Sum
+from django.utils import timezone
+
+from ..models import Order, OrderItem, RestaurantDailyStats, DishDailyStats, AnalyticsWatermark
+
+WATERMARK = "daily_stats"
+
+
+def _touched_days(cursor, since):
+    """Distinct ``(restaurant_id, local day)`` pairs with orders or items changed since ``since`` (all of them if None)."""
+    orders, items = Order._meta.db_table, OrderItem._meta.db_table
+    day = "(o.placed_at AT TIME ZONE %s)::date"
+    if since is None:
+        cursor.execute(f"SELECT DISTINCT o.restaurant_id, {day} FROM {orders} AS o", [settings.TIME_ZONE])
+    else:
+        cursor.execute(
+            f"""
+            SELECT o.restaurant_id, {day} FROM {orders} AS o WHERE o.updated_at >= %s
+            UNION
+            SELECT o.restaurant_id, {day} FROM {items} AS i JOIN {orders} AS o ON o.id = i.order_id
+            WHERE i.created_at >= %s
+            """,
+            [settings.TIME_ZONE, since, settings.TIME_ZONE, since],
+        )
+    return cursor.fetchall()
+
+
+def refresh_daily_stats(full=False):
+    """
+    Bring the per-restaurant and per-dish daily rollups up to date. Only the
+    restaurant-days whose orders or items changed since the last run are
+    recomputed, each from scratch, so re-running is always safe; the
+    watermark is moved back by ``ANALYTICS_REFRESH_OVERLAP_SECONDS`` to catch
+    transactions that committed after a run with an earlier ``updated_at``.
+    Runs are serialised on the watermark row. Returns the number of
+    restaurant-days refreshed.
+
+    Deleted orders leave no ``updated_at`` behind; ``full=True`` rebuilds
+    every day.
+    """
+    now = timezone.now()
+    stats, dish_stats = RestaurantDailyStats._meta.db_table, DishDailyStats._meta.db_table
+    orders, items = Order._meta.db_table, OrderItem._meta.db_table
+    with transaction.atomic():
+        watermark, _ = AnalyticsWatermark.objects.select_for_update().get_or_create(name=WATERMARK)
+        since = None
+        if not full and watermark.refreshed_through is not None:
+            since = watermark.refreshed_through - timedelta(seconds=settings.ANALYTICS_REFRESH_OVERLAP_SECONDS)
+
+        with connection.cursor() as cursor:
+            touched = _touched_days(cursor, since)
+            if full:
+                cursor.execute(f"DELETE FROM {dish_stats}")
+                cursor.execute(f"DELETE FROM {stats}")
+            if touched:
+                keys = [[restaurant_id for restaurant_id, _ in touched], [day for _, day in touched]]
+                touched_sql = "unnest(%s::bigint[], %s::date[]) AS t(restaurant_id, day)"
+                # Day boundaries in local time, so the range scan can use the placed_at indexes.
+                day_orders = (
+                    f"JOIN {orders} AS o ON o.restaurant_id = t.restaurant_id "
+                    f"AND o.placed_at >= t.day::timestamp AT TIME ZONE %s "
+                    f"AND o.placed_at < (t.day + 1)::timestamp AT TIME ZONE %s"
+                )
+                bounds = [settings.TIME_ZONE, settings.TIME_ZONE]
+                if not full:
+                    for table in (dish_stats, stats):
+                        cursor.execute(
+                            f"DELETE FROM {table} AS s USING {touched_sql} "
+                            f"WHERE s.restaurant_id = t.restaurant_id AND s.day = t.day",
+                            keys,
+                        )
+                cursor.execute(
+                    f"""
+                    INSERT INTO {stats} (restaurant_id, day, orders_count, items_count, revenue)
+                    SELECT t.restaurant_id, t.day, COUNT(*), COALESCE(SUM(i.quantity), 0), SUM(o.total_amount)
+                    FROM {touched_sql} {day_orders}
+                    LEFT JOIN LATERAL (SELECT SUM(quantity) AS quantity FROM {items} WHERE order_id = o.id) AS i ON TRUE
+                    GROUP BY t.restaurant_id, t.day
+                    """,
+                    keys + bounds,
+                )
+                cursor.execute(
+                    f"""
+                    INSERT INTO {dish_stats} (restaurant_id, day, dish_id, orders_count, quantity, revenue)
+                    SELECT t.restaurant_id, t.day, i.dish_id, COUNT(DISTINCT o.id), SUM(i.quantity), SUM(i.total_price)
+                    FROM {touched_sql} {day_orders}
+                    JOIN {items} AS i ON i.order_id = o.id AND i.dish_id IS NOT NULL
+                    GROUP BY t.restaurant_id, t.day, i.dish_id
+                    """,
+                    keys + bounds,
+                )
+
+        watermark.refreshed_through = now
+        watermark.save(update_fields=["refreshed_through"])
+    return len(touched)
+
+
+def restaurant_analytics(restaurant_id, start, end, top=5):
+    """
+    Totals, per-day figures and best-selling dishes for ``start..end``
+    (inclusive local dates), summed from the daily rollups.
+    """
+    days = list(
+        RestaurantDailyStats.objects.filter(restaurant_id=restaurant_id, day__range=(start, end))
+        .order_by("day")
+        .values("day", "orders_count", "items_count", "revenue")
+    )
+    top_dishes = list(
+        DishDailyStats.objects.filter(restaurant_id=restaurant_id, day__range=(start, end))
+        .values("dish_id")
+        .annotate(quantity=Sum("quantity"), revenue=Sum("revenue"), orders_count=Sum("orders_count"))
+        .values("dish_id", "dish__name", "quantity", "revenue", "orders_count")
+        .order_by("-quantity", "-revenue", "dish_id")[:top]
+    )
+    for day in days:
+        day["average_basket"] = _average(day["revenue"], day["orders_count"])
+    orders_count = sum(day["orders_count"] for day in days)
+    revenue = sum((day["revenue"] for day in days), Decimal("0.00"))
+    refreshed_through = AnalyticsWatermark.objects.filter(name=WATERMARK).values_list("refreshed_through", flat=True).first()
+    return {
+        "restaurant": restaurant_id,
+        "start": start,
+        "end": end,
+        "refreshed_through": refreshed_through,
+        "orders_count": orders_count,
+        "items_count": sum(day["items_count"] for day in days),
+        "revenue": revenue,
+        "average_basket": _average(revenue, orders_count),
+        "days": days,
+        "top_dishes": [
+            {
+                "dish": dish["dish_id"], "name": dish["dish__name"], "quantity": dish["quantity"],
+                "revenue": dish["revenue"], "orders_count": dish["orders_count"],
+            }
+            for dish in top_dishes
+        ],
+    }
+
+
+def _average(revenue, orders_count):
+    return (revenue / orders_count).quantize(Decimal("0.01")) if orders_count else None
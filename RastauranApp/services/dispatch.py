@@ -0,0 +1,151 @@
+import numpy as np
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import connection, transaction
+from django.utils import timezone
+
+from ..geo import EARTH_RADIUS_KM, KM_PER_DEGREE
+from ..models import Delivery
+from ..realtime import publish_delivery
+from .drivers import BUSY_DELIVERY_STATUSES, available_drivers, pickup_points
+
+try:
+    from scipy.optimize import linear_sum_assignment
+except ImportError:  # pragma: no cover - scipy is optional
+    linear_sum_assignment = None
+
+
+def distance_matrix(origins, targets):
+    """Haversine distances in km between two ``(n, 2)`` arrays of degrees."""
+    origins, targets = np.radians(origins), np.radians(targets)
+    lat1, lng1 = origins[:, 0:1], origins[:, 1:2]
+    lat2, lng2 = targets[:, 0], targets[:, 1]
+    a = np.sin((lat2 - lat1) / 2) ** 2 + np.cos(lat1) * np.cos(lat2) * np.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(np.sqrt(a), 1.0))
+
+
+def greedy_match(costs, candidates=8):
+    """
+    Repeatedly take the cheapest remaining (row, column) pair. Only each row's
+    ``candidates`` cheapest columns are sorted at first; rows left unmatched
+    when those run out go round again against the columns still free.
+    Infinite costs are never matched. Returns ``(rows, columns)`` arrays.
+    """
+    rows, columns = [], []
+    free_rows, free_columns = np.arange(costs.shape[0]), np.arange(costs.shape[1])
+    while free_rows.size and free_columns.size:
+        sub = costs[np.ix_(free_rows, free_columns)]
+        k = min(candidates, sub.shape[1])
+        nearest = np.argpartition(sub, k - 1, axis=1)[:, :k] if k < sub.shape[1] else np.tile(np.arange(k), (sub.shape[0], 1))
+        pair_rows = np.repeat(np.arange(sub.shape[0]), k)
+        pair_columns = nearest.ravel()
+        pair_costs = sub[pair_rows, pair_columns]
+        order = np.argsort(pair_costs, kind="stable")
+
+        used_rows, used_columns, matched = set(), set(), 0
+        for index in order:
+            if not np.isfinite(pair_costs[index]):
+                break
+            row, column = pair_rows[index], pair_columns[index]
+            if row in used_rows or column in used_columns:
+                continue
+            used_rows.add(row)
+            used_columns.add(column)
+            rows.append(free_rows[row])
+            columns.append(free_columns[column])
+            matched += 1
+        if not matched or k == sub.shape[1]:
+            break
+        free_rows = np.delete(free_rows, list(used_rows))
+        free_columns = np.delete(free_columns, list(used_columns))
+    return np.array(rows, dtype=int), np.array(columns, dtype=int)
+
+
+def hungarian_match(costs):
+    if linear_sum_assignment is None:
+        raise ImproperlyConfigured("DISPATCH_MATCHING = 'hungarian' needs scipy installed.")
+    finite = np.isfinite(costs)
+    # linear_sum_assignment rejects infeasible matrices; price them out instead.
+    padded = np.where(finite, costs, costs[finite].max(initial=0) * 10 + 1e6)
+    rows, columns = linear_sum_assignment(padded)
+    keep = finite[rows, columns]
+    return rows[keep], columns[keep]
+
+
+MATCHERS = {"greedy": greedy_match, "hungarian": hungarian_match}
+
+
+def dispatch_waiting(batch_size=None, max_km=None, matching=None, delivery_ids=None):
+    """
+    Assign waiting deliveries to available drivers as one batch.
+
+    The waiting deliveries and the candidate drivers around their pickups are
+    locked with ``FOR UPDATE SKIP LOCKED``, so dispatchers running at the same
+    time each work on rows nobody else holds instead of queueing behind one
+    another; locked drivers are re-checked for busy deliveries. Costs are
+    pickup distances from a NumPy haversine matrix (pairs beyond ``max_km``
+    are infeasible), matched greedily or with the Hungarian algorithm, and
+    written back with a single UPDATE. Returns a list of
+    ``(delivery_id, driver_id, distance_km)``.
+    """
+    batch_size = batch_size or settings.DISPATCH_BATCH_SIZE
+    max_km = max_km or settings.DISPATCH_MAX_KM
+    match = MATCHERS[matching or settings.DISPATCH_MATCHING]
+
+    with transaction.atomic():
+        waiting = Delivery.objects.filter(status=0, driver__isnull=True)
+        if delivery_ids is not None:
+            waiting = waiting.filter(id__in=delivery_ids)
+        deliveries = list(
+            waiting.select_for_update(skip_locked=True, of=("self",))
+            .order_by("created_at", "id")
+            .values_list("id", "order__restaurant_id")[:batch_size]
+        )
+        pickups = pickup_points({restaurant_id for _, restaurant_id in deliveries})
+        deliveries = [(delivery_id, pickups[restaurant_id]) for delivery_id, restaurant_id in deliveries if restaurant_id in pickups]
+        if not deliveries:
+            return []
+
+        origins = np.array([point for _, point in deliveries])
+        margin_lat = max_km / KM_PER_DEGREE
+        margin_lng = max_km / (KM_PER_DEGREE * np.cos(np.radians(min(np.abs(origins[:, 0]).max() + margin_lat, 89.9))))
+        drivers = list(
+            available_drivers()
+            .filter(
+                current_location_latitude__range=(origins[:, 0].min() - margin_lat, origins[:, 0].max() + margin_lat),
+                current_location_longitude__range=(origins[:, 1].min() - margin_lng, origins[:, 1].max() + margin_lng),
+            )
+            .select_for_update(skip_locked=True)
+            .values_list("id", "current_location_latitude", "current_location_longitude")
+        )
+        # The busy check above ran on a snapshot taken before the locks: a
+        # dispatcher that committed in the meantime leaves the driver row
+        # untouched (assignments live on deliveries), so re-read it now.
+        busy = set(
+            Delivery.objects.filter(driver_id__in=[driver_id for driver_id, _, _ in drivers], status__in=BUSY_DELIVERY_STATUSES)
+            .values_list("driver_id", flat=True)
+        )
+        drivers = [driver for driver in drivers if driver[0] not in busy]
+        if not drivers:
+            return []
+
+        positions = np.array([(float(latitude), float(longitude)) for _, latitude, longitude in drivers])
+        costs = distance_matrix(origins, positions)
+        costs[costs > max_km] = np.inf
+        rows, columns = match(costs)
+        assignments = sorted((deliveries[r][0], drivers[c][0], float(costs[r, c])) for r, c in zip(rows, columns))
+        if assignments:
+            now = timezone.now()
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f"""
+                    UPDATE {Delivery._meta.db_table} AS d
+                    SET driver_id = a.driver_id, status = 1, assigned_at = %s, updated_at = %s
+                    FROM unnest(%s::bigint[], %s::bigint[]) AS a(delivery_id, driver_id)
+                    WHERE d.id = a.delivery_id
+                    """,
+                    [now, now, [a[0] for a in assignments], [a[1] for a in assignments]],
+                )
+            for delivery_id, driver_id, _ in assignments:
+                publish_delivery(delivery_id, status=1, driver=driver_id, assigned_at=now)
+    return assignments
@@ -0,0 +1,62 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from ..geo import haversine_km, within_cells
+from ..models import Address, Delivery, Driver
+
+# A driver with a delivery in one of these statuses is busy.
+BUSY_DELIVERY_STATUSES = (1, 2)
+
+
+def available_drivers():
+    busy = Delivery.objects.filter(driver=OuterRef("pk"), status__in=BUSY_DELIVERY_STATUSES)
+    return Driver.objects.filter(is_active=True, location_cell__isnull=False).exclude(Exists(busy))
+
+
+def pickup_points(restaurant_ids):
+    """
+    ``{restaurant_id: (latitude, longitude)}`` from each restaurant's own
+    address (one without a customer), lowest id first.
+    """
+    points = {}
+    for restaurant_id, latitude, longitude in (
+        Address.objects.filter(
+            restaurant_id__in=restaurant_ids, customer__isnull=True, latitude__isnull=False, longitude__isnull=False
+        )
+        .order_by("-id")
+        .values_list("restaurant_id", "latitude", "longitude")
+    ):
+        points[restaurant_id] = (float(latitude), float(longitude))
+    return points
+
+
+def nearest_drivers(latitude, longitude, k=5, radius_km=None, max_age=None, queryset=None):
+    """
+    The ``k`` closest drivers to a point, nearest first, each annotated with
+    ``distance_km``. Candidates are limited to the grid cells around the point
+    (an index range scan per grid row) and ranked by haversine distance in
+    SQL. The search starts at ``DRIVER_SEARCH_START_KM`` and doubles until it
+    has ``k`` drivers or reaches ``radius_km``; anything within the current
+    radius is guaranteed to be inside the scanned cells, so the ranking is
+    exact.
+    """
+    radius_km = radius_km or settings.DRIVER_SEARCH_RADIUS_KM
+    queryset = available_drivers() if queryset is None else queryset
+    if max_age is not None:
+        queryset = queryset.filter(location_updated_at__gte=timezone.now() - timedelta(seconds=max_age))
+    distance = haversine_km("current_location_latitude", "current_location_longitude", latitude, longitude)
+
+    radius = min(settings.DRIVER_SEARCH_START_KM, radius_km)
+    while True:
+        drivers = list(
+            queryset.filter(within_cells("location_cell", latitude, longitude, radius))
+            .annotate(distance_km=distance)
+            .filter(distance_km__lte=radius)
+            .order_by("distance_km", "id")[:k]
+        )
+        if len(drivers) == k or radius >= radius_km:
+            return drivers
+        radius = min(radius * 2, radius_km)
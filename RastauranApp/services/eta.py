@@ -0,0 +1,115 @@
+import numpy as np
+from django.conf import settings
+from django.db import connection
+from django.db.models import Max, OuterRef, Subquery
+from django.utils import timezone
+
+from ..geo import EARTH_RADIUS_KM
+from ..models import Delivery, OrderItem
+from ..realtime import publish_delivery
+from .drivers import pickup_points
+
+# Waiting, assigned and picked up deliveries still have an arrival to predict.
+IN_FLIGHT_STATUSES = (0, 1, 2)
+
+
+def haversine_pairs(origins, targets):
+    """Row-wise haversine distance in km between two ``(n, 2)`` arrays; NaN in, NaN out."""
+    origins, targets = np.radians(origins), np.radians(targets)
+    dlat = targets[:, 0] - origins[:, 0]
+    dlng = targets[:, 1] - origins[:, 1]
+    a = np.sin(dlat / 2) ** 2 + np.cos(origins[:, 0]) * np.cos(targets[:, 0]) * np.sin(dlng / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.minimum(np.sqrt(a), 1.0))
+
+
+def estimate_minutes(status, prep_left, driver, pickup, dropoff):
+    """
+    Vectorised ETA in minutes for arrays of deliveries.
+
+    * waiting: the food is ready, then the restaurant-to-customer leg;
+    * assigned: the later of the food and the driver reaching the restaurant,
+      then the restaurant-to-customer leg;
+    * picked up: the driver-to-customer leg.
+
+    Legs are haversine distances stretched by ``ETA_ROUTE_FACTOR`` and driven
+    at ``ETA_SPEED_KMH``. A missing driver position counts as already at the
+    restaurant; a missing pickup or drop-off yields NaN.
+    """
+    minutes_per_km = settings.ETA_ROUTE_FACTOR * 60 / settings.ETA_SPEED_KMH
+    to_restaurant = np.nan_to_num(haversine_pairs(driver, pickup), nan=0.0) * minutes_per_km
+    to_customer = haversine_pairs(pickup, dropoff) * minutes_per_km
+    driver_to_customer = haversine_pairs(driver, dropoff) * minutes_per_km
+    driver_to_customer = np.where(np.isnan(driver_to_customer), to_customer, driver_to_customer)
+
+    return np.select(
+        [status == 0, status == 1],
+        [prep_left + to_customer, np.maximum(prep_left, to_restaurant) + to_customer],
+        default=driver_to_customer,
+    )
+
+
+def recompute_etas(delivery_ids=None):
+    """
+    Refresh ``Delivery.eta_minutes`` for every in-flight delivery: one query
+    loads the inputs (with each order's longest dish prep time as a subquery),
+    NumPy computes all ETAs at once, and one UPDATE writes back only the values
+    that changed, so unchanged deliveries keep their ``updated_at`` and ETags.
+    Returns the number of deliveries updated.
+    """
+    prep = (
+        OrderItem.objects.filter(order_id=OuterRef("order_id"))
+        .values("order_id")
+        .annotate(longest=Max("dish__prep_time_minutes"))
+        .values("longest")
+    )
+    deliveries = Delivery.objects.filter(status__in=IN_FLIGHT_STATUSES)
+    if delivery_ids is not None:
+        deliveries = deliveries.filter(id__in=delivery_ids)
+    rows = list(
+        deliveries.annotate(prep_minutes=Subquery(prep)).values_list(
+            "id", "status", "order__restaurant_id", "order__placed_at", "prep_minutes",
+            "driver__current_location_latitude", "driver__current_location_longitude",
+            "order__delivery_address__latitude", "order__delivery_address__longitude",
+        )
+    )
+    if not rows:
+        return 0
+
+    def point(latitude, longitude):
+        return (float(latitude), float(longitude)) if latitude is not None and longitude is not None else (np.nan, np.nan)
+
+    now = timezone.now()
+    pickups = pickup_points({row[2] for row in rows})
+    default_prep = settings.ETA_DEFAULT_PREP_MINUTES
+    status = np.array([row[1] for row in rows])
+    prep_left = np.maximum(
+        np.array([
+            (row[4] if row[4] is not None else default_prep) - (now - row[3]).total_seconds() / 60
+            for row in rows
+        ]),
+        0,
+    )
+    driver = np.array([point(row[5], row[6]) for row in rows])
+    pickup = np.array([pickups.get(row[2], (np.nan, np.nan)) for row in rows])
+    dropoff = np.array([point(row[7], row[8]) for row in rows])
+
+    estimates = estimate_minutes(status, prep_left, driver, pickup, dropoff)
+    known = ~np.isnan(estimates)
+    ids = [row[0] for row, ok in zip(rows, known) if ok]
+    if not ids:
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE {Delivery._meta.db_table} AS d
+            SET eta_minutes = e.eta, updated_at = %s
+            FROM unnest(%s::bigint[], %s::int[]) AS e(delivery_id, eta)
+            WHERE d.id = e.delivery_id AND d.eta_minutes IS DISTINCT FROM e.eta
+            RETURNING d.id, d.eta_minutes
+            """,
+            [now, ids, np.ceil(estimates[known]).astype(int).tolist()],
+        )
+        changed = cursor.fetchall()
+    for delivery_id, eta_minutes in changed:
+        publish_delivery(delivery_id, eta_minutes=eta_minutes)
+    return len(changed)
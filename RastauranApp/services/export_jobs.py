@@ -0,0 +1,142 @@
+import gzip
+import os
+from datetime import timedelta
+from pathlib import Path
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Max, Q
+from django.utils import timezone
+
+from ..models import ExportJob
+from .exports import EXPORT_SOURCES, export_values, stream_rows
+
+# Job filters are applied to the order a row belongs to.
+FILTER_LOOKUPS = {
+    "placed_after": "placed_at__gte",
+    "placed_before": "placed_at__lt",
+    "restaurant": "restaurant_id",
+    "status": "status",
+}
+
+
+class JobTakenOver(Exception):
+    """Another worker reclaimed the job after this one missed its heartbeat."""
+
+
+def job_directory(job):
+    return Path(settings.EXPORT_ROOT) / str(job.pk)
+
+
+def chunk_path(job, number):
+    return job_directory(job) / f"part-{number:05d}.{job.file_format}.gz"
+
+
+def chunk_paths(job):
+    return [chunk_path(job, number) for number in range(1, job.chunk_count + 1)]
+
+
+def job_queryset(job):
+    model, _, prefix = EXPORT_SOURCES[job.kind]
+    lookups = {prefix + FILTER_LOOKUPS[name]: value for name, value in (job.filters or {}).items()}
+    queryset = model.objects.filter(**lookups)
+    if job.max_id is not None:
+        queryset = queryset.filter(id__lte=job.max_id)
+    return queryset
+
+
+def claim_next_job(stale_after=None):
+    """
+    Take the oldest queued job, or a running one whose worker stopped sending
+    heartbeats. ``skip_locked`` lets several workers poll the table without
+    blocking on, or double-claiming, each other's rows.
+    """
+    if stale_after is None:
+        stale_after = timedelta(seconds=settings.EXPORT_JOB_STALE_SECONDS)
+    now = timezone.now()
+    with transaction.atomic():
+        job = (
+            ExportJob.objects.select_for_update(skip_locked=True)
+            .filter(Q(status=ExportJob.QUEUED) | Q(status=ExportJob.RUNNING, heartbeat_at__lt=now - stale_after))
+            .order_by("created_at", "id")
+            .first()
+        )
+        if job is None:
+            return None
+        job.status = ExportJob.RUNNING
+        job.started_at = job.started_at or now
+        job.heartbeat_at = now
+        job.save(update_fields=["status", "started_at", "heartbeat_at", "updated_at"])
+    return job
+
+
+def export_next_chunk(job, chunk_rows):
+    """
+    Write the next ``chunk_rows`` rows after ``last_exported_id`` to their own
+    gzip member and record the progress. A chunk is only counted once its file
+    is complete, so a job interrupted mid-chunk rewrites that chunk on resume.
+    Returns False once there is nothing left to export.
+    """
+    _, columns, _ = EXPORT_SOURCES[job.kind]
+    rows = list(export_values(job_queryset(job).filter(id__gt=job.last_exported_id), columns)[:chunk_rows])
+    if not rows:
+        return False
+
+    number = job.chunk_count + 1
+    path = chunk_path(job, number)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    partial = path.with_name(f"{path.name}.{os.getpid()}.partial")
+    with gzip.open(partial, "wt", encoding="utf-8", newline="") as fh:
+        for text in stream_rows(rows, job.file_format, columns, header=number == 1):
+            fh.write(text)
+    os.replace(partial, path)
+
+    previous_id = job.last_exported_id
+    job.last_exported_id = rows[-1][0]
+    job.exported_rows += len(rows)
+    job.chunk_count = number
+    job.heartbeat_at = timezone.now()
+    updated = ExportJob.objects.filter(pk=job.pk, status=ExportJob.RUNNING, last_exported_id=previous_id).update(
+        last_exported_id=job.last_exported_id,
+        exported_rows=job.exported_rows,
+        chunk_count=job.chunk_count,
+        heartbeat_at=job.heartbeat_at,
+        updated_at=job.heartbeat_at,
+    )
+    if not updated:
+        raise JobTakenOver(job.pk)
+    return True
+
+
+def run_job(job, chunk_rows=None):
+    chunk_rows = chunk_rows or settings.EXPORT_CHUNK_ROWS
+    try:
+        if job.max_id is None:
+            # Pin the export to the rows that exist now so resumes and the
+            # progress total agree on what "everything" is.
+            state = job_queryset(job).aggregate(max_id=Max("id"), total=Count("id"))
+            job.max_id, job.total_rows = state["max_id"] or 0, state["total"]
+            job.save(update_fields=["max_id", "total_rows", "updated_at"])
+        while export_next_chunk(job, chunk_rows):
+            pass
+    except JobTakenOver:
+        return job
+    except Exception as exc:
+        job.status, job.error, job.finished_at = ExportJob.FAILED, str(exc), timezone.now()
+        job.save(update_fields=["status", "error", "finished_at", "updated_at"])
+        return job
+
+    job.status, job.finished_at = ExportJob.COMPLETED, timezone.now()
+    job.save(update_fields=["status", "finished_at", "updated_at"])
+    return job
+
+
+def read_export(job, block_size=64 * 1024):
+    """
+    The chunks are independent gzip members; concatenated they form one valid
+    gzip stream, so the download is just the files back to back.
+    """
+    for path in chunk_paths(job):
+        with open(path, "rb") as fh:
+            while block := fh.read(block_size):
+                yield block
@@ -0,0 +1,147 @@
+import logging
+import threading
+import time
+
+from django.conf import settings
+from django.db import close_old_connections, connection
+
+from ..models import Delivery, Driver
+from ..realtime import publish_driver_location
+from .eta import recompute_etas
+
+logger = logging.getLogger(__name__)
+
+# Deliveries that are assigned or picked up follow their driver.
+TRACKED_DELIVERY_STATUSES = (1, 2)
+
+
+def write_positions(positions, breadcrumbs=False):
+    """
+    Store the newest ``(recorded_at, latitude, longitude)`` per driver id with
+    one ``UPDATE ... FROM unnest(...)``. A position older than the one already
+    stored is ignored, so several processes flushing their own buffers can't
+    move a driver backwards. With ``breadcrumbs`` the positions that did move
+    a driver are appended to ``tracking_info["breadcrumbs"]`` of its active
+    deliveries in the same statement. Returns the ``(driver_id, recorded_at,
+    latitude, longitude)`` rows that moved a driver.
+    """
+    if not positions:
+        return []
+    driver_ids = list(positions)
+    recorded_at, latitudes, longitudes = (list(column) for column in zip(*positions.values()))
+    params = [driver_ids, recorded_at, latitudes, longitudes]
+    drivers, deliveries = Driver._meta.db_table, Delivery._meta.db_table
+
+    tracked_sql = "SELECT NULL WHERE FALSE"
+    if breadcrumbs:
+        tracked_sql = f"""
+            UPDATE {deliveries} AS d
+            SET tracking_info = jsonb_set(
+                    COALESCE(d.tracking_info, '{{}}'::jsonb), '{{breadcrumbs}}',
+                    COALESCE(d.tracking_info -> 'breadcrumbs', '[]'::jsonb) || jsonb_build_array(
+                        jsonb_build_object('lat', moved.latitude, 'lng', moved.longitude, 'at', moved.recorded_at)
+                    )
+                ),
+                updated_at = now()
+            FROM moved
+            WHERE d.driver_id = moved.id AND d.status = ANY(%s)
+            RETURNING d.id
+        """
+        params.append(list(TRACKED_DELIVERY_STATUSES))
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            WITH moved AS (
+                UPDATE {drivers} AS d
+                SET current_location_latitude = p.latitude,
+                    current_location_longitude = p.longitude,
+                    location_updated_at = p.recorded_at
+                FROM unnest(%s::bigint[], %s::timestamptz[], %s::numeric(9,6)[], %s::numeric(9,6)[])
+                    AS p(driver_id, recorded_at, latitude, longitude)
+                WHERE d.id = p.driver_id
+                  AND (d.location_updated_at IS NULL OR d.location_updated_at < p.recorded_at)
+                RETURNING d.id, p.recorded_at, p.latitude, p.longitude
+            ), tracked AS ({tracked_sql})
+            SELECT id, recorded_at, latitude, longitude FROM moved
+            """,
+            params,
+        )
+        return cursor.fetchall()
+
+
+class LocationBuffer:
+    """
+    Coalesces driver pings in memory, keeping only the newest position per
+    driver, and writes them out at most once per ``DRIVER_LOCATION_FLUSH_INTERVAL``
+    seconds, then refreshes the in-flight ETAs. A daemon thread flushes
+    whatever is left when pings stop arriving; an interval of 0 writes every
+    batch straight through.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = {}
+        self._last_flush = time.monotonic()
+        self._flusher = None
+
+    @property
+    def interval(self):
+        return settings.DRIVER_LOCATION_FLUSH_INTERVAL
+
+    def __len__(self):
+        return len(self._pending)
+
+    def add(self, pings):
+        with self._lock:
+            self._merge((ping["driver"], ping["recorded_at"], ping["latitude"], ping["longitude"]) for ping in pings)
+            due = time.monotonic() - self._last_flush >= self.interval
+        if due:
+            self.flush()
+        else:
+            self._ensure_flusher()
+
+    def _merge(self, pings):
+        for driver_id, recorded_at, latitude, longitude in pings:
+            current = self._pending.get(driver_id)
+            if current is None or recorded_at >= current[0]:
+                self._pending[driver_id] = (recorded_at, latitude, longitude)
+
+    def flush(self):
+        with self._lock:
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        try:
+            moved = write_positions(pending, breadcrumbs=settings.DRIVER_LOCATION_BREADCRUMBS)
+        except Exception:
+            # Put the positions back; newer pings that arrived meanwhile win.
+            with self._lock:
+                self._merge((driver_id, *position) for driver_id, position in pending.items())
+            raise
+        # Only what the guarded UPDATE stored: a ping older than the stored
+        # position would show the driver jumping backwards.
+        for driver_id, recorded_at, latitude, longitude in moved:
+            publish_driver_location(driver_id, float(latitude), float(longitude), recorded_at)
+        if moved:
+            recompute_etas()
+        return len(moved)
+
+    def _ensure_flusher(self):
+        if self._flusher is None or not self._flusher.is_alive():
+            self._flusher = threading.Thread(target=self._run_flusher, name="driver-location-flusher", daemon=True)
+            self._flusher.start()
+
+    def _run_flusher(self):
+        while True:
+            time.sleep(self.interval)
+            if not self._pending:
+                continue
+            try:
+                self.flush()
+            except Exception:
+                logger.exception("Flushing driver locations failed; retrying on the next tick.")
+            finally:
+                close_old_connections()
+
+
+location_buffer = LocationBuffer()
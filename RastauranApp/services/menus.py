@@ -0,0 +1,41 @@
+from django.db import transaction
+from django.db.models import Prefetch
+from django.utils import timezone
+
+from ..models import Restaurant, Menu, Dish, MenuDocument
+from ..serializers import MenuDocumentSerializer
+
+
+def _document_queryset():
+    dishes = Dish.objects.filter(is_available=True).order_by("name", "id")
+    menus = Menu.objects.filter(is_active=True).order_by("name", "id").prefetch_related(Prefetch("dishes", queryset=dishes))
+    return Restaurant.objects.prefetch_related(Prefetch("menus", queryset=menus))
+
+
+def rebuild_menu_documents(restaurant_ids):
+    """
+    Rebuild the stored full-menu document of each restaurant from its active
+    menus and available dishes, or drop it if the restaurant is gone. Each
+    rebuild locks the restaurant row first, so concurrent rebuilds run one
+    after another and the last one to finish reads the latest committed menu.
+    Returns the number of documents written.
+    """
+    built = 0
+    for restaurant_id in sorted(set(restaurant_ids)):
+        with transaction.atomic():
+            restaurant = _document_queryset().select_for_update(no_key=True).filter(pk=restaurant_id).first()
+            if restaurant is None:
+                MenuDocument.objects.filter(restaurant_id=restaurant_id).delete()
+                continue
+            MenuDocument.objects.update_or_create(
+                restaurant=restaurant,
+                defaults={"document": MenuDocumentSerializer(restaurant).data, "built_at": timezone.now()},
+            )
+            built += 1
+    return built
+
+
+def schedule_menu_rebuild(restaurant_id):
+    """Rebuild the restaurant's menu document once the current transaction commits."""
+    if restaurant_id is not None:
+        transaction.on_commit(lambda: rebuild_menu_documents([restaurant_id]))
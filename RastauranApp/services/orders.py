@@ -0,0 +1,246 @@
+from django.db import connection, transaction
+from rest_framework.exceptions import ValidationError
+
+from django.utils import timezone
+
+from ..models import Restaurant, Customer, Address, Dish, Order, OrderItem, Delivery, Payment
+from ..realtime import publish_delivery
+
+# Order status -> the statuses it may be reached from.
+ORDER_TRANSITIONS = {1: (0,), 2: (1,)}
+# Order status -> the delivery status it implies, with the timestamp to stamp.
+DELIVERY_CASCADE = {2: (3, "delivered_at")}
+
+
+def _lookup(carts):
+    """Everything the carts reference, fetched with one IN query per table."""
+    dish_ids = {item["dish"] for cart in carts for item in cart["items"]}
+    dishes = {
+        dish.id: dish
+        for dish in Dish.objects.filter(id__in=dish_ids)
+        .select_related("menu")
+        .only("id", "restaurant_id", "name", "price", "currency", "is_available", "menu__is_active")
+    }
+    customers = set(
+        Customer.objects.filter(id__in={cart["customer"] for cart in carts}, is_active=True).values_list("id", flat=True)
+    )
+    restaurants = set(
+        Restaurant.objects.filter(id__in={cart["restaurant"] for cart in carts}, is_active=True)
+        .values_list("id", flat=True)
+    )
+    address_ids = {cart["delivery_address"] for cart in carts if cart.get("delivery_address")}
+    addresses = dict(Address.objects.filter(id__in=address_ids).values_list("id", "customer_id")) if address_ids else {}
+    return dishes, customers, restaurants, addresses
+
+
+def _validate_cart(cart, dishes, customers, restaurants, addresses):
+    errors = {}
+    if cart["customer"] not in customers:
+        errors["customer"] = ["Unknown or inactive customer."]
+    if cart["restaurant"] not in restaurants:
+        errors["restaurant"] = ["Unknown or inactive restaurant."]
+    address = cart.get("delivery_address")
+    if address and addresses.get(address) != cart["customer"]:
+        errors["delivery_address"] = ["Address does not belong to this customer."]
+
+    item_errors = []
+    for item in cart["items"]:
+        dish = dishes.get(item["dish"])
+        if dish is None or dish.restaurant_id != cart["restaurant"]:
+            item_errors.append({"dish": ["Dish is not on this restaurant's menu."]})
+        elif not (dish.is_available and dish.menu.is_active):
+            item_errors.append({"dish": ["Dish is not available."]})
+        elif item.get("unit_price") is not None and item["unit_price"] != dish.price:
+            item_errors.append({"unit_price": [f"Price changed to {dish.price}."]})
+        elif dish.currency != cart["currency"]:
+            item_errors.append({"dish": [f"Dish is priced in {dish.currency}."]})
+        else:
+            item_errors.append({})
+    if any(item_errors):
+        errors["items"] = item_errors
+    return errors
+
+
+def place_orders(carts):
+    """
+    Validate a batch of carts (validated ``CartSerializer`` data) against the
+    catalog and write their orders, items and pending payments in one
+    transaction. Prices and totals are always taken from ``Dish``. The whole
+    batch is rejected if any cart is invalid.
+
+    The returned orders carry ``placed_items`` and ``placed_payment``.
+    """
+    dishes, customers, restaurants, addresses = _lookup(carts)
+    errors = [_validate_cart(cart, dishes, customers, restaurants, addresses) for cart in carts]
+    if any(errors):
+        raise ValidationError(errors)
+
+    orders, items, payments = [], [], []
+    for cart in carts:
+        lines = [
+            OrderItem(
+                dish_id=item["dish"],
+                name=dishes[item["dish"]].name,
+                unit_price=dishes[item["dish"]].price,
+                quantity=item["quantity"],
+                total_price=dishes[item["dish"]].price * item["quantity"],
+            )
+            for item in cart["items"]
+        ]
+        order = Order(
+            customer_id=cart["customer"],
+            restaurant_id=cart["restaurant"],
+            delivery_address_id=cart.get("delivery_address"),
+            total_amount=sum(line.total_price for line in lines),
+            currency=cart["currency"],
+            notes=cart.get("notes"),
+        )
+        order.placed_items = lines
+        order.placed_payment = Payment(
+            provider=cart.get("provider"), amount=order.total_amount, currency=cart["currency"]
+        )
+        orders.append(order)
+
+    with transaction.atomic():
+        Order.objects.bulk_create(orders)
+        for order in orders:
+            for line in order.placed_items:
+                line.order = order
+                items.append(line)
+            order.placed_payment.order = order
+            payments.append(order.placed_payment)
+        OrderItem.objects.bulk_create(items)
+        Payment.objects.bulk_create(payments)
+    return orders
+
+
+def _order_filter(column, order_ids):
+    if order_ids is None:
+        return "", []
+    return f" AND {column} = ANY(%s)", [list(order_ids)]
+
+
+def _drifted_orders_sql(order_ids):
+    """
+    ``SELECT id, stored_total, computed_total`` for orders whose total differs
+    from the sum of their items. Driven from orders, so an order whose last
+    item was deleted is computed as 0 rather than missed.
+    """
+    items, orders = OrderItem._meta.db_table, Order._meta.db_table
+    item_filter, item_params = _order_filter("order_id", order_ids)
+    order_filter, order_params = _order_filter("o.id", order_ids)
+    sql = f"""
+        SELECT o.id, o.total_amount, COALESCE(s.total, 0) AS total
+        FROM {orders} AS o
+        LEFT JOIN (
+            SELECT order_id, SUM(unit_price * quantity) AS total
+            FROM {items} WHERE TRUE{item_filter}
+            GROUP BY order_id
+        ) AS s ON s.order_id = o.id
+        WHERE o.total_amount IS DISTINCT FROM COALESCE(s.total, 0){order_filter}
+    """
+    return sql, item_params + order_params
+
+
+def recompute_order_totals(order_ids=None):
+    """
+    Rebuild ``OrderItem.total_price`` and ``Order.total_amount`` from
+    ``unit_price * quantity`` with two set-based statements. Only rows whose
+    stored value differs are written; orders without items total 0.
+    ``order_ids=None`` covers every order. Returns ``(items_fixed, orders_fixed)``.
+    """
+    items, orders = OrderItem._meta.db_table, Order._meta.db_table
+    item_filter, item_params = _order_filter("order_id", order_ids)
+    drifted_sql, drifted_params = _drifted_orders_sql(order_ids)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"UPDATE {items} SET total_price = unit_price * quantity "
+            f"WHERE total_price IS DISTINCT FROM unit_price * quantity{item_filter}",
+            item_params,
+        )
+        items_fixed = cursor.rowcount
+        cursor.execute(
+            f"""
+            UPDATE {orders} AS o SET total_amount = d.total, updated_at = now()
+            FROM ({drifted_sql}) AS d
+            WHERE o.id = d.id
+            """,
+            drifted_params,
+        )
+        orders_fixed = cursor.rowcount
+    return items_fixed, orders_fixed
+
+
+def find_total_mismatches(order_ids=None, limit=None):
+    """
+    Set-based reconciliation report. Returns up to ``limit`` mismatching
+    orders as ``(order_id, stored_total, computed_total)`` rows, the total
+    number of mismatching orders and the number of items whose
+    ``total_price`` is inconsistent.
+    """
+    items = OrderItem._meta.db_table
+    item_filter, item_params = _order_filter("order_id", order_ids)
+    drifted_sql, drifted_params = _drifted_orders_sql(order_ids)
+    limit_sql = " LIMIT %s" if limit is not None else ""
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"SELECT COUNT(*) FROM {items} WHERE total_price IS DISTINCT FROM unit_price * quantity{item_filter}",
+            item_params,
+        )
+        [item_mismatches] = cursor.fetchone()
+        cursor.execute(f"SELECT COUNT(*) FROM ({drifted_sql}) AS d", drifted_params)
+        [order_mismatches] = cursor.fetchone()
+        cursor.execute(
+            f"{drifted_sql} ORDER BY o.id{limit_sql}",
+            drifted_params + ([limit] if limit is not None else []),
+        )
+        rows = cursor.fetchall()
+    return rows, order_mismatches, item_mismatches
+
+
+def transition_orders(order_ids, status):
+    """
+    Move orders to ``status`` in one statement, whatever the batch size. The
+    ``WHERE`` clause only matches orders in an allowed source status, so
+    illegal transitions are skipped by the database rather than checked row
+    by row, and the linked deliveries are updated from the same ``RETURNING``
+    set, so both tables change together or not at all. Returns ``(moved_ids, rejected_ids, deliveries_updated)``.
+    """
+    if status not in ORDER_TRANSITIONS:
+        raise ValueError(f"Orders cannot be moved to status {status!r}.")
+    order_ids = sorted(set(order_ids))
+    if not order_ids:
+        return [], [], 0
+
+    orders, deliveries = Order._meta.db_table, Delivery._meta.db_table
+    now = timezone.now()
+    params = [status, now, order_ids, list(ORDER_TRANSITIONS[status])]
+    cascade_sql = "SELECT NULL::bigint AS id WHERE FALSE"
+    if status in DELIVERY_CASCADE:
+        delivery_status, stamp = DELIVERY_CASCADE[status]
+        cascade_sql = (
+            f"UPDATE {deliveries} AS d SET status = %s, {stamp} = COALESCE(d.{stamp}, %s), updated_at = %s "
+            f"FROM moved WHERE d.order_id = moved.id RETURNING d.id"
+        )
+        params += [delivery_status, now, now]
+
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            WITH moved AS (
+                UPDATE {orders} SET status = %s, updated_at = %s
+                WHERE id = ANY(%s) AND status = ANY(%s)
+                RETURNING id
+            ), cascaded AS ({cascade_sql})
+            SELECT COALESCE((SELECT array_agg(id ORDER BY id) FROM moved), '{{}}'),
+                   COALESCE((SELECT array_agg(id ORDER BY id) FROM cascaded), '{{}}')
+            """,
+            params,
+        )
+        moved_ids, delivery_ids = cursor.fetchone()
+    if status in DELIVERY_CASCADE:
+        delivery_status, stamp = DELIVERY_CASCADE[status]
+        for delivery_id in delivery_ids:
+            publish_delivery(delivery_id, status=delivery_status, **{stamp: now})
+    moved = set(moved_ids)
+    return moved_ids, [order_id for order_id in order_ids if order_id not in moved], len(delivery_ids)
@@ -0,0 +1,85 @@
+from django.db import connection
+from django.utils import timezone
+
+from ..cache import bump_scopes
+from ..models import Restaurant, Comment
+
+# rating = ROUND(sum / count, 2), or NULL without rated comments; {sum} and {count} are the new values.
+RATING_SQL = "CASE WHEN {count} > 0 THEN ROUND(({sum})::numeric / ({count}), 2) END"
+
+
+def rating_contribution(restaurant_id, rating, is_active):
+    """What one comment adds to its restaurant's ``(rating_sum, rating_count)``."""
+    if restaurant_id is None or rating is None or not is_active:
+        return None
+    return restaurant_id, rating
+
+
+def apply_rating_changes(before, after):
+    """
+    Move one comment's contribution from ``before`` to ``after`` (each a
+    ``rating_contribution`` or None) with relative updates, so concurrent
+    comments on the same restaurant serialise on its row instead of
+    overwriting each other. Call inside the comment write's transaction.
+    """
+    deltas = {}
+    for contribution, sign in ((before, -1), (after, 1)):
+        if contribution is not None:
+            restaurant_id, rating = contribution
+            sum_delta, count_delta = deltas.get(restaurant_id, (0, 0))
+            deltas[restaurant_id] = (sum_delta + sign * rating, count_delta + sign)
+    deltas = {restaurant_id: delta for restaurant_id, delta in deltas.items() if delta != (0, 0)}
+    if not deltas:
+        return 0
+
+    ids = sorted(deltas)
+    rating = RATING_SQL.format(sum="r.rating_sum + d.sum_delta", count="r.rating_count + d.count_delta")
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"""
+            UPDATE {Restaurant._meta.db_table} AS r
+            SET rating_sum = r.rating_sum + d.sum_delta, rating_count = r.rating_count + d.count_delta,
+                rating = {rating}, updated_at = %s
+            FROM unnest(%s::bigint[], %s::int[], %s::int[]) AS d(restaurant_id, sum_delta, count_delta)
+            WHERE r.id = d.restaurant_id
+            """,
+            [timezone.now(), ids, [deltas[i][0] for i in ids], [deltas[i][1] for i in ids]],
+        )
+        return cursor.rowcount
+
+
+def rebuild_ratings(low, high, dry_run=False):
+    """
+    Recompute the aggregates of restaurants with ``low < id <= high`` from
+    their active comments, touching only rows that drifted. Returns how many
+    drifted (and were fixed unless ``dry_run``). The repaired restaurants'
+    cached payloads are invalidated once the transaction commits.
+    """
+    restaurants, comments = Restaurant._meta.db_table, Comment._meta.db_table
+    actual = f"""
+        SELECT r.id, COALESCE(SUM(c.rating), 0) AS total, COUNT(c.rating) AS n
+        FROM {restaurants} AS r
+        LEFT JOIN {comments} AS c ON c.restaurant_id = r.id AND c.is_active
+        WHERE r.id > %s AND r.id <= %s
+        GROUP BY r.id
+    """
+    rating = RATING_SQL.format(sum="a.total", count="a.n")
+    drifted = f"(r.rating_sum, r.rating_count, r.rating) IS DISTINCT FROM (a.total, a.n, {rating})"
+    with connection.cursor() as cursor:
+        if dry_run:
+            cursor.execute(f"SELECT COUNT(*) FROM {restaurants} AS r JOIN ({actual}) AS a ON a.id = r.id WHERE {drifted}", [low, high])
+            return cursor.fetchone()[0]
+        cursor.execute(
+            f"""
+            UPDATE {restaurants} AS r
+            SET rating_sum = a.total, rating_count = a.n, rating = {rating}, updated_at = %s
+            FROM ({actual}) AS a
+            WHERE r.id = a.id AND {drifted}
+            RETURNING r.id
+            """,
+            [timezone.now(), low, high],
+        )
+        repaired = [restaurant_id for (restaurant_id,) in cursor.fetchall()]
+    if repaired:
+        bump_scopes("restaurants", *(f"restaurant:{restaurant_id}" for restaurant_id in repaired))
+    return len(repaired)
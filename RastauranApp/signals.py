@@ -0,0 +1,70 @@
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from .cache import bump_scopes
+from .models import Restaurant, Menu, Dish, Comment, Delivery
+from .realtime import publish_delivery
+from .services.menus import schedule_menu_rebuild
+from .services.ratings import apply_rating_changes, rating_contribution
+
+
+@receiver([post_save, post_delete], sender=Restaurant)
+def _invalidate_restaurant(sender, instance, **kwargs):
+    # Menu and dish payloads embed the restaurant name.
+    bump_scopes("restaurants", "menus", "dishes", f"restaurant:{instance.pk}")
+
+
+@receiver(pre_save, sender=Menu)
+@receiver(pre_save, sender=Dish)
+def _remember_restaurant(sender, instance, update_fields=None, **kwargs):
+    # A menu or dish moved to another restaurant also changes the one it left.
+    if instance._state.adding or (update_fields is not None and "restaurant" not in update_fields):
+        return
+    instance._previous_restaurant_id = sender.objects.filter(pk=instance.pk).values_list("restaurant_id", flat=True).first()
+
+
+def _restaurants_of(instance):
+    previous = instance.__dict__.pop("_previous_restaurant_id", None)
+    return {instance.restaurant_id, previous} - {None}
+
+
+@receiver([post_save, post_delete], sender=Menu)
+def _invalidate_menu(sender, instance, **kwargs):
+    for restaurant_id in _restaurants_of(instance):
+        bump_scopes("menus", f"restaurant:{restaurant_id}")
+        schedule_menu_rebuild(restaurant_id)
+
+
+@receiver([post_save, post_delete], sender=Dish)
+def _invalidate_dish(sender, instance, **kwargs):
+    for restaurant_id in _restaurants_of(instance):
+        bump_scopes("dishes", f"restaurant:{restaurant_id}")
+        schedule_menu_rebuild(restaurant_id)
+
+
+@receiver(post_save, sender=Restaurant)
+def _rebuild_restaurant_menu(sender, instance, **kwargs):
+    # The menu document embeds the restaurant's name and contacts; deleting
+    # the restaurant cascades to its document.
+    schedule_menu_rebuild(instance.pk)
+
+
+@receiver([post_save, post_delete], sender=Comment)
+def _invalidate_comment(sender, instance, **kwargs):
+    # Restaurant payloads embed the rating; the detail also embeds the comment count.
+    bump_scopes("restaurants", f"restaurant:{instance.restaurant_id}")
+
+
+@receiver(post_delete, sender=Comment)
+def _drop_comment_rating(sender, instance, **kwargs):
+    # Sent inside the deletion's transaction, for single and bulk deletes alike.
+    apply_rating_changes(rating_contribution(instance.restaurant_id, instance.rating, instance.is_active), None)
+
+
+@receiver(post_save, sender=Delivery)
+def _publish_delivery(sender, instance, **kwargs):
+    # Admin and API edits; bulk service writes publish their own events.
+    publish_delivery(
+        instance.pk, status=instance.status, driver=instance.driver_id, eta_minutes=instance.eta_minutes,
+        assigned_at=instance.assigned_at, picked_at=instance.picked_at, delivered_at=instance.delivered_at,
+    )
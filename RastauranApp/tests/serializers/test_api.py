@@ -32,25 +32,25 @@ class RestaurantAPITest(APITestCase):
     def test_search_restaurant_by_name(self):
         response = self.client.get(reverse('restaurant-list'), {'search': 'pizza'})
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['name'], 'Pizza Palace')
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['name'], 'Pizza Palace')
 
     def test_search_restaurant_by_description(self):
         response = self.client.get(reverse('restaurant-list'), {'search': 'burgers'})
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['name'], 'Burger King')
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['name'], 'Burger King')
 
     def test_filter_restaurant_by_active(self):
         response = self.client.get(reverse('restaurant-list'), {'is_active': 'true'})
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 2)
+        self.assertEqual(len(response.data['results']), 2)
 
     def test_filter_restaurant_by_rating(self):
         response = self.client.get(reverse('restaurant-list'), {'rating': 4.5})
         self.assertEqual(response.status_code, 200)
-        self.assertEqual(len(response.data), 1)
-        self.assertEqual(response.data[0]['name'], 'Pizza Palace')
+        self.assertEqual(len(response.data['results']), 1)
+        self.assertEqual(response.data['results'][0]['name'], 'Pizza Palace')
 
     def test_session_authentication(self):
         self.client.login(username='testuser', password='testpass123')
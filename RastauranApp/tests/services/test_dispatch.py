@@ -0,0 +1,126 @@
+import threading
+import unittest
+from unittest import mock
+from decimal import Decimal
+
+import numpy as np
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from RastauranApp.models import Restaurant, Customer, Address, Driver, Order, Delivery
+from RastauranApp.services import dispatch
+from RastauranApp.services.dispatch import dispatch_waiting, distance_matrix, greedy_match, hungarian_match
+
+INF = np.inf
+
+
+def make_fleet(restaurant_points, driver_points):
+    customer = Customer.objects.create(first_name='Alice', email='alice@example.com')
+    deliveries = []
+    for i, point in enumerate(restaurant_points):
+        restaurant = Restaurant.objects.create(name=f'Restaurant {i}')
+        if point is not None:
+            Address.objects.create(restaurant=restaurant, street='Main st', latitude=Decimal(str(point[0])), longitude=Decimal(str(point[1])))
+        order = Order.objects.create(customer=customer, restaurant=restaurant, total_amount=Decimal('10.00'))
+        deliveries.append(Delivery.objects.create(order=order))
+    drivers = [
+        Driver.objects.create(first_name=f'Driver {i}', current_location_latitude=Decimal(str(lat)), current_location_longitude=Decimal(str(lng)))
+        for i, (lat, lng) in enumerate(driver_points)
+    ]
+    return deliveries, drivers
+
+
+class MatchingTest(TestCase):
+    def test_greedy_takes_cheapest_pairs_first(self):
+        costs = np.array([[1.0, 2.0, 9.0], [1.5, 8.0, 9.0]])
+        rows, columns = greedy_match(costs)
+        self.assertEqual(sorted(zip(rows.tolist(), columns.tolist())), [(0, 0), (1, 1)])
+
+    def test_greedy_widens_candidates_and_skips_infeasible_pairs(self):
+        costs = np.array([[1.0, 5.0, INF], [2.0, 3.0, 7.0], [INF, INF, INF]])
+        rows, columns = greedy_match(costs, candidates=1)
+        self.assertEqual(sorted(zip(rows.tolist(), columns.tolist())), [(0, 0), (1, 1)])
+
+    def test_distance_matrix(self):
+        distances = distance_matrix(np.array([[41.3, 69.2]]), np.array([[41.3, 69.2], [41.4, 69.2]]))
+        self.assertAlmostEqual(distances[0, 0], 0.0)
+        self.assertAlmostEqual(distances[0, 1], 11.12, places=2)
+
+    @unittest.skipIf(dispatch.linear_sum_assignment is None, 'scipy is not installed')
+    def test_hungarian_minimises_total_cost(self):
+        costs = np.array([[1.0, 2.0], [1.5, 8.0]])
+        rows, columns = hungarian_match(costs)
+        self.assertEqual(list(zip(rows.tolist(), columns.tolist())), [(0, 1), (1, 0)])
+
+
+@override_settings(DISPATCH_MATCHING='greedy', DISPATCH_MAX_KM=10)
+class DispatchWaitingTest(TestCase):
+    def test_assigns_nearest_free_drivers_in_one_batch(self):
+        deliveries, drivers = make_fleet(
+            [(41.30, 69.20), (41.35, 69.25), None, (41.00, 70.00)],
+            [(41.351, 69.251), (41.301, 69.201), (41.302, 69.202)],
+        )
+        busy_order = Order.objects.create(customer=Customer.objects.get(), restaurant=Restaurant.objects.first(), total_amount=Decimal('1.00'))
+        Delivery.objects.create(order=busy_order, driver=drivers[2], status=2)
+
+        assignments = dispatch_waiting()
+        self.assertEqual(
+            [(delivery_id, driver_id) for delivery_id, driver_id, _ in assignments],
+            [(deliveries[0].id, drivers[1].id), (deliveries[1].id, drivers[0].id)],
+        )
+        self.assertTrue(all(distance < 1 for _, _, distance in assignments))
+
+        delivery = Delivery.objects.get(pk=deliveries[0].pk)
+        self.assertEqual((delivery.driver_id, delivery.status), (drivers[1].id, 1))
+        self.assertIsNotNone(delivery.assigned_at)
+        # No address, and too far from every driver.
+        self.assertEqual(Delivery.objects.filter(pk__in=[deliveries[2].pk, deliveries[3].pk], driver__isnull=True).count(), 2)
+        self.assertEqual(dispatch_waiting(), [])
+
+    def test_more_deliveries_than_drivers(self):
+        deliveries, drivers = make_fleet([(41.30, 69.20), (41.31, 69.21), (41.32, 69.22)], [(41.311, 69.211)])
+        assignments = dispatch_waiting()
+        self.assertEqual([(delivery_id, driver_id) for delivery_id, driver_id, _ in assignments], [(deliveries[1].id, drivers[0].id)])
+
+
+class ConcurrentDispatchTest(TransactionTestCase):
+    def test_skips_rows_locked_by_another_dispatcher(self):
+        if not connection.features.has_select_for_update_skip_locked:
+            self.skipTest('Database does not support SKIP LOCKED.')
+        deliveries, drivers = make_fleet([(41.30, 69.20), (41.31, 69.21)], [(41.301, 69.201), (41.311, 69.211)])
+        locked, release = threading.Event(), threading.Event()
+
+        def hold_first_delivery():
+            try:
+                with transaction.atomic():
+                    list(Delivery.objects.select_for_update().filter(pk=deliveries[0].pk))
+                    list(Driver.objects.select_for_update().filter(pk=drivers[0].pk))
+                    locked.set()
+                    release.wait(10)
+            finally:
+                connection.close()
+
+        holder = threading.Thread(target=hold_first_delivery)
+        holder.start()
+        self.assertTrue(locked.wait(10))
+        try:
+            assignments = dispatch_waiting(matching='greedy', max_km=10)
+        finally:
+            release.set()
+            holder.join()
+
+        self.assertEqual([(delivery_id, driver_id) for delivery_id, driver_id, _ in assignments], [(deliveries[1].id, drivers[1].id)])
+        self.assertIsNone(Delivery.objects.get(pk=deliveries[0].pk).driver_id)
+
+    def test_overlapping_pass_does_not_reassign_a_busy_driver(self):
+        if not connection.features.has_select_for_update_skip_locked:
+            self.skipTest('Database does not support SKIP LOCKED.')
+        deliveries, drivers = make_fleet([(41.30, 69.20), (41.31, 69.21)], [(41.301, 69.201)])
+        first = dispatch_waiting(matching='greedy', max_km=10, delivery_ids=[deliveries[0].id])
+        self.assertEqual([driver_id for _, driver_id, _ in first], [drivers[0].id])
+
+        # A second pass whose candidate query ran on a snapshot from before the
+        # first pass committed still sees the driver as idle.
+        stale = Driver.objects.filter(is_active=True, location_cell__isnull=False)
+        with mock.patch.object(dispatch, 'available_drivers', return_value=stale):
+            self.assertEqual(dispatch_waiting(matching='greedy', max_km=10), [])
+        self.assertIsNone(Delivery.objects.get(pk=deliveries[1].pk).driver_id)
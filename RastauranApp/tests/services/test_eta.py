@@ -0,0 +1,85 @@
+from datetime import timedelta
+from decimal import Decimal
+
+import numpy as np
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from RastauranApp.models import Restaurant, Menu, Dish, Customer, Address, Driver, Order, OrderItem, Delivery
+from RastauranApp.services.eta import estimate_minutes, recompute_etas
+
+RESTAURANT = (Decimal('41.300000'), Decimal('69.200000'))
+CUSTOMER = (Decimal('41.390000'), Decimal('69.200000'))  # about 10 km north
+LEG_MINUTES = 20.01  # 10.007 km at 30 km/h
+
+
+@override_settings(ETA_SPEED_KMH=30, ETA_ROUTE_FACTOR=1, ETA_DEFAULT_PREP_MINUTES=15)
+class EtaTest(APITestCase):
+    def setUp(self):
+        self.restaurant = Restaurant.objects.create(name='Pizza Palace')
+        Address.objects.create(restaurant=self.restaurant, street='Kitchen st', latitude=RESTAURANT[0], longitude=RESTAURANT[1])
+        menu = Menu.objects.create(restaurant=self.restaurant, name='Main')
+        self.slow = Dish.objects.create(menu=menu, restaurant=self.restaurant, name='Plov', price=Decimal('8.00'), prep_time_minutes=25)
+        self.quick = Dish.objects.create(menu=menu, restaurant=self.restaurant, name='Tea', price=Decimal('1.00'), prep_time_minutes=2)
+        self.customer = Customer.objects.create(first_name='Alice', email='alice@example.com')
+        self.address = Address.objects.create(customer=self.customer, street='Home st', latitude=CUSTOMER[0], longitude=CUSTOMER[1])
+
+    def _delivery(self, status, driver_at=None, dishes=None, placed_minutes_ago=0):
+        order = Order.objects.create(
+            customer=self.customer, restaurant=self.restaurant, delivery_address=self.address, total_amount=Decimal('9.00')
+        )
+        Order.objects.filter(pk=order.pk).update(placed_at=timezone.now() - timedelta(minutes=placed_minutes_ago))
+        for dish in dishes if dishes is not None else (self.slow, self.quick):
+            OrderItem.objects.create(order=order, dish=dish, name=dish.name, unit_price=dish.price, quantity=1, total_price=dish.price)
+        driver = None
+        if driver_at is not None:
+            driver = Driver.objects.create(first_name='Dan', current_location_latitude=driver_at[0], current_location_longitude=driver_at[1])
+        return Delivery.objects.create(order=order, driver=driver, status=status)
+
+    def _eta(self, delivery):
+        return Delivery.objects.get(pk=delivery.pk).eta_minutes
+
+    def test_each_stage_uses_its_own_legs(self):
+        waiting = self._delivery(0)
+        assigned_far = self._delivery(1, driver_at=(Decimal('41.000000'), Decimal('69.200000')))  # 33 km south
+        assigned_near = self._delivery(1, driver_at=RESTAURANT)
+        picked = self._delivery(2, driver_at=(Decimal('41.345000'), Decimal('69.200000')))
+        default_prep = self._delivery(0, dishes=[])
+        delivered = self._delivery(3, driver_at=CUSTOMER)
+
+        self.assertEqual(recompute_etas(), 5)
+        self.assertAlmostEqual(self._eta(waiting), 25 + LEG_MINUTES, delta=1)
+        self.assertAlmostEqual(self._eta(assigned_far), 66.7 + LEG_MINUTES, delta=1)
+        self.assertAlmostEqual(self._eta(assigned_near), 25 + LEG_MINUTES, delta=1)
+        self.assertAlmostEqual(self._eta(picked), LEG_MINUTES / 2, delta=1)
+        self.assertAlmostEqual(self._eta(default_prep), 15 + LEG_MINUTES, delta=1)
+        self.assertIsNone(self._eta(delivered))
+
+    def test_elapsed_prep_time_is_discounted(self):
+        delivery = self._delivery(0, placed_minutes_ago=40)
+        recompute_etas()
+        self.assertEqual(self._eta(delivery), 21)
+
+    def test_batch_uses_constant_queries_and_skips_unchanged_rows(self):
+        deliveries = [self._delivery(1, driver_at=RESTAURANT, placed_minutes_ago=60) for _ in range(5)]
+        with self.assertNumQueries(3):
+            self.assertEqual(recompute_etas(), 5)
+        stamp = Delivery.objects.get(pk=deliveries[0].pk).updated_at
+        self.assertEqual(recompute_etas(), 0)
+        self.assertEqual(Delivery.objects.get(pk=deliveries[0].pk).updated_at, stamp)
+
+    def test_detail_serves_the_stored_value(self):
+        delivery = self._delivery(2, driver_at=RESTAURANT)
+        recompute_etas()
+        response = self.client.get(reverse('delivery-detail', args=[delivery.pk]))
+        self.assertEqual(response.data['eta_minutes'], self._eta(delivery))
+
+    def test_estimate_without_coordinates_is_nan(self):
+        nan = (np.nan, np.nan)
+        estimates = estimate_minutes(
+            np.array([0, 2]), np.array([5.0, 0.0]),
+            np.array([nan, nan]), np.array([nan, (41.3, 69.2)]), np.array([(41.3, 69.2), (41.3, 69.2)]),
+        )
+        self.assertTrue(np.isnan(estimates[0]))
+        self.assertEqual(estimates[1], 0.0)
@@ -0,0 +1,118 @@
+import csv
+import gzip
+import io
+import json
+import tempfile
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from RastauranApp.models import Restaurant, Customer, Order, Payment, ExportJob
+from RastauranApp.services.export_jobs import chunk_paths, claim_next_job, export_next_chunk, run_job
+
+
+class ExportJobTest(APITestCase):
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        settings_override = override_settings(EXPORT_ROOT=tmp.name)
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+        self.restaurant = Restaurant.objects.create(name='Pizza Palace')
+        other = Restaurant.objects.create(name='Grill House')
+        customer = Customer.objects.create(first_name='Alice', last_name='Smith', email='alice@example.com')
+        self.orders = [
+            Order.objects.create(customer=customer, restaurant=self.restaurant, total_amount=Decimal('10.00'))
+            for _ in range(5)
+        ]
+        Order.objects.create(customer=customer, restaurant=other, total_amount=Decimal('3.00'))
+        for order in self.orders[:3]:
+            Payment.objects.create(order=order, provider='card', amount=Decimal('10.00'))
+
+        self.user = User.objects.create_user(username='exporter', password='testpass123')
+        self.client.force_authenticate(self.user)
+
+    def _enqueue(self, **payload):
+        response = self.client.post(reverse('export-job-list'), payload, format='json')
+        self.assertEqual(response.status_code, 202, response.data)
+        return ExportJob.objects.get(pk=response.data['id'])
+
+    def _download(self, job):
+        response = self.client.get(reverse('export-job-download', args=[job.pk]))
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['Content-Type'], 'application/gzip')
+        return gzip.decompress(b''.join(response.streaming_content)).decode()
+
+    def test_worker_exports_in_chunks_and_reports_progress(self):
+        job = self._enqueue(kind='orders', filters={'restaurant': self.restaurant.id})
+        self.assertEqual(self.client.get(reverse('export-job-detail', args=[job.pk])).data['status'], ExportJob.QUEUED)
+
+        out = StringIO()
+        call_command('run_export_worker', once=True, chunk_rows=2, stdout=out)
+        self.assertIn(f'Export {job.pk} completed: 5 row(s) in 3 chunk(s)', out.getvalue())
+
+        data = self.client.get(reverse('export-job-detail', args=[job.pk])).data
+        self.assertEqual((data['status'], data['progress'], data['total_rows']), (ExportJob.COMPLETED, 100.0, 5))
+        self.assertTrue(data['download_url'].endswith(reverse('export-job-download', args=[job.pk])))
+
+        rows = list(csv.reader(io.StringIO(self._download(job))))
+        self.assertEqual(rows[0][:3], ['id', 'customer_id', 'customer_name'])
+        self.assertEqual([int(row[0]) for row in rows[1:]], [order.id for order in self.orders])
+
+    def test_resumes_after_the_last_written_chunk(self):
+        job = self._enqueue(kind='orders', file_format='ndjson')
+        job = claim_next_job()
+        job.max_id, job.total_rows = Order.objects.order_by('-id').values_list('id', flat=True)[0], 6
+        job.save()
+        self.assertTrue(export_next_chunk(job, 4))
+
+        # The worker dies; rows created afterwards are not part of this export.
+        ExportJob.objects.filter(pk=job.pk).update(heartbeat_at=timezone.now() - timedelta(hours=1))
+        Order.objects.create(customer=self.orders[0].customer, restaurant=self.restaurant, total_amount=Decimal('1.00'))
+        self.assertIsNone(claim_next_job(stale_after=timedelta(hours=2)))
+
+        resumed = claim_next_job(stale_after=timedelta(minutes=5))
+        self.assertEqual((resumed.pk, resumed.last_exported_id), (job.pk, job.last_exported_id))
+        run_job(resumed, chunk_rows=4)
+
+        self.assertEqual(len(chunk_paths(resumed)), 2)
+        ids = [json.loads(line)['id'] for line in self._download(resumed).splitlines()]
+        self.assertEqual(ids, sorted(set(ids)))
+        self.assertEqual(len(ids), 6)
+
+    def test_payments_filtered_through_their_order(self):
+        since = (timezone.now() - timedelta(days=1)).isoformat()
+        job = self._enqueue(kind='payments', file_format='ndjson', filters={'placed_after': since, 'status': 0})
+        run_job(claim_next_job())
+        records = [json.loads(line) for line in self._download(job).splitlines()]
+        self.assertEqual([record['order_id'] for record in records], [order.id for order in self.orders[:3]])
+        self.assertEqual(records[0]['amount'], '10.00')
+
+    def test_failed_job_records_the_error(self):
+        job = ExportJob.objects.create(requested_by=self.user, kind='orders', filters={'placed_after': 'yesterday'})
+        run_job(claim_next_job())
+        job.refresh_from_db()
+        self.assertEqual(job.status, ExportJob.FAILED)
+        self.assertTrue(job.error)
+
+    def test_rejects_bad_requests(self):
+        response = self.client.post(reverse('export-job-list'), {'kind': 'orders', 'filters': {'placed_after': 'soon'}}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('placed_after', response.data['filters'])
+        response = self.client.post(reverse('export-job-list'), {'kind': 'reviews'}, format='json')
+        self.assertEqual(response.status_code, 400)
+
+    def test_download_waits_for_completion_and_is_private(self):
+        job = self._enqueue(kind='orders')
+        self.assertEqual(self.client.get(reverse('export-job-download', args=[job.pk])).status_code, 409)
+
+        self.client.force_authenticate(User.objects.create_user(username='other', password='testpass123'))
+        self.assertEqual(self.client.get(reverse('export-job-detail', args=[job.pk])).status_code, 404)
+        self.assertEqual(self.client.get(reverse('export-job-list')).data['results'], [])
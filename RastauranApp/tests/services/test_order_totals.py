@@ -0,0 +1,66 @@
+from decimal import Decimal
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+from RastauranApp.models import Restaurant, Customer, Order, OrderItem
+from RastauranApp.services.orders import find_total_mismatches, recompute_order_totals
+
+
+class OrderTotalsTest(TestCase):
+    def setUp(self):
+        restaurant = Restaurant.objects.create(name='Pizza Palace')
+        customer = Customer.objects.create(first_name='Alice', email='alice@example.com')
+        self.orders = []
+        for stored_total in ('10.00', '99.00', '7.00'):
+            order = Order.objects.create(customer=customer, restaurant=restaurant, total_amount=Decimal(stored_total))
+            OrderItem.objects.create(order=order, name='Pizza', unit_price=Decimal('4.00'), quantity=2, total_price=Decimal('8.00'))
+            OrderItem.objects.create(order=order, name='Soda', unit_price=Decimal('1.00'), quantity=2, total_price=Decimal('2.00'))
+            self.orders.append(order)
+        # The third order has a drifted item as well as a drifted total.
+        OrderItem.objects.filter(order=self.orders[2], name='Soda').update(total_price=Decimal('5.00'))
+
+    def test_find_mismatches(self):
+        rows, order_mismatches, item_mismatches = find_total_mismatches()
+        self.assertEqual(rows, [(self.orders[1].id, Decimal('99.00'), Decimal('10.00')), (self.orders[2].id, Decimal('7.00'), Decimal('10.00'))])
+        self.assertEqual((order_mismatches, item_mismatches), (2, 1))
+
+        rows, order_mismatches, _ = find_total_mismatches(limit=1)
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(order_mismatches, 2)
+
+    def test_recompute_uses_constant_statements(self):
+        with self.assertNumQueries(2):
+            self.assertEqual(recompute_order_totals(), (1, 2))
+        for order in self.orders:
+            order.refresh_from_db()
+            self.assertEqual(order.total_amount, Decimal('10.00'))
+        self.assertEqual(find_total_mismatches(), ([], 0, 0))
+
+    def test_recompute_can_be_scoped(self):
+        recompute_order_totals([self.orders[1].id])
+        rows, _, item_mismatches = find_total_mismatches()
+        self.assertEqual([row[0] for row in rows], [self.orders[2].id])
+        self.assertEqual(item_mismatches, 1)
+
+    def test_reconcile_command(self):
+        out = StringIO()
+        call_command('reconcile_order_totals', stdout=out)
+        self.assertIn('1 item total(s) and 2 order total(s) drifted', out.getvalue())
+        self.assertIn(f'order {self.orders[1].id}: stored 99.00, items sum to 10.00', out.getvalue())
+
+        out = StringIO()
+        call_command('reconcile_order_totals', fix=True, stdout=out)
+        self.assertIn('Repaired 1 item total(s) and 2 order total(s)', out.getvalue())
+        self.assertEqual(find_total_mismatches(), ([], 0, 0))
+
+    def test_orders_without_items_total_zero(self):
+        # The admin deletes an order's last items.
+        OrderItem.objects.filter(order=self.orders[0]).delete()
+        rows, order_mismatches, _ = find_total_mismatches(limit=0)
+        self.assertEqual((rows, order_mismatches), ([], 3))
+        self.assertIn((self.orders[0].id, Decimal('10.00'), Decimal('0')), find_total_mismatches([self.orders[0].id])[0])
+
+        self.assertEqual(recompute_order_totals([self.orders[0].id]), (0, 1))
+        self.orders[0].refresh_from_db()
+        self.assertEqual(self.orders[0].total_amount, Decimal('0.00'))
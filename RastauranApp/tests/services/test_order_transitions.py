@@ -0,0 +1,75 @@
+from decimal import Decimal
+
+from django.contrib.admin.sites import AdminSite
+from django.contrib.auth.models import User
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.test import RequestFactory
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from RastauranApp.admin import OrderAdmin, _mark_orders_delivered
+from RastauranApp.models import Restaurant, Customer, Order, Delivery
+from RastauranApp.services.orders import transition_orders
+
+
+class OrderTransitionTest(APITestCase):
+    def setUp(self):
+        restaurant = Restaurant.objects.create(name='Pizza Palace')
+        customer = Customer.objects.create(first_name='Alice', email='alice@example.com')
+        self.orders = []
+        for status in (0, 0, 1, 1, 2):
+            order = Order.objects.create(customer=customer, restaurant=restaurant, total_amount=Decimal('10.00'), status=status)
+            Delivery.objects.create(order=order, status=2 if status == 1 else 0)
+            self.orders.append(order)
+        self.ids = [order.id for order in self.orders]
+
+    def _statuses(self):
+        return list(Order.objects.filter(id__in=self.ids).order_by('id').values_list('status', flat=True))
+
+    def test_only_legal_transitions_apply_in_one_statement(self):
+        with self.assertNumQueries(1):
+            moved, rejected, deliveries = transition_orders(self.ids + [0], 1)
+        self.assertEqual(moved, self.ids[:2])
+        self.assertEqual(rejected, [0] + self.ids[2:])
+        self.assertEqual(deliveries, 0)
+        self.assertEqual(self._statuses(), [1, 1, 1, 1, 2])
+
+    def test_delivered_cascades_to_deliveries(self):
+        before = Order.objects.get(pk=self.ids[2]).updated_at
+        moved, rejected, deliveries = transition_orders(self.ids, 2)
+        self.assertEqual((moved, deliveries), (self.ids[2:4], 2))
+        self.assertEqual(rejected, self.ids[:2] + self.ids[4:])
+
+        delivery = Delivery.objects.get(order_id=self.ids[2])
+        self.assertEqual(delivery.status, 3)
+        self.assertIsNotNone(delivery.delivered_at)
+        self.assertGreater(Order.objects.get(pk=self.ids[2]).updated_at, before)
+        self.assertEqual(Delivery.objects.get(order_id=self.ids[0]).status, 0)
+
+    def test_rejects_unknown_target(self):
+        with self.assertRaises(ValueError):
+            transition_orders(self.ids, 0)
+
+    def test_bulk_endpoint(self):
+        url = reverse('order-transition')
+        self.client.force_authenticate(User.objects.create_user(username='clerk', password='testpass123'))
+        self.assertEqual(self.client.post(url, {'order_ids': self.ids, 'status': 1}, format='json').status_code, 403)
+
+        self.client.force_authenticate(User.objects.create_user(username='admin', password='testpass123', is_staff=True))
+        response = self.client.post(url, {'order_ids': self.ids, 'status': 1}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {'updated': self.ids[:2], 'rejected': self.ids[2:], 'deliveries_updated': 0})
+        self.assertEqual(self.client.post(url, {'order_ids': self.ids, 'status': 0}, format='json').status_code, 400)
+        self.assertEqual(self.client.post(url, {'order_ids': [], 'status': 1}, format='json').status_code, 400)
+
+    def test_admin_action_reports_skipped_orders(self):
+        request = RequestFactory().post('/')
+        request.user = User.objects.create_superuser(username='root', password='testpass123')
+        request.session = {}
+        request._messages = FallbackStorage(request)
+        _mark_orders_delivered(OrderAdmin(Order, AdminSite()), request, Order.objects.filter(id__in=self.ids))
+
+        self.assertEqual(self._statuses(), [0, 0, 2, 2, 2])
+        self.assertEqual(
+            [str(message) for message in request._messages],
+            ['2 order(s) marked as Delivered.', "3 order(s) skipped: they can't move to Delivered from their current status."],
+        )
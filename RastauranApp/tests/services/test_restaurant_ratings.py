@@ -0,0 +1,130 @@
+from decimal import Decimal
+from io import StringIO
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import DatabaseError
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from RastauranApp.models import Restaurant, Customer, Comment
+
+
+class RestaurantRatingTest(APITestCase):
+    def setUp(self):
+        self.restaurant = Restaurant.objects.create(name='Pizza Palace')
+        self.other = Restaurant.objects.create(name='Sushi Spot')
+        self.customer = Customer.objects.create(first_name='Alice', email='alice@example.com')
+
+    def _comment(self, rating, restaurant=None, **extra):
+        return Comment.objects.create(customer=self.customer, restaurant=restaurant or self.restaurant, text='ok', rating=rating, **extra)
+
+    def _rating(self, restaurant=None):
+        restaurant = Restaurant.objects.get(pk=(restaurant or self.restaurant).pk)
+        return restaurant.rating, restaurant.rating_sum, restaurant.rating_count
+
+    def test_create_edit_soft_delete_and_delete(self):
+        first = self._comment(5)
+        second = self._comment(2)
+        self._comment(None)
+        self._comment(1, is_active=False)
+        self.assertEqual(self._rating(), (Decimal('3.50'), 7, 2))
+
+        second.rating = 4
+        second.save()
+        self.assertEqual(self._rating(), (Decimal('4.50'), 9, 2))
+
+        first.is_active = False
+        first.save()
+        self.assertEqual(self._rating(), (Decimal('4.00'), 4, 1))
+
+        second.delete()
+        self.assertEqual(self._rating(), (None, 0, 0))
+
+    def test_moving_a_comment_between_restaurants(self):
+        comment = self._comment(4)
+        comment.restaurant = self.other
+        comment.save()
+        self.assertEqual(self._rating(), (None, 0, 0))
+        self.assertEqual(self._rating(self.other), (Decimal('4.00'), 4, 1))
+
+    def test_bulk_delete_and_unrelated_saves(self):
+        comments = [self._comment(rating) for rating in (1, 2, 3)]
+        with self.assertNumQueries(1):
+            Comment.objects.filter(pk=comments[0].pk).update(likes_count=3)
+        with self.assertNumQueries(1):
+            comments[1].save(update_fields=['text'])
+        Comment.objects.filter(rating__lte=2).delete()
+        self.assertEqual(self._rating(), (Decimal('3.00'), 3, 1))
+
+    def test_comment_and_aggregates_commit_together(self):
+        comment = self._comment(5)
+        comment.rating = 1
+        with mock.patch('RastauranApp.services.ratings.apply_rating_changes', side_effect=DatabaseError), self.assertRaises(DatabaseError):
+            comment.save()
+        self.assertEqual(Comment.objects.get(pk=comment.pk).rating, 5)
+        self.assertEqual(self._rating(), (Decimal('5.00'), 5, 1))
+
+    def test_comment_endpoint_updates_ordering(self):
+        self._comment(3, restaurant=self.other)
+        self.client.force_authenticate(User.objects.create_user(username='alice', password='testpass123'))
+        self.client.post(
+            reverse('restaurant-comments', args=[self.restaurant.pk]),
+            {'customer': self.customer.pk, 'restaurant': self.restaurant.pk, 'text': 'great', 'rating': 5}, format='json',
+        )
+        response = self.client.get(reverse('restaurant-list'), {'ordering': '-rating'})
+        self.assertEqual([row['id'] for row in response.data['results']], [self.restaurant.pk, self.other.pk])
+
+    def test_rebuild_command_repairs_drift(self):
+        self._comment(4)
+        self._comment(2)
+        Restaurant.objects.filter(pk=self.restaurant.pk).update(rating=Decimal('1.00'), rating_sum=0, rating_count=9)
+        Restaurant.objects.filter(pk=self.other.pk).update(rating=Decimal('4.20'))
+
+        out = StringIO()
+        call_command('rebuild_restaurant_ratings', '--dry-run', stdout=out)
+        self.assertIn('Found 2 restaurant(s)', out.getvalue())
+        self.assertEqual(self._rating()[2], 9)
+
+        call_command('rebuild_restaurant_ratings', '--batch-size', '1', stdout=out)
+        self.assertEqual(self._rating(), (Decimal('3.00'), 6, 2))
+        self.assertEqual(self._rating(self.other), (None, 0, 0))
+        call_command('rebuild_restaurant_ratings', stdout=out)
+        self.assertIn('Repaired 0 restaurant(s)', out.getvalue())
+
+    def test_rebuild_command_invalidates_cached_restaurants(self):
+        cache.clear()
+        self._comment(4)
+        Restaurant.objects.filter(pk=self.restaurant.pk).update(rating=Decimal('1.00'), rating_sum=1)
+        url = reverse('restaurant-detail', args=[self.restaurant.pk])
+        self.assertEqual(self.client.get(url).data['rating'], '1.00')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            call_command('rebuild_restaurant_ratings', stdout=StringIO())
+        self.assertEqual(self.client.get(url).data['rating'], '4.00')
+
+    def test_full_saves_leave_counters_alone(self):
+        stale = Restaurant.objects.get(pk=self.restaurant.pk)
+        comment = self._comment(4)
+        Comment.objects.filter(pk=comment.pk).update(likes_count=3)
+
+        stale.name = 'Pizza Paradise'
+        stale.save()
+        self.assertEqual(self._rating(), (Decimal('4.00'), 4, 1))
+        self.assertEqual(Restaurant.objects.get(pk=self.restaurant.pk).name, 'Pizza Paradise')
+
+        comment.text = 'edited'
+        comment.save()
+        comment.refresh_from_db()
+        self.assertEqual((comment.text, comment.likes_count), ('edited', 3))
+
+    def test_admin_edit_keeps_concurrent_ratings(self):
+        self.client.force_login(User.objects.create_superuser(username='admin', password='adminpass123'))
+        url = reverse('admin:RastauranApp_restaurant_change', args=[self.restaurant.pk])
+        self.assertEqual(self.client.get(url).status_code, 200)
+        # A comment lands while the change form is open.
+        self._comment(5)
+        response = self.client.post(url, {'name': 'Pizza Paradise', 'is_active': 'on', 'rating': '1.00', 'rating_count': '10'})
+        self.assertEqual(response.status_code, 302)
+        self.assertEqual(self._rating(), (Decimal('5.00'), 5, 1))
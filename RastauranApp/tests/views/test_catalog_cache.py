@@ -0,0 +1,88 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from RastauranApp.models import Restaurant, Menu, Dish
+
+
+class CatalogCacheTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.pizza = Restaurant.objects.create(name='Pizza Palace')
+        self.sushi = Restaurant.objects.create(name='Sushi Spot')
+        self.menu = Menu.objects.create(restaurant=self.pizza, name='Main')
+        self.dish = Dish.objects.create(menu=self.menu, restaurant=self.pizza, name='Margherita', price=Decimal('8.00'))
+
+    def test_repeat_request_is_served_from_cache(self):
+        first = self.client.get(reverse('restaurant-list'))
+        self.assertEqual(first['X-Cache'], 'MISS')
+        # A hit answers from the cache alone, validators included.
+        with self.assertNumQueries(0):
+            second = self.client.get(reverse('restaurant-list'))
+        self.assertEqual(second['X-Cache'], 'HIT')
+        self.assertEqual(second.data, first.data)
+        self.assertEqual(second['ETag'], first['ETag'])
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse('restaurant-list'), HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_query_string_is_normalized(self):
+        self.client.get(reverse('restaurant-list'), {'is_active': 'true', 'ordering': 'name'})
+        response = self.client.get(reverse('restaurant-list') + '?ordering=name&is_active=true')
+        self.assertEqual(response['X-Cache'], 'HIT')
+        response = self.client.get(reverse('restaurant-list'), {'ordering': '-name'})
+        self.assertEqual(response['X-Cache'], 'MISS')
+
+    def test_restaurant_edit_only_invalidates_its_own_detail(self):
+        pizza_url = reverse('restaurant-detail', args=[self.pizza.id])
+        sushi_url = reverse('restaurant-detail', args=[self.sushi.id])
+        for url in (pizza_url, sushi_url, reverse('restaurant-list')):
+            self.client.get(url)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pizza.name = 'Pizza Paradise'
+            self.pizza.save()
+
+        response = self.client.get(pizza_url)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['name'], 'Pizza Paradise')
+        self.assertEqual(self.client.get(sushi_url)['X-Cache'], 'HIT')
+        self.assertEqual(self.client.get(reverse('restaurant-list'))['X-Cache'], 'MISS')
+
+    def test_dish_writes_invalidate_dish_list(self):
+        self.client.get(reverse('dish-list'))
+        self.client.get(reverse('menu-list'))
+        with self.captureOnCommitCallbacks(execute=True):
+            Dish.objects.create(menu=self.menu, restaurant=self.pizza, name='Pepperoni', price=Decimal('9.00'))
+
+        response = self.client.get(reverse('dish-list'))
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(len(response.data['results']), 2)
+        self.assertEqual(self.client.get(reverse('menu-list'))['X-Cache'], 'HIT')
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.dish.delete()
+        self.assertEqual(len(self.client.get(reverse('dish-list')).data['results']), 1)
+
+    def test_stats_endpoint_reports_counters(self):
+        self.client.get(reverse('menu-list'))
+        self.client.get(reverse('menu-list'))
+        self.assertEqual(self.client.get(reverse('catalog-cache-stats')).status_code, 403)
+
+        admin = User.objects.create_superuser(username='admin', password='adminpass123')
+        self.client.force_authenticate(admin)
+        response = self.client.get(reverse('catalog-cache-stats'))
+        self.assertEqual(response.data, {'hits': 1, 'misses': 1})
+
+    def test_scopes_are_bumped_only_on_commit(self):
+        self.client.get(reverse('dish-list'))
+        with self.captureOnCommitCallbacks() as callbacks:
+            Dish.objects.create(menu=self.menu, restaurant=self.pizza, name='Pepperoni', price=Decimal('9.00'))
+            # Until the write commits, readers keep hitting the current version.
+            self.assertEqual(self.client.get(reverse('dish-list'))['X-Cache'], 'HIT')
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.client.get(reverse('dish-list'))['X-Cache'], 'MISS')
@@ -0,0 +1,45 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from RastauranApp.models import Restaurant, Customer, Comment
+
+
+class RestaurantCommentsQueryCountTest(APITestCase):
+    def setUp(self):
+        self.restaurant = Restaurant.objects.create(name='Pizza Palace')
+        self.customers = [
+            Customer.objects.create(first_name=f'Customer {i}', email=f'customer{i}@example.com')
+            for i in range(3)
+        ]
+
+    def _add_comments(self, count):
+        for i in range(count):
+            Comment.objects.create(
+                customer=self.customers[i % 3], restaurant=self.restaurant, text=f'Comment {i}', rating=5,
+                likes_count=2, dislikes_count=1,
+            )
+
+    def _count_queries(self):
+        url = reverse('restaurant-comments', args=[self.restaurant.id])
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        return len(ctx.captured_queries), response
+
+    def test_likes_and_author_are_served_from_one_row(self):
+        self._add_comments(1)
+        _, response = self._count_queries()
+        comment = response.data['results'][0]
+        self.assertEqual(comment['likes'], 2)
+        self.assertEqual(comment['dislikes'], 1)
+        self.assertEqual(comment['author']['first_name'], 'Customer 0')
+
+    def test_query_count_does_not_grow_with_comments(self):
+        self._add_comments(2)
+        few, _ = self._count_queries()
+        self._add_comments(20)
+        many, response = self._count_queries()
+        self.assertEqual(len(response.data['results']), 22)
+        self.assertEqual(few, many)
+        self.assertEqual(many, 2)
@@ -0,0 +1,101 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from RastauranApp.models import Restaurant, Menu, Dish, Customer, Order, Comment
+
+
+class ConditionalGetTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.restaurant = Restaurant.objects.create(name='Pizza Palace')
+        self.customer = Customer.objects.create(first_name='Alice', email='alice@example.com')
+        self.order = Order.objects.create(customer=self.customer, restaurant=self.restaurant, total_amount=Decimal('12.00'))
+
+    def test_detail_returns_304_without_serializing(self):
+        url = reverse('order-detail', args=[self.order.id])
+        response = self.client.get(url)
+        self.assertIn('ETag', response)
+        self.assertIn('Last-Modified', response)
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_detail_etag_changes_on_update(self):
+        url = reverse('order-detail', args=[self.order.id])
+        etag = self.client.get(url)['ETag']
+        self.order.notes = 'Leave at the door'
+        self.order.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertNotEqual(response['ETag'], etag)
+
+    def test_if_modified_since(self):
+        url = reverse('customer-detail', args=[self.customer.id])
+        last_modified = self.client.get(url)['Last-Modified']
+        response = self.client.get(url, HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(response.status_code, 304)
+
+    def test_missing_object_is_still_404(self):
+        response = self.client.get(reverse('order-detail', args=[self.order.id + 100]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_list_validator_tracks_new_and_deleted_rows(self):
+        url = reverse('order-list')
+        etag = self.client.get(url)['ETag']
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 304)
+
+        extra = Order.objects.create(customer=self.customer, restaurant=self.restaurant, total_amount=Decimal('5.00'))
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+        etag = response['ETag']
+        Order.objects.filter(pk=extra.pk).delete()
+        self.assertEqual(self.client.get(url, HTTP_IF_NONE_MATCH=etag).status_code, 200)
+
+    def test_list_validator_depends_on_query(self):
+        url = reverse('restaurant-list')
+        etag = self.client.get(url)['ETag']
+        response = self.client.get(url, {'is_active': 'false'}, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+
+    def test_reaction_invalidates_comment_list(self):
+        comment = Comment.objects.create(customer=self.customer, restaurant=self.restaurant, text='Tasty')
+        url = reverse('restaurant-comments', args=[self.restaurant.id])
+        etag = self.client.get(url)['ETag']
+
+        self.client.force_authenticate(User.objects.create_user(username='testuser', password='testpass123'))
+        self.client.post(reverse('comment-react', args=[comment.id]), {'customer_id': self.customer.id}, format='json')
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['likes'], 1)
+
+    def test_validators_follow_embedded_rows(self):
+        menu = Menu.objects.create(restaurant=self.restaurant, name='Main')
+        Dish.objects.create(menu=menu, restaurant=self.restaurant, name='Margherita', price=Decimal('8.50'))
+        urls = [reverse('order-list'), reverse('order-detail', args=[self.order.id]), reverse('dish-list')]
+        etags = {url: self.client.get(url)['ETag'] for url in urls}
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.restaurant.name = 'Pizza Palazzo'
+            self.restaurant.save()
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.client.get(url, HTTP_IF_NONE_MATCH=etags[url])
+                self.assertEqual(response.status_code, 200)
+                self.assertIn('Pizza Palazzo', response.content.decode())
+
+    def test_comment_list_follows_author_rename(self):
+        Comment.objects.create(customer=self.customer, restaurant=self.restaurant, text='Tasty')
+        url = reverse('restaurant-comments', args=[self.restaurant.id])
+        etag = self.client.get(url)['ETag']
+
+        self.customer.first_name = 'Alicia'
+        self.customer.save()
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['results'][0]['author']['first_name'], 'Alicia')
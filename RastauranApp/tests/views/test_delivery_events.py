@@ -0,0 +1,187 @@
+import asyncio
+import json
+from datetime import timedelta
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.db import DatabaseError, transaction
+from django.test import TestCase, TransactionTestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from RastauranApp.models import Restaurant, Customer, Driver, Order, Delivery
+from RastauranApp.realtime import BaseBroker, PostgresBroker, delivery_topic, driver_topic, get_broker
+from RastauranApp.services.dispatch import dispatch_waiting
+from RastauranApp.services.locations import LocationBuffer
+from RastauranApp.services.orders import transition_orders
+
+
+class RecordingBroker(BaseBroker):
+    def __init__(self):
+        super().__init__()
+        self.published = []
+
+    def publish(self, topic, message):
+        self.published.append((topic, message))
+        return self.deliver_local(topic, message)
+
+
+def parse(chunk):
+    name, data = chunk.decode().strip().split('\n')
+    return name.removeprefix('event: '), json.loads(data.removeprefix('data: '))
+
+
+class DeliveryEventStreamTest(TestCase):
+    def setUp(self):
+        restaurant = Restaurant.objects.create(name='Pizza Palace')
+        customer = Customer.objects.create(first_name='Alice', email='alice@example.com')
+        self.order = Order.objects.create(customer=customer, restaurant=restaurant, total_amount=Decimal('10.00'), status=1)
+        self.driver = Driver.objects.create(
+            first_name='Dan', current_location_latitude=Decimal('41.300000'), current_location_longitude=Decimal('69.200000'),
+            location_updated_at=timezone.now(),
+        )
+        self.other = Driver.objects.create(first_name='Eve')
+        self.delivery = Delivery.objects.create(order=self.order, driver=self.driver, status=1)
+        self.url = reverse('delivery-events', args=[self.delivery.pk])
+
+    async def test_streams_snapshot_then_pushed_changes(self):
+        broker = get_broker()
+        response = await self.async_client.get(self.url)
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+        events = response.streaming_content
+
+        self.assertEqual(parse(await anext(events)), ('delivery', {
+            'delivery': self.delivery.pk, 'status': 1, 'driver': self.driver.pk, 'eta_minutes': None,
+            'assigned_at': None, 'picked_at': None, 'delivered_at': None,
+        }))
+        name, location = parse(await anext(events))
+        self.assertEqual((name, location['latitude'], location['longitude']), ('location', 41.3, 69.2))
+        self.assertEqual(broker.subscriber_count(driver_topic(self.driver.pk)), 1)
+
+        broker.publish(driver_topic(self.driver.pk), {'type': 'location', 'driver': self.driver.pk, 'latitude': 41.4, 'longitude': 69.3, 'recorded_at': None})
+        self.assertEqual(parse(await anext(events))[1]['latitude'], 41.4)
+
+        # Reassignment moves the stream over to the new driver's pings.
+        broker.publish(delivery_topic(self.delivery.pk), {'type': 'delivery', 'delivery': self.delivery.pk, 'driver': self.other.pk})
+        self.assertEqual(parse(await anext(events))[1]['driver'], self.other.pk)
+        self.assertEqual(broker.subscriber_count(driver_topic(self.driver.pk)), 0)
+        broker.publish(driver_topic(self.other.pk), {'type': 'location', 'driver': self.other.pk, 'latitude': 40.0, 'longitude': 65.0, 'recorded_at': None})
+        self.assertEqual(parse(await anext(events))[1]['driver'], self.other.pk)
+
+        broker.publish(delivery_topic(self.delivery.pk), {'type': 'delivery', 'delivery': self.delivery.pk, 'status': 3})
+        self.assertEqual(parse(await anext(events))[1]['status'], 3)
+        with self.assertRaises(StopAsyncIteration):
+            await anext(events)
+        self.assertEqual(broker.subscriber_count(delivery_topic(self.delivery.pk)), 0)
+        self.assertEqual(broker.subscriber_count(driver_topic(self.other.pk)), 0)
+
+    @override_settings(REALTIME_HEARTBEAT_SECONDS=0.01)
+    async def test_idle_stream_sends_keep_alives(self):
+        response = await self.async_client.get(self.url)
+        events = response.streaming_content
+        await anext(events)
+        await anext(events)
+        self.assertEqual(await anext(events), b': keep-alive\n\n')
+        await events.aclose()
+
+    async def test_unknown_delivery(self):
+        response = await self.async_client.get(reverse('delivery-events', args=[self.delivery.pk + 100]))
+        self.assertEqual(response.status_code, 404)
+        self.assertEqual(get_broker().subscriber_count(delivery_topic(self.delivery.pk + 100)), 0)
+
+
+@override_settings(REALTIME_BROKER='RastauranApp.tests.views.test_delivery_events.RecordingBroker', DRIVER_LOCATION_FLUSH_INTERVAL=60)
+class DeliveryPublishingTest(TestCase):
+    def setUp(self):
+        self.broker = get_broker()
+        self.broker.published.clear()
+        restaurant = Restaurant.objects.create(name='Pizza Palace')
+        customer = Customer.objects.create(first_name='Alice', email='alice@example.com')
+        self.order = Order.objects.create(customer=customer, restaurant=restaurant, total_amount=Decimal('10.00'), status=1)
+        self.driver = Driver.objects.create(first_name='Dan')
+        self.delivery = Delivery.objects.create(order=self.order, driver=self.driver, status=1)
+
+    def _topics(self):
+        return [(topic, message.get('status')) for topic, message in self.broker.published]
+
+    def test_nothing_is_published_before_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            Delivery.objects.filter(pk=self.delivery.pk).get().save()
+        self.assertEqual(self.broker.published, [])
+        self.assertEqual(len(callbacks), 1)
+
+    def test_model_saves_and_status_cascades_publish(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            transition_orders([self.order.pk], 2)
+        self.assertEqual(self._topics(), [(delivery_topic(self.delivery.pk), 3)])
+
+        self.broker.published.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.delivery.status = 2
+            self.delivery.save()
+        self.assertEqual(self._topics(), [(delivery_topic(self.delivery.pk), 2)])
+
+    def test_location_flush_publishes_positions(self):
+        buffer = LocationBuffer()
+        now = timezone.now()
+        buffer.add([{'driver': self.driver.pk, 'latitude': 41.3, 'longitude': 69.2, 'recorded_at': now - timedelta(seconds=1)}])
+        with self.captureOnCommitCallbacks(execute=True):
+            buffer.flush()
+        self.assertIn(
+            (driver_topic(self.driver.pk), {'type': 'location', 'driver': self.driver.pk, 'latitude': 41.3, 'longitude': 69.2, 'recorded_at': now - timedelta(seconds=1)}),
+            self.broker.published,
+        )
+
+    def test_location_flush_publishes_only_stored_positions(self):
+        now = timezone.now()
+        Driver.objects.filter(pk=self.driver.pk).update(
+            current_location_latitude=Decimal('41.300000'), current_location_longitude=Decimal('69.200000'), location_updated_at=now,
+        )
+        other = Driver.objects.create(first_name='Eve')
+        buffer = LocationBuffer()
+        buffer.add([
+            {'driver': self.driver.pk, 'latitude': 40.0, 'longitude': 65.0, 'recorded_at': now - timedelta(minutes=1)},
+            {'driver': other.pk, 'latitude': 41.5, 'longitude': 69.5, 'recorded_at': now},
+        ])
+        with self.captureOnCommitCallbacks(execute=True):
+            self.assertEqual(buffer.flush(), 1)
+        self.assertEqual([topic for topic, _ in self.broker.published], [driver_topic(other.pk)])
+
+    def test_rolled_back_writes_publish_nothing(self):
+        with self.captureOnCommitCallbacks(execute=True), self.assertRaises(DatabaseError):
+            with transaction.atomic():
+                transition_orders([self.order.pk], 2)
+                self.delivery.save()
+                raise DatabaseError('rolled back')
+        self.assertEqual(self.broker.published, [])
+
+    @override_settings(DISPATCH_MATCHING='greedy', DISPATCH_MAX_KM=10)
+    def test_dispatch_publishes_assignments(self):
+        Delivery.objects.filter(pk=self.delivery.pk).update(status=0, driver=None)
+        Driver.objects.filter(pk=self.driver.pk).update(current_location_latitude=Decimal('41.300000'), current_location_longitude=Decimal('69.200000'))
+        self.order.restaurant.addresses.create(street='Main st', latitude=Decimal('41.301000'), longitude=Decimal('69.201000'))
+        self.broker.published.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            dispatch_waiting()
+        topic, message = self.broker.published[0]
+        self.assertEqual((topic, message['status'], message['driver']), (delivery_topic(self.delivery.pk), 1, self.driver.pk))
+
+
+class PostgresBrokerTest(TransactionTestCase):
+    async def test_relays_events_published_on_other_connections(self):
+        broker = PostgresBroker()
+        try:
+            subscription = broker.subscribe(delivery_topic(7))
+            self.assertTrue(await asyncio.to_thread(broker.listening.wait, 10))
+            # As dispatch_deliveries would, from its own process and connection.
+            await sync_to_async(broker.publish, thread_sensitive=False)(
+                delivery_topic(7), {'type': 'delivery', 'delivery': 7, 'status': 1, 'assigned_at': timezone.now()},
+            )
+            await sync_to_async(broker.publish, thread_sensitive=False)(delivery_topic(8), {'type': 'delivery', 'delivery': 8})
+            message = await subscription.get(10)
+            self.assertEqual((message['delivery'], message['status']), (7, 1))
+            self.assertIsInstance(message['assigned_at'], str)
+            with self.assertRaises(asyncio.TimeoutError):
+                await subscription.get(0.2)
+            subscription.close()
+        finally:
+            await asyncio.to_thread(broker.stop)
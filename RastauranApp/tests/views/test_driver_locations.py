@@ -0,0 +1,99 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest import mock
+
+from django.contrib.auth.models import User
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from RastauranApp.models import Restaurant, Customer, Driver, Order, Delivery
+from RastauranApp.services.locations import LocationBuffer
+
+
+@override_settings(DRIVER_LOCATION_FLUSH_INTERVAL=0, DRIVER_LOCATION_BREADCRUMBS=True)
+class DriverLocationIngestTest(APITestCase):
+    def setUp(self):
+        restaurant = Restaurant.objects.create(name='Pizza Palace')
+        customer = Customer.objects.create(first_name='Alice', email='alice@example.com')
+        self.drivers = [Driver.objects.create(restaurant=restaurant, first_name=f'Driver {i}') for i in range(3)]
+        self.deliveries = []
+        for driver, status in zip(self.drivers, (2, 0, 3)):
+            order = Order.objects.create(customer=customer, restaurant=restaurant, total_amount=Decimal('10.00'))
+            self.deliveries.append(Delivery.objects.create(order=order, driver=driver, status=status))
+        self.client.force_authenticate(User.objects.create_user(username='driver-app', password='testpass123'))
+        self.url = reverse('driver-locations')
+        self.now = timezone.now()
+
+    def _ping(self, driver, latitude, longitude, seconds_ago=0):
+        return {
+            'driver': driver.id, 'latitude': latitude, 'longitude': longitude,
+            'recorded_at': (self.now - timedelta(seconds=seconds_ago)).isoformat(),
+        }
+
+    def test_newest_ping_per_driver_wins(self):
+        pings = [
+            self._ping(self.drivers[0], 41.3, 69.2, seconds_ago=5),
+            self._ping(self.drivers[0], 41.311111119, 69.279999, seconds_ago=1),
+            self._ping(self.drivers[0], 41.0, 69.0, seconds_ago=9),
+            self._ping(self.drivers[1], 40.1, 65.5),
+        ]
+        with self.assertNumQueries(1), mock.patch('RastauranApp.services.locations.recompute_etas') as recompute:
+            response = self.client.post(self.url, {'pings': pings}, format='json')
+        recompute.assert_called_once_with()
+        self.assertEqual(response.status_code, 202)
+        self.assertEqual(response.data, {'accepted': 4, 'drivers': 2})
+
+        driver = Driver.objects.get(pk=self.drivers[0].pk)
+        self.assertEqual(driver.current_location_latitude, Decimal('41.311111'))
+        self.assertEqual(driver.current_location_longitude, Decimal('69.279999'))
+        self.assertEqual(driver.location_updated_at, self.now - timedelta(seconds=1))
+        self.assertIsNone(Driver.objects.get(pk=self.drivers[2].pk).location_updated_at)
+
+    def test_future_timestamps_are_clamped_to_receipt(self):
+        ahead = self._ping(self.drivers[0], 41.3, 69.2, seconds_ago=-3600)
+        self.client.post(self.url, {'pings': [ahead]}, format='json')
+        driver = Driver.objects.get(pk=self.drivers[0].pk)
+        self.assertLessEqual(driver.location_updated_at, timezone.now())
+
+        # The next honest ping still moves the driver.
+        self.client.post(self.url, {'pings': [{'driver': self.drivers[0].id, 'latitude': 41.4, 'longitude': 69.3}]}, format='json')
+        self.assertEqual(Driver.objects.get(pk=self.drivers[0].pk).current_location_latitude, Decimal('41.400000'))
+
+    def test_breadcrumbs_follow_active_deliveries_only(self):
+        self.client.post(self.url, {'pings': [self._ping(driver, 41.3, 69.2, seconds_ago=3) for driver in self.drivers]}, format='json')
+        self.client.post(self.url, {'pings': [self._ping(self.drivers[0], 41.4, 69.3)]}, format='json')
+
+        crumbs = Delivery.objects.get(pk=self.deliveries[0].pk).tracking_info['breadcrumbs']
+        self.assertEqual([(crumb['lat'], crumb['lng']) for crumb in crumbs], [(41.3, 69.2), (41.4, 69.3)])
+        self.assertIsNone(Delivery.objects.get(pk=self.deliveries[1].pk).tracking_info)
+        self.assertIsNone(Delivery.objects.get(pk=self.deliveries[2].pk).tracking_info)
+
+    def test_late_pings_do_not_move_drivers_back(self):
+        self.client.post(self.url, {'pings': [self._ping(self.drivers[0], 41.4, 69.3)]}, format='json')
+        self.client.post(self.url, {'pings': [self._ping(self.drivers[0], 41.0, 69.0, seconds_ago=30)]}, format='json')
+        driver = Driver.objects.get(pk=self.drivers[0].pk)
+        self.assertEqual(driver.current_location_latitude, Decimal('41.400000'))
+        self.assertEqual(len(Delivery.objects.get(pk=self.deliveries[0].pk).tracking_info['breadcrumbs']), 1)
+
+    def test_rejects_bad_coordinates(self):
+        response = self.client.post(self.url, {'pings': [self._ping(self.drivers[0], 91, 69.3)]}, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(self.client.post(self.url, {'pings': []}, format='json').status_code, 400)
+
+    @override_settings(DRIVER_LOCATION_FLUSH_INTERVAL=60)
+    def test_buffer_coalesces_until_flushed(self):
+        buffer = LocationBuffer()
+        for seconds_ago in (3, 2, 1):
+            buffer.add([
+                {'driver': driver.id, 'latitude': 41.0 + seconds_ago, 'longitude': 69.0,
+                 'recorded_at': self.now - timedelta(seconds=seconds_ago)}
+                for driver in self.drivers
+            ])
+        self.assertEqual(len(buffer), 3)
+        self.assertIsNone(Driver.objects.get(pk=self.drivers[0].pk).location_updated_at)
+
+        with self.assertNumQueries(1), mock.patch('RastauranApp.services.locations.recompute_etas'):
+            self.assertEqual(buffer.flush(), 3)
+        self.assertEqual(len(buffer), 0)
+        self.assertEqual(Driver.objects.get(pk=self.drivers[0].pk).current_location_latitude, Decimal('42.000000'))
@@ -0,0 +1,66 @@
+import datetime
+import uuid
+import zoneinfo
+from decimal import Decimal
+from unittest import mock
+
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from RastauranApp import renderers
+from RastauranApp.models import Restaurant, Customer, Address, Order, Delivery
+from RastauranApp.renderers import FastJSONRenderer
+
+PAYLOAD = {
+    'price': Decimal('12.50'),
+    'placed_at': datetime.datetime(2025, 3, 1, 10, 0, tzinfo=datetime.timezone.utc),
+    'local': datetime.datetime(2025, 3, 1, 10, 0, 0, 123456, tzinfo=zoneinfo.ZoneInfo('Asia/Tashkent')),
+    'naive': datetime.datetime(2025, 1, 1),
+    'day': datetime.date(2025, 1, 2),
+    'time': datetime.time(1, 2, 3, 4),
+    'duration': datetime.timedelta(seconds=90),
+    'uuid': uuid.UUID('6fb799d7-0a81-4230-b9a3-9c8277983520'),
+    'lazy': gettext_lazy('Not found.'),
+    'text': 'héllo     "q" \\ </script> 😀',
+    'tracking_info': {'breadcrumbs': [{'lat': 41.311111, 'lng': 69.2, 'at': '2025-03-01T10:00:00Z'}], 'note': None},
+    'keys': {1: 'one', None: 'none'},
+    'floats': [0.1, 1.5, -0.0, 123456.789],
+    'set': {1},
+    'tuple': (1, 2),
+    'big': 2 ** 63 - 1,
+}
+
+
+class FastJSONRendererTest(APITestCase):
+    def assertSameBytes(self, data, accepted_media_type=None, renderer_context=None):
+        expected = JSONRenderer().render(data, accepted_media_type, renderer_context)
+        self.assertEqual(FastJSONRenderer().render(data, accepted_media_type, renderer_context), expected)
+
+    def test_matches_stock_renderer(self):
+        self.assertSameBytes(PAYLOAD)
+        self.assertSameBytes([PAYLOAD, None, 'plain'])
+        self.assertSameBytes(None)
+
+    def test_falls_back_for_indent_and_unencodable_values(self):
+        self.assertSameBytes(PAYLOAD, 'application/json; indent=4')
+        self.assertSameBytes(PAYLOAD, renderer_context={'indent': 2})
+        self.assertSameBytes({'huge': 2 ** 70})
+        with self.assertRaises(ValueError):
+            FastJSONRenderer().render({'time': datetime.time(1, tzinfo=datetime.timezone.utc)})
+
+    def test_stdlib_fallback_without_orjson(self):
+        with mock.patch.object(renderers, 'orjson', None):
+            self.assertSameBytes(PAYLOAD)
+
+    def test_api_responses_use_it(self):
+        restaurant = Restaurant.objects.create(name='Pizza Palace', rating=Decimal('4.50'))
+        customer = Customer.objects.create(first_name='Alice', email='alice@example.com')
+        address = Address.objects.create(customer=customer, street='Home st', city='Tashkent')
+        order = Order.objects.create(customer=customer, restaurant=restaurant, delivery_address=address, total_amount=Decimal('19.99'))
+        delivery = Delivery.objects.create(order=order, tracking_info={'breadcrumbs': [{'lat': 41.3, 'lng': 69.2}]})
+
+        for url in (reverse('order-list'), reverse('delivery-detail', args=[delivery.pk]), reverse('restaurant-list')):
+            response = self.client.get(url)
+            self.assertIsInstance(response.accepted_renderer, FastJSONRenderer)
+            self.assertEqual(response.content, JSONRenderer().render(response.data))
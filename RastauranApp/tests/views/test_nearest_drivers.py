@@ -0,0 +1,99 @@
+import math
+import random
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from RastauranApp.geo import EARTH_RADIUS_KM, cell_ranges, grid_cell
+from RastauranApp.models import Restaurant, Customer, Address, Driver, Order, Delivery
+from RastauranApp.services.drivers import nearest_drivers
+
+ORIGIN = (41.311081, 69.240562)
+
+
+def _haversine(lat1, lng1, lat2, lng2):
+    lat1, lng1, lat2, lng2 = map(math.radians, (lat1, lng1, lat2, lng2))
+    a = math.sin((lat2 - lat1) / 2) ** 2 + math.cos(lat1) * math.cos(lat2) * math.sin((lng2 - lng1) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(math.sqrt(a))
+
+
+def _coordinate(value):
+    return Decimal(value).quantize(Decimal('0.000001'))
+
+
+class NearestDriversTest(APITestCase):
+    def setUp(self):
+        rng = random.Random(7)
+        self.restaurant = Restaurant.objects.create(name='Pizza Palace')
+        Address.objects.create(restaurant=self.restaurant, street='Amir Temur 1', latitude=_coordinate(ORIGIN[0]), longitude=_coordinate(ORIGIN[1]))
+        self.drivers = [
+            Driver.objects.create(
+                first_name=f'Driver {i}',
+                current_location_latitude=_coordinate(ORIGIN[0] + rng.uniform(-0.2, 0.2)),
+                current_location_longitude=_coordinate(ORIGIN[1] + rng.uniform(-0.2, 0.2)),
+            )
+            for i in range(60)
+        ]
+        self.inactive = Driver.objects.create(first_name='Off duty', is_active=False, current_location_latitude=_coordinate(ORIGIN[0]), current_location_longitude=_coordinate(ORIGIN[1]))
+        Driver.objects.create(first_name='No fix')
+        self.busy = Driver.objects.create(first_name='Busy', current_location_latitude=_coordinate(ORIGIN[0]), current_location_longitude=_coordinate(ORIGIN[1]))
+        customer = Customer.objects.create(first_name='Alice', email='alice@example.com')
+        order = Order.objects.create(customer=customer, restaurant=self.restaurant, total_amount=Decimal('10.00'))
+        Delivery.objects.create(order=order, driver=self.busy, status=1)
+        self.client.force_authenticate(User.objects.create_user(username='dispatcher', password='testpass123'))
+
+    def _brute_force(self, k, radius_km):
+        ranked = sorted(
+            (_haversine(*ORIGIN, float(d.current_location_latitude), float(d.current_location_longitude)), d.id)
+            for d in self.drivers
+        )
+        return [driver_id for distance, driver_id in ranked if distance <= radius_km][:k]
+
+    def test_matches_brute_force_ranking(self):
+        for k, radius_km in ((1, 20), (5, 20), (12, 5), (100, 3)):
+            with self.subTest(k=k, radius_km=radius_km):
+                drivers = nearest_drivers(*ORIGIN, k=k, radius_km=radius_km)
+                self.assertEqual([driver.id for driver in drivers], self._brute_force(k, radius_km))
+                distances = [driver.distance_km for driver in drivers]
+                self.assertEqual(distances, sorted(distances))
+
+    def test_stops_widening_once_k_drivers_are_found(self):
+        with self.assertNumQueries(1):
+            self.assertEqual(len(nearest_drivers(*ORIGIN, k=1, radius_km=20, queryset=Driver.objects.filter(pk=self.busy.pk))), 1)
+
+    def test_busy_inactive_and_unlocated_drivers_are_skipped(self):
+        ids = [driver.id for driver in nearest_drivers(*ORIGIN, k=100, radius_km=100)]
+        self.assertEqual(sorted(ids), sorted(driver.id for driver in self.drivers))
+
+    def test_cells_cover_the_search_radius(self):
+        rng = random.Random(3)
+        for _ in range(200):
+            lat, lng = rng.uniform(-70, 70), rng.uniform(-170, 170)
+            bearing, distance = rng.uniform(0, 2 * math.pi), rng.uniform(0, 5)
+            other = (
+                lat + distance / 111.195 * math.cos(bearing),
+                lng + distance / (111.195 * math.cos(math.radians(lat))) * math.sin(bearing),
+            )
+            if _haversine(lat, lng, *other) > 5:
+                continue
+            cell = grid_cell(*other)
+            self.assertTrue(any(first <= cell <= last for first, last in cell_ranges(lat, lng, 5)))
+
+    def test_generated_cell_matches_python(self):
+        driver = Driver.objects.get(pk=self.drivers[0].pk)
+        self.assertEqual(driver.location_cell, grid_cell(driver.current_location_latitude, driver.current_location_longitude))
+
+    def test_endpoint_searches_from_restaurant_address(self):
+        response = self.client.get(reverse('driver-nearest'), {'restaurant': self.restaurant.id, 'k': 3})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual([row['id'] for row in response.data], self._brute_force(3, 20))
+        self.assertIn('distance_km', response.data[0])
+
+    def test_endpoint_validates_origin(self):
+        url = reverse('driver-nearest')
+        self.assertEqual(self.client.get(url, {'latitude': ORIGIN[0]}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'latitude': 10, 'longitude': 10, 'restaurant': self.restaurant.id}).status_code, 400)
+        self.assertEqual(self.client.get(url, {'restaurant': 0}).status_code, 400)
+        response = self.client.get(url, {'latitude': ORIGIN[0], 'longitude': ORIGIN[1], 'k': 2, 'radius_km': 50})
+        self.assertEqual([row['id'] for row in response.data], self._brute_force(2, 50))
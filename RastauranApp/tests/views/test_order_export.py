@@ -0,0 +1,83 @@
+import csv
+import io
+import json
+import warnings
+from datetime import timedelta
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.test import APITestCase
+from RastauranApp.models import Restaurant, Customer, Order
+from RastauranApp.services.exports import ExportStreamingResponse, export_rows, stream_rows
+
+
+class OrderExportTest(APITestCase):
+    def setUp(self):
+        self.restaurant = Restaurant.objects.create(name='Pizza Palace')
+        customer = Customer.objects.create(first_name='Alice', last_name='Smith', email='alice@example.com')
+        now = timezone.now()
+        self.orders = []
+        for days_ago in (40, 10, 1):
+            order = Order.objects.create(
+                customer=customer, restaurant=self.restaurant, total_amount=Decimal('12.50'), notes='ring twice'
+            )
+            Order.objects.filter(pk=order.pk).update(placed_at=now - timedelta(days=days_ago))
+            self.orders.append(order)
+        self.client.force_authenticate(User.objects.create_user(username='exporter', password='testpass123'))
+        self.url = reverse('order-export')
+
+    def test_csv_export_streams_all_rows(self):
+        response = self.client.get(self.url, HTTP_ACCEPT='text/csv')
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response.streaming)
+        self.assertEqual(response['Content-Type'], 'text/csv')
+        rows = list(csv.reader(io.StringIO(b''.join(response.streaming_content).decode())))
+        self.assertEqual(rows[0][:3], ['id', 'customer_id', 'customer_name'])
+        self.assertEqual([int(row[0]) for row in rows[1:]], [order.id for order in self.orders])
+        self.assertEqual(rows[1][2], 'Alice Smith')
+        self.assertEqual(rows[1][4], 'Pizza Palace')
+        self.assertEqual(rows[1][-1], 'ring twice')
+
+    def test_ndjson_export_with_date_range(self):
+        since = (timezone.now() - timedelta(days=20)).isoformat()
+        response = self.client.get(self.url, {'file_format': 'ndjson', 'placed_after': since})
+        self.assertEqual(response['Content-Type'], 'application/x-ndjson')
+        lines = b''.join(response.streaming_content).decode().splitlines()
+        records = [json.loads(line) for line in lines]
+        self.assertEqual([record['id'] for record in records], [self.orders[1].id, self.orders[2].id])
+        self.assertEqual(records[0]['total_amount'], '12.50')
+
+    def test_rejects_unknown_format_and_bad_dates(self):
+        self.assertEqual(self.client.get(self.url, {'file_format': 'xlsx'}).status_code, 400)
+        self.assertEqual(self.client.get(self.url, {'placed_after': 'yesterday'}).status_code, 400)
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(None)
+        self.assertIn(self.client.get(self.url).status_code, (401, 403))
+
+    def test_stream_batches_lines_into_chunks(self):
+        chunks = list(stream_rows(export_rows(Order.objects.all(), chunk_size=1), 'csv', lines_per_chunk=2))
+        self.assertEqual(len(chunks), 2)
+        self.assertEqual(''.join(chunks).count('\n'), 4)
+
+    async def test_asgi_iteration_pulls_one_chunk_at_a_time(self):
+        pulled = []
+
+        def rows():
+            for row in export_rows(Order.objects.all(), chunk_size=1):
+                pulled.append(row[0])
+                yield row
+
+        response = ExportStreamingResponse(stream_rows(rows(), 'csv', lines_per_chunk=1))
+        with warnings.catch_warnings():
+            # Django warns when it has to buffer a sync iterator for ASGI.
+            warnings.simplefilter('error')
+            parts = aiter(response)
+            first = await anext(parts)
+            self.assertEqual(pulled, [self.orders[0].id])
+            rest = [part async for part in parts]
+        self.assertTrue(first.startswith(b'id,customer_id'))
+        self.assertEqual(len(rest), 2)
+        self.assertEqual(pulled, [order.id for order in self.orders])
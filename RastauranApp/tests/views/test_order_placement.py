@@ -0,0 +1,84 @@
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from RastauranApp.models import Restaurant, Menu, Dish, Customer, Address, Order, OrderItem, Payment
+
+
+class OrderPlacementTest(APITestCase):
+    def setUp(self):
+        self.restaurant = Restaurant.objects.create(name='Pizza Palace')
+        self.other = Restaurant.objects.create(name='Sushi Spot')
+        menu = Menu.objects.create(restaurant=self.restaurant, name='Main')
+        self.pizza = Dish.objects.create(menu=menu, restaurant=self.restaurant, name='Margherita', price=Decimal('8.50'))
+        self.soda = Dish.objects.create(menu=menu, restaurant=self.restaurant, name='Soda', price=Decimal('1.25'))
+        self.gone = Dish.objects.create(menu=menu, restaurant=self.restaurant, name='Calzone', price=Decimal('9.00'), is_available=False)
+        sushi_menu = Menu.objects.create(restaurant=self.other, name='Main')
+        self.roll = Dish.objects.create(menu=sushi_menu, restaurant=self.other, name='Roll', price=Decimal('6.00'))
+        self.customer = Customer.objects.create(first_name='Alice', email='alice@example.com')
+        self.address = Address.objects.create(customer=self.customer, street='Main st', city='Tashkent')
+        self.client.force_authenticate(User.objects.create_user(username='checkout', password='testpass123'))
+        self.url = reverse('order-place')
+
+    def _cart(self, *items, **extra):
+        return {
+            'customer': self.customer.id, 'restaurant': self.restaurant.id, 'delivery_address': self.address.id,
+            'provider': 'card', 'items': list(items) or [{'dish': self.pizza.id, 'quantity': 2}], **extra,
+        }
+
+    def test_single_cart_totals_are_computed_server_side(self):
+        cart = self._cart({'dish': self.pizza.id, 'quantity': 2}, {'dish': self.soda.id, 'quantity': 3, 'unit_price': '1.25'})
+        response = self.client.post(self.url, cart, format='json')
+        self.assertEqual(response.status_code, 201)
+        self.assertEqual(response.data['total_amount'], '20.75')
+        self.assertEqual([item['total_price'] for item in response.data['items']], ['17.00', '3.75'])
+
+        order = Order.objects.get()
+        self.assertEqual(order.total_amount, Decimal('20.75'))
+        self.assertEqual(OrderItem.objects.filter(order=order).count(), 2)
+        payment = Payment.objects.get()
+        self.assertEqual((payment.order_id, payment.amount, payment.status), (order.id, Decimal('20.75'), 0))
+        self.assertEqual(response.data['payment'], payment.id)
+
+    def test_batch_query_count_is_independent_of_size(self):
+        def place(count):
+            with CaptureQueriesContext(connection) as ctx:
+                response = self.client.post(self.url, [self._cart() for _ in range(count)], format='json')
+            self.assertEqual(response.status_code, 201)
+            self.assertEqual(len(response.data), count)
+            return len(ctx.captured_queries)
+
+        self.assertEqual(place(2), place(40))
+        self.assertEqual(Order.objects.count(), 42)
+        self.assertEqual(OrderItem.objects.count(), 42)
+
+    def test_invalid_cart_rejects_whole_batch(self):
+        carts = [self._cart(), self._cart({'dish': self.gone.id, 'quantity': 1})]
+        response = self.client.post(self.url, carts, format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data[0], {})
+        self.assertIn('items', response.data[1])
+        self.assertFalse(Order.objects.exists())
+
+    def test_rejects_stale_price_and_foreign_dish(self):
+        response = self.client.post(self.url, self._cart({'dish': self.pizza.id, 'quantity': 1, 'unit_price': '7.00'}), format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('unit_price', response.data['items'][0])
+
+        response = self.client.post(self.url, self._cart({'dish': self.roll.id, 'quantity': 1}), format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('dish', response.data['items'][0])
+
+    def test_rejects_someone_elses_address(self):
+        stranger = Customer.objects.create(first_name='Bob', email='bob@example.com')
+        response = self.client.post(self.url, self._cart(customer=stranger.id), format='json')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('delivery_address', response.data)
+
+    def test_requires_authentication(self):
+        self.client.force_authenticate(None)
+        response = self.client.post(self.url, self._cart(), format='json')
+        self.assertIn(response.status_code, (401, 403))
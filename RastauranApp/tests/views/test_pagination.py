@@ -0,0 +1,99 @@
+from base64 import b64encode
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from RastauranApp.models import Restaurant, Customer, Order
+
+
+class CursorPaginationTest(APITestCase):
+    def setUp(self):
+        self.restaurant = Restaurant.objects.create(name='Pizza Palace', rating=Decimal('4.50'))
+        customer = Customer.objects.create(first_name='Alice', email='alice@example.com')
+        self.orders = [
+            Order.objects.create(customer=customer, restaurant=self.restaurant, total_amount=Decimal('10.00'))
+            for _ in range(7)
+        ]
+
+    def _walk(self, url, params):
+        ids, pages = [], 0
+        response = self.client.get(url, params)
+        while True:
+            self.assertEqual(response.status_code, 200)
+            ids.extend(row['id'] for row in response.data['results'])
+            pages += 1
+            if not response.data['next']:
+                return ids, pages
+            response = self.client.get(response.data['next'])
+
+    def test_orders_walk_newest_first_without_gaps(self):
+        ids, pages = self._walk(reverse('order-list'), {'page_size': 3})
+        self.assertEqual(pages, 3)
+        self.assertEqual(ids, [order.id for order in reversed(self.orders)])
+
+    def test_cursor_is_opaque(self):
+        response = self.client.get(reverse('order-list'), {'page_size': 3})
+        self.assertIn('cursor=', response.data['next'])
+        self.assertNotIn('offset', response.data['next'])
+        self.assertNotIn('page=', response.data['next'])
+
+    def test_next_page_range_scans_the_ordering_index(self):
+        response = self.client.get(reverse('order-list'), {'page_size': 3})
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(response.data['next'])
+        page_sql = next(query['sql'] for query in queries if 'ORDER BY' in query['sql'])
+
+        with connection.cursor() as cursor:
+            # The table is tiny, so take sequential scans off the table to see the index bound.
+            cursor.execute('SET LOCAL enable_seqscan = off')
+            cursor.execute(f'EXPLAIN {page_sql}')
+            plan = '\n'.join(row[0] for row in cursor.fetchall())
+        self.assertIn('orders_placed_idx', plan)
+        self.assertRegex(plan, r'Index Cond: \(placed_at <=')
+
+    def test_restaurants_keep_filters_and_ordering(self):
+        for i in range(5):
+            Restaurant.objects.create(name='Burger Barn', rating=Decimal('4.00'), description=f'Branch {i}')
+        Restaurant.objects.create(name='Burger Closed', rating=Decimal('4.00'), is_active=False)
+
+        params = {'search': 'burger', 'is_active': 'true', 'ordering': '-rating', 'page_size': 2}
+        ids, pages = self._walk(reverse('restaurant-list'), params)
+        self.assertEqual(pages, 3)
+        self.assertEqual(len(ids), len(set(ids)))
+        self.assertEqual(
+            ids,
+            list(Restaurant.objects.filter(name='Burger Barn').order_by('-rating', 'id').values_list('id', flat=True)),
+        )
+
+    def test_restaurants_page_through_ties_and_nulls(self):
+        Restaurant.objects.all().delete()
+        for rating in (None, '4.00', None, '4.00', '4.00', None, '3.50'):
+            Restaurant.objects.create(name='Burger Barn', rating=Decimal(rating) if rating else None)
+
+        for ordering in ('rating', '-rating'):
+            with self.subTest(ordering=ordering):
+                expected = list(Restaurant.objects.order_by(ordering, 'id').values_list('id', flat=True))
+                ids, pages = self._walk(reverse('restaurant-list'), {'ordering': ordering, 'page_size': 2})
+                self.assertEqual(ids, expected)
+                self.assertEqual(pages, 4)
+
+                # Walking back from the last page returns the same pages in reverse.
+                response = self.client.get(reverse('restaurant-list'), {'ordering': ordering, 'page_size': 2})
+                while response.data['next']:
+                    response = self.client.get(response.data['next'])
+                back = []
+                while True:
+                    back = [row['id'] for row in response.data['results']] + back
+                    if not response.data['previous']:
+                        break
+                    response = self.client.get(response.data['previous'])
+                self.assertEqual(back, expected)
+
+    def test_malformed_cursors_are_rejected(self):
+        url = reverse('restaurant-list')
+        stale = b64encode(b'p=["4.50"]').decode()  # one value where the ordering has two fields
+        for cursor in ('bm90LWEtY3Vyc29y', stale):
+            with self.subTest(cursor=cursor):
+                self.assertEqual(self.client.get(url, {'cursor': cursor}).status_code, 404)
@@ -0,0 +1,85 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from RastauranApp.mixins import plan_for
+from RastauranApp.models import Restaurant, Menu, Dish, Customer, Address, Driver, Order, OrderItem, Delivery, Payment
+from RastauranApp.serializers import OrderItemSerializer, OrderSerializer, RestaurantSerializer
+
+
+def make_order_graph(index):
+    restaurant = Restaurant.objects.create(name=f'Restaurant {index}', description='Long description')
+    menu = Menu.objects.create(restaurant=restaurant, name='Main')
+    dish = Dish.objects.create(menu=menu, restaurant=restaurant, name='Pizza', price=Decimal('9.50'))
+    customer = Customer.objects.create(first_name=f'Customer {index}', email=f'customer{index}@example.com')
+    address = Address.objects.create(customer=customer, restaurant=restaurant, street='Main st', city='Tashkent')
+    driver = Driver.objects.create(restaurant=restaurant, first_name='Dan')
+    order = Order.objects.create(
+        customer=customer, restaurant=restaurant, delivery_address=address, total_amount=Decimal('19.00')
+    )
+    OrderItem.objects.create(
+        order=order, dish=dish, name='Pizza', unit_price=Decimal('9.50'), quantity=2, total_price=Decimal('19.00')
+    )
+    Delivery.objects.create(order=order, driver=driver)
+    Payment.objects.create(order=order, provider='card', amount=Decimal('19.00'))
+    return order
+
+
+class QueryPlanTest(APITestCase):
+    list_routes = [
+        'restaurant-list', 'menu-list', 'dish-list', 'customer-list', 'address-list', 'driver-list',
+        'order-list', 'order-item-list', 'delivery-list', 'payment-list',
+    ]
+    detail_routes = {
+        'restaurant-detail': Restaurant, 'menu-detail': Menu, 'dish-detail': Dish, 'customer-detail': Customer,
+        'address-detail': Address, 'driver-detail': Driver, 'order-detail': Order,
+        'order-item-detail': OrderItem, 'delivery-detail': Delivery, 'payment-detail': Payment,
+    }
+
+    def setUp(self):
+        cache.clear()
+        for i in range(4):
+            make_order_graph(i)
+
+    @staticmethod
+    def _expected_queries(model):
+        # Models with updated_at spend one extra query on the ETag validator.
+        return 2 if any(field.name == 'updated_at' for field in model._meta.fields) else 1
+
+    def test_list_endpoints_use_constant_queries(self):
+        for route, model in zip(self.list_routes, self.detail_routes.values()):
+            with self.subTest(route=route), self.assertNumQueries(self._expected_queries(model)):
+                response = self.client.get(reverse(route))
+                self.assertEqual(len(response.data['results']), 4)
+
+    def test_detail_endpoints_use_constant_queries(self):
+        for route, model in self.detail_routes.items():
+            pk = model.objects.values_list('pk', flat=True).first()
+            # The restaurant detail reads its validator from the serialized row.
+            expected = 1 if route == 'restaurant-detail' else self._expected_queries(model)
+            with self.subTest(route=route), self.assertNumQueries(expected):
+                response = self.client.get(reverse(route, args=[pk]))
+                self.assertEqual(response.status_code, 200)
+
+    def test_nested_output_is_unchanged(self):
+        response = self.client.get(reverse('order-item-list'))
+        item = response.data['results'][0]
+        self.assertEqual(item['order'], {'status': 0})
+        self.assertEqual(item['dish'], {'name': 'Pizza'})
+
+    def test_plan_joins_nested_relations_and_trims_them(self):
+        related, only = plan_for(OrderSerializer)
+        self.assertEqual(related, ('restaurant', 'delivery_address'))
+        self.assertIn('restaurant__name', only)
+        self.assertNotIn('restaurant__description', only)
+        self.assertIn('delivery_address__city', only)
+
+        related, only = plan_for(OrderItemSerializer)
+        self.assertEqual(related, ('order', 'dish'))
+        self.assertNotIn('order__notes', only)
+
+    def test_plan_skips_annotations(self):
+        related, only = plan_for(RestaurantSerializer)
+        self.assertEqual(related, ())
+        self.assertNotIn('comments_count', only)
@@ -0,0 +1,121 @@
+import threading
+from io import StringIO
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.db import connection
+from django.test import TransactionTestCase
+from django.urls import reverse
+from rest_framework.test import APIClient, APITestCase
+from RastauranApp.models import Restaurant, Customer, Comment, Reaction
+
+
+def _assert_counters_match_rows(testcase, comment):
+    comment.refresh_from_db()
+    testcase.assertEqual(comment.likes_count, comment.reactions.filter(is_like=True).count())
+    testcase.assertEqual(comment.dislikes_count, comment.reactions.filter(is_like=False).count())
+
+
+class CommentReactCountersTest(APITestCase):
+    def setUp(self):
+        self.restaurant = Restaurant.objects.create(name='Pizza Palace')
+        self.customer = Customer.objects.create(first_name='Alice', email='alice@example.com')
+        self.other = Customer.objects.create(first_name='Bob', email='bob@example.com')
+        self.comment = Comment.objects.create(customer=self.customer, restaurant=self.restaurant, text='Great')
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+        self.client.force_authenticate(self.user)
+        self.url = reverse('comment-react', args=[self.comment.id])
+
+    def test_like_then_toggle_off(self):
+        response = self.client.post(self.url, {'customer_id': self.customer.id, 'is_like': True}, format='json')
+        self.assertEqual(response.data, {'status': 'liked'})
+        self.comment.refresh_from_db()
+        self.assertEqual(self.comment.likes_count, 1)
+
+        response = self.client.post(self.url, {'customer_id': self.customer.id}, format='json')
+        self.assertEqual(response.data, {'status': 'reaction removed'})
+        self.comment.refresh_from_db()
+        self.assertEqual(self.comment.likes_count, 0)
+
+    def test_dislike_updates_dislikes_only(self):
+        self.client.post(self.url, {'customer_id': self.customer.id, 'is_like': True}, format='json')
+        self.client.post(self.url, {'customer_id': self.other.id, 'is_like': False}, format='json')
+        self.comment.refresh_from_db()
+        self.assertEqual((self.comment.likes_count, self.comment.dislikes_count), (1, 1))
+        _assert_counters_match_rows(self, self.comment)
+
+    def test_comment_list_reads_counters(self):
+        Comment.objects.filter(pk=self.comment.pk).update(likes_count=7, dislikes_count=3)
+        response = self.client.get(reverse('restaurant-comments', args=[self.restaurant.id]))
+        self.assertEqual(response.data['results'][0]['likes'], 7)
+        self.assertEqual(response.data['results'][0]['dislikes'], 3)
+
+
+class RepairReactionCountersCommandTest(APITestCase):
+    def setUp(self):
+        restaurant = Restaurant.objects.create(name='Pizza Palace')
+        self.customer = Customer.objects.create(first_name='Alice', email='alice@example.com')
+        self.comments = [
+            Comment.objects.create(customer=self.customer, restaurant=restaurant, text=f'Comment {i}')
+            for i in range(5)
+        ]
+        for comment in self.comments:
+            Reaction.objects.create(customer=self.customer, comment=comment, is_like=True)
+        Comment.objects.filter(pk__in=[c.pk for c in self.comments[:3]]).update(likes_count=1)
+        Comment.objects.filter(pk=self.comments[3].pk).update(dislikes_count=4)
+
+    def test_repairs_only_drifted_rows(self):
+        out = StringIO()
+        call_command('repair_reaction_counters', batch_size=2, stdout=out)
+        self.assertIn('Repaired 2 comment(s)', out.getvalue())
+        for comment in self.comments:
+            _assert_counters_match_rows(self, comment)
+
+    def test_dry_run_leaves_rows_untouched(self):
+        out = StringIO()
+        call_command('repair_reaction_counters', dry_run=True, stdout=out)
+        self.assertIn('Found 2 comment(s)', out.getvalue())
+        self.comments[4].refresh_from_db()
+        self.assertEqual(self.comments[4].likes_count, 0)
+
+
+class ConcurrentReactTest(TransactionTestCase):
+    def setUp(self):
+        restaurant = Restaurant.objects.create(name='Pizza Palace')
+        self.customers = [
+            Customer.objects.create(first_name=f'Customer {i}', email=f'customer{i}@example.com')
+            for i in range(8)
+        ]
+        self.comment = Comment.objects.create(customer=self.customers[0], restaurant=restaurant, text='Great')
+        self.user = User.objects.create_user(username='testuser', password='testpass123')
+
+    def _hammer(self, customer, toggles, errors):
+        client = APIClient()
+        client.force_authenticate(self.user)
+        url = reverse('comment-react', args=[self.comment.id])
+        try:
+            for i in range(toggles):
+                response = client.post(url, {'customer_id': customer.id, 'is_like': i % 4 != 0}, format='json')
+                if response.status_code != 200:
+                    errors.append(response.status_code)
+        except Exception as exc:
+            errors.append(exc)
+        finally:
+            connection.close()
+
+    def test_concurrent_toggles_keep_counters_consistent(self):
+        if not connection.features.has_select_for_update:
+            self.skipTest('Database does not support row locking.')
+        errors = []
+        threads = [
+            threading.Thread(target=self._hammer, args=(customer, toggles, errors))
+            for customer in self.customers
+            for toggles in (9, 9)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(errors, [])
+        _assert_counters_match_rows(self, self.comment)
@@ -0,0 +1,106 @@
+from io import StringIO
+from datetime import date, datetime, timedelta, timezone as dt_timezone
+from decimal import Decimal
+
+from django.contrib.auth.models import User
+from django.core.management import call_command
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from RastauranApp.models import Restaurant, Menu, Dish, Customer, Order, OrderItem, RestaurantDailyStats, DishDailyStats
+from RastauranApp.services.analytics import refresh_daily_stats
+
+
+@override_settings(TIME_ZONE='Asia/Tashkent', ANALYTICS_REFRESH_OVERLAP_SECONDS=0)
+class RestaurantAnalyticsTest(APITestCase):
+    def setUp(self):
+        self.restaurant = Restaurant.objects.create(name='Pizza Palace')
+        self.other = Restaurant.objects.create(name='Burger Barn')
+        menu = Menu.objects.create(restaurant=self.restaurant, name='Main')
+        self.plov = Dish.objects.create(menu=menu, restaurant=self.restaurant, name='Plov', price=Decimal('8.00'))
+        self.tea = Dish.objects.create(menu=menu, restaurant=self.restaurant, name='Tea', price=Decimal('1.50'))
+        self.customer = Customer.objects.create(first_name='Alice', email='alice@example.com')
+        self.client.force_authenticate(User.objects.create_user(username='partner', password='testpass123'))
+        self.url = reverse('restaurant-analytics', args=[self.restaurant.pk])
+
+    def _order(self, placed_at, lines, restaurant=None):
+        order = Order.objects.create(
+            customer=self.customer, restaurant=restaurant or self.restaurant,
+            total_amount=sum(dish.price * quantity for dish, quantity in lines),
+        )
+        Order.objects.filter(pk=order.pk).update(placed_at=placed_at)
+        for dish, quantity in lines:
+            OrderItem.objects.create(
+                order=order, dish=dish, name=dish.name, unit_price=dish.price, quantity=quantity, total_price=dish.price * quantity
+            )
+        return order
+
+    def test_rollups_bucket_by_local_day(self):
+        # 20:30 UTC on March 1st is already March 2nd in Tashkent (UTC+5).
+        self._order(datetime(2025, 3, 1, 10, 0, tzinfo=dt_timezone.utc), [(self.plov, 2)])
+        self._order(datetime(2025, 3, 1, 20, 30, tzinfo=dt_timezone.utc), [(self.plov, 1), (self.tea, 2)])
+        self._order(datetime(2025, 3, 2, 9, 0, tzinfo=dt_timezone.utc), [(self.tea, 1)])
+        self._order(datetime(2025, 3, 2, 9, 0, tzinfo=dt_timezone.utc), [], restaurant=self.other)
+
+        self.assertEqual(refresh_daily_stats(), 3)
+        rows = RestaurantDailyStats.objects.filter(restaurant=self.restaurant).order_by('day')
+        self.assertEqual(
+            [(row.day, row.orders_count, row.items_count, row.revenue) for row in rows],
+            [(date(2025, 3, 1), 1, 2, Decimal('16.00')), (date(2025, 3, 2), 2, 4, Decimal('12.50'))],
+        )
+        tea = DishDailyStats.objects.get(dish=self.tea, day=date(2025, 3, 2))
+        self.assertEqual((tea.orders_count, tea.quantity, tea.revenue), (2, 3, Decimal('4.50')))
+
+    def test_incremental_refresh_only_touches_changed_days(self):
+        first = self._order(datetime(2025, 3, 1, 10, 0, tzinfo=dt_timezone.utc), [(self.plov, 1)])
+        self._order(datetime(2025, 3, 5, 10, 0, tzinfo=dt_timezone.utc), [(self.plov, 1)])
+        refresh_daily_stats()
+        untouched = RestaurantDailyStats.objects.get(day=date(2025, 3, 5))
+        self.assertEqual(refresh_daily_stats(), 0)
+
+        first.refresh_from_db()
+        first.total_amount = Decimal('20.00')
+        first.save()
+        self._order(datetime(2025, 3, 1, 11, 0, tzinfo=dt_timezone.utc), [(self.tea, 4)])
+        self.assertEqual(refresh_daily_stats(), 1)
+
+        day = RestaurantDailyStats.objects.get(day=date(2025, 3, 1))
+        self.assertEqual((day.orders_count, day.revenue), (2, Decimal('26.00')))
+        self.assertEqual(RestaurantDailyStats.objects.get(day=date(2025, 3, 5)).pk, untouched.pk)
+
+    def test_full_rebuild_drops_deleted_orders(self):
+        order = self._order(datetime(2025, 3, 1, 10, 0, tzinfo=dt_timezone.utc), [(self.plov, 1)])
+        refresh_daily_stats()
+        order.delete()
+        call_command('refresh_analytics', '--full', stdout=StringIO())
+        self.assertFalse(RestaurantDailyStats.objects.exists())
+        self.assertFalse(DishDailyStats.objects.exists())
+
+    def test_endpoint_sums_rollups_over_the_range(self):
+        for day in range(1, 4):
+            self._order(datetime(2025, 3, day, 10, 0, tzinfo=dt_timezone.utc), [(self.plov, day), (self.tea, 1)])
+        self._order(datetime(2025, 4, 1, 10, 0, tzinfo=dt_timezone.utc), [(self.tea, 9)])
+        refresh_daily_stats()
+
+        with self.assertNumQueries(4):
+            response = self.client.get(self.url, {'start': '2025-03-01', 'end': '2025-03-31', 'top': 1})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['orders_count'], 3)
+        self.assertEqual(response.data['revenue'], '52.50')
+        self.assertEqual(response.data['average_basket'], '17.50')
+        self.assertEqual([day['day'] for day in response.data['days']], ['2025-03-01', '2025-03-02', '2025-03-03'])
+        self.assertEqual(response.data['days'][0]['average_basket'], '9.50')
+        self.assertEqual(
+            response.data['top_dishes'],
+            [{'dish': self.plov.pk, 'name': 'Plov', 'quantity': 6, 'orders_count': 3, 'revenue': '48.00'}],
+        )
+        self.assertIsNotNone(response.data['refreshed_through'])
+
+    def test_empty_range_and_bad_input(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual((response.data['orders_count'], response.data['average_basket']), (0, None))
+        self.assertEqual(date.fromisoformat(response.data['end']) - date.fromisoformat(response.data['start']), timedelta(days=29))
+
+        self.assertEqual(self.client.get(self.url, {'start': '2025-03-02', 'end': '2025-03-01'}).status_code, 400)
+        self.assertEqual(self.client.get(reverse('restaurant-analytics', args=[self.other.pk + 100])).status_code, 404)
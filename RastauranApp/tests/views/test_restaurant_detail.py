@@ -0,0 +1,57 @@
+from decimal import Decimal
+
+from django.core.cache import cache
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from RastauranApp.models import Restaurant, Menu, Dish, Customer, Comment
+
+
+class RestaurantDetailStatsTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        self.restaurant = Restaurant.objects.create(name='Pizza Palace')
+        other = Restaurant.objects.create(name='Sushi Spot')
+        customer = Customer.objects.create(first_name='Alice', email='alice@example.com')
+        for rating in (5, 4, 3):
+            Comment.objects.create(customer=customer, restaurant=self.restaurant, text='ok', rating=rating)
+        Comment.objects.create(customer=customer, restaurant=self.restaurant, text='hidden', rating=1, is_active=False)
+        Comment.objects.create(customer=customer, restaurant=other, text='other', rating=1)
+
+        main = Menu.objects.create(restaurant=self.restaurant, name='Main')
+        retired = Menu.objects.create(restaurant=self.restaurant, name='Winter', is_active=False)
+        Dish.objects.create(menu=main, restaurant=self.restaurant, name='Margherita', price=Decimal('8.00'))
+        Dish.objects.create(menu=main, restaurant=self.restaurant, name='Calzone', price=Decimal('9.00'), is_available=False)
+        Dish.objects.create(menu=retired, restaurant=self.restaurant, name='Soup', price=Decimal('4.00'))
+        self.url = reverse('restaurant-detail', args=[self.restaurant.id])
+
+    def test_stats_values(self):
+        response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['comments_count'], 3)
+        self.assertEqual(response.data['average_rating'], '4.00')
+        self.assertEqual(response.data['menus_count'], 2)
+        self.assertEqual(response.data['active_dishes_count'], 1)
+
+    def test_empty_restaurant_has_zero_counts(self):
+        empty = Restaurant.objects.create(name='Empty')
+        response = self.client.get(reverse('restaurant-detail', args=[empty.id]))
+        self.assertEqual(response.data['comments_count'], 0)
+        self.assertIsNone(response.data['average_rating'])
+        self.assertEqual(response.data['menus_count'], 0)
+
+    def test_stats_come_from_one_query(self):
+        # The ETag validator and the response share the annotated row.
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        cache.clear()
+        with self.assertNumQueries(1):
+            self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+
+    def test_new_comment_changes_cached_detail_and_etag(self):
+        first = self.client.get(self.url)
+        with self.captureOnCommitCallbacks(execute=True):
+            Comment.objects.create(customer=Customer.objects.get(), restaurant=self.restaurant, text='new', rating=5)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=first['ETag'])
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-Cache'], 'MISS')
+        self.assertEqual(response.data['comments_count'], 4)
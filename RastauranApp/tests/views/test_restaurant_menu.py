@@ -0,0 +1,92 @@
+from io import StringIO
+from decimal import Decimal
+
+from django.core.management import call_command
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from RastauranApp.models import Restaurant, Menu, Dish, MenuDocument
+
+
+class RestaurantMenuDocumentTest(APITestCase):
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.restaurant = Restaurant.objects.create(name='Pizza Palace', phone='+998 71 000 00 00')
+            self.main = Menu.objects.create(restaurant=self.restaurant, name='Main')
+            self.drinks = Menu.objects.create(restaurant=self.restaurant, name='Drinks')
+            Menu.objects.create(restaurant=self.restaurant, name='Winter', is_active=False)
+            self.pizza = Dish.objects.create(menu=self.main, restaurant=self.restaurant, name='Margherita', price=Decimal('8.50'))
+            Dish.objects.create(menu=self.main, restaurant=self.restaurant, name='Calzone', price=Decimal('9.00'), is_available=False)
+            Dish.objects.create(menu=self.drinks, restaurant=self.restaurant, name='Ayran', price=Decimal('1.20'), prep_time_minutes=1)
+            other = Restaurant.objects.create(name='Burger Barn')
+            Dish.objects.create(menu=Menu.objects.create(restaurant=other, name='Main'), restaurant=other, name='Burger', price=Decimal('5.00'))
+        self.url = reverse('restaurant-menu', args=[self.restaurant.pk])
+
+    def test_document_nests_active_menus_and_available_dishes(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data, {
+            'id': self.restaurant.pk, 'name': 'Pizza Palace', 'phone': '+998 71 000 00 00', 'email': None, 'description': None,
+            'menus': [
+                {'id': self.drinks.pk, 'name': 'Drinks', 'description': None, 'dishes': [
+                    {'id': response.data['menus'][0]['dishes'][0]['id'], 'name': 'Ayran', 'description': None,
+                     'price': '1.20', 'currency': 'USD', 'prep_time_minutes': 1},
+                ]},
+                {'id': self.main.pk, 'name': 'Main', 'description': None, 'dishes': [
+                    {'id': self.pizza.pk, 'name': 'Margherita', 'description': None,
+                     'price': '8.50', 'currency': 'USD', 'prep_time_minutes': None},
+                ]},
+            ],
+        })
+
+    def test_menu_and_dish_changes_rebuild_the_document(self):
+        built_at = MenuDocument.objects.get(pk=self.restaurant.pk).built_at
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pizza.price = Decimal('9.25')
+            self.pizza.save()
+        self.assertEqual(self.client.get(self.url).data['menus'][1]['dishes'][0]['price'], '9.25')
+        self.assertGreater(MenuDocument.objects.get(pk=self.restaurant.pk).built_at, built_at)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.drinks.is_active = False
+            self.drinks.save()
+            self.pizza.delete()
+        self.assertEqual(self.client.get(self.url).data['menus'], [
+            {'id': self.main.pk, 'name': 'Main', 'description': None, 'dishes': []},
+        ])
+
+        with self.captureOnCommitCallbacks(execute=True):
+            Restaurant.objects.filter(pk=self.restaurant.pk).first().delete()
+        self.assertFalse(MenuDocument.objects.filter(pk=self.restaurant.pk).exists())
+        self.assertEqual(self.client.get(self.url).status_code, 404)
+
+    def test_moving_a_dish_rebuilds_both_restaurants(self):
+        other = Restaurant.objects.get(name='Burger Barn')
+        other_menu = other.menus.get()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pizza.menu, self.pizza.restaurant = other_menu, other
+            self.pizza.save()
+
+        self.assertEqual(self.client.get(self.url).data['menus'][1]['dishes'], [])
+        other_dishes = self.client.get(reverse('restaurant-menu', args=[other.pk])).data['menus'][0]['dishes']
+        self.assertEqual([dish['name'] for dish in other_dishes], ['Burger', 'Margherita'])
+
+    def test_missing_document_is_built_on_first_read(self):
+        MenuDocument.objects.all().delete()
+        self.assertEqual(self.client.get(self.url).data['name'], 'Pizza Palace')
+        self.assertTrue(MenuDocument.objects.filter(pk=self.restaurant.pk).exists())
+        self.assertEqual(self.client.get(reverse('restaurant-menu', args=[self.restaurant.pk + 100])).status_code, 404)
+
+    def test_conditional_get(self):
+        response = self.client.get(self.url)
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pizza.save()
+        self.assertEqual(self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code, 200)
+
+    def test_rebuild_command(self):
+        MenuDocument.objects.all().delete()
+        out = StringIO()
+        call_command('rebuild_menu_documents', stdout=out)
+        self.assertIn('Rebuilt 2 menu document(s)', out.getvalue())
+        self.assertEqual(MenuDocument.objects.count(), 2)
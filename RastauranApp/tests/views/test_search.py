@@ -0,0 +1,48 @@
+from decimal import Decimal
+
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from RastauranApp.models import Restaurant, Menu, Dish
+
+
+class FullTextSearchTest(APITestCase):
+    def setUp(self):
+        self.pizza = Restaurant.objects.create(name='Pizza Palace', description='Wood fired ovens', rating=Decimal('4.10'))
+        self.burgers = Restaurant.objects.create(name='Grill House', description='Great burgers and pizza', rating=Decimal('4.90'))
+        self.sushi = Restaurant.objects.create(name='Sushi Spot', description='Fresh fish', email='hello@sushi.example')
+        menu = Menu.objects.create(restaurant=self.pizza, name='Main')
+        self.margherita = Dish.objects.create(menu=menu, restaurant=self.pizza, name='Margherita', price=Decimal('8.00'))
+        Dish.objects.create(menu=menu, restaurant=self.pizza, name='Pepperoni', price=Decimal('9.00'))
+
+    def _search(self, route, term, **params):
+        response = self.client.get(reverse(route), {'search': term, **params})
+        self.assertEqual(response.status_code, 200)
+        return [row['id'] for row in response.data['results']]
+
+    def test_matches_stemmed_words(self):
+        self.assertEqual(self._search('restaurant-list', 'burger'), [self.burgers.id])
+
+    def test_name_matches_rank_above_description_matches(self):
+        self.assertEqual(self._search('restaurant-list', 'pizza'), [self.pizza.id, self.burgers.id])
+
+    def test_trigram_fallback_catches_typos(self):
+        self.assertEqual(self._search('restaurant-list', 'piza'), [self.pizza.id])
+
+    def test_explicit_ordering_overrides_relevance(self):
+        self.assertEqual(self._search('restaurant-list', 'pizza', ordering='-rating'), [self.burgers.id, self.pizza.id])
+
+    def test_ranked_results_paginate(self):
+        for i in range(4):
+            Restaurant.objects.create(name=f'Pizza Corner {i}')
+        ids, response = [], self.client.get(reverse('restaurant-list'), {'search': 'pizza', 'page_size': 2})
+        while True:
+            ids.extend(row['id'] for row in response.data['results'])
+            if not response.data['next']:
+                break
+            response = self.client.get(response.data['next'])
+        self.assertEqual(len(ids), 6)
+        self.assertEqual(len(set(ids)), 6)
+
+    def test_dish_search_reuses_backend(self):
+        self.assertEqual(self._search('dish-list', 'margerita'), [self.margherita.id])
+        self.assertNotIn('search_vector', self.client.get(reverse('dish-list')).data['results'][0])
@@ -0,0 +1,51 @@
+from decimal import Decimal
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from rest_framework.test import APITestCase
+from RastauranApp.models import Restaurant, Menu, Dish
+
+
+class SparseFieldsTest(APITestCase):
+    def setUp(self):
+        for i in range(3):
+            restaurant = Restaurant.objects.create(
+                name=f'Restaurant {i}', rating=Decimal('4.50'), description='A very long description'
+            )
+            menu = Menu.objects.create(restaurant=restaurant, name='Main')
+            Dish.objects.create(menu=menu, restaurant=restaurant, name=f'Dish {i}', price=Decimal('5.00'))
+
+    def _get(self, route, params):
+        with CaptureQueriesContext(connection) as ctx:
+            response = self.client.get(reverse(route), params)
+        return response, ctx.captured_queries[-1]['sql']
+
+    def test_output_and_select_list_are_trimmed(self):
+        response, sql = self._get('restaurant-list', {'fields': 'id,name,rating'})
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(set(response.data['results'][0]), {'id', 'name', 'rating'})
+        self.assertNotIn('"description"', sql)
+        self.assertNotIn('"phone"', sql)
+
+    def test_nested_field_keeps_join(self):
+        response, sql = self._get('dish-list', {'fields': 'id,restaurant'})
+        self.assertEqual(response.data['results'][0]['restaurant'], {'name': 'Restaurant 2'})
+        self.assertIn('JOIN "restaurants"', sql)
+        self.assertNotIn('"dishes"."description"', sql)
+
+    def test_no_fields_returns_everything(self):
+        response, _ = self._get('restaurant-list', {})
+        self.assertIn('description', response.data['results'][0])
+
+    def test_unknown_field_is_rejected(self):
+        response = self.client.get(reverse('restaurant-list'), {'fields': 'id,secret'})
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('fields', response.data)
+
+    def test_cursor_still_works_with_sparse_fields(self):
+        response = self.client.get(reverse('dish-list'), {'fields': 'id', 'page_size': 2})
+        self.assertEqual(len(response.data['results']), 2)
+        with self.assertNumQueries(2):
+            next_page = self.client.get(response.data['next'])
+        self.assertEqual(len(next_page.data['results']), 1)
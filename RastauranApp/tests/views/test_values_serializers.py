@@ -0,0 +1,77 @@
+from decimal import Decimal
+from unittest import mock
+
+from django.core.cache import cache
+from django.test import override_settings
+from django.urls import reverse
+from django.utils import timezone
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+from RastauranApp.mixins import values_plan_for
+from RastauranApp.models import Restaurant, Menu, Dish, Customer, Order, OrderItem, Payment
+from RastauranApp.serializers import DishSerializer, OrderItemSerializer, PaymentSerializer, CommentSerializer
+
+
+@override_settings(TIME_ZONE='Asia/Tashkent')
+class ValuesSerializerEquivalenceTest(APITestCase):
+    def setUp(self):
+        cache.clear()
+        restaurant = Restaurant.objects.create(name='Pizza Palace')
+        menu = Menu.objects.create(restaurant=restaurant, name='Main')
+        self.dishes = [
+            Dish.objects.create(menu=menu, restaurant=restaurant, name='Margherita pizza', description='Tomato, basil', price=Decimal('8.50')),
+            Dish.objects.create(menu=menu, restaurant=restaurant, name='Pepperoni pizza', price=Decimal('10.00'), prep_time_minutes=12, is_available=False),
+            Dish.objects.create(menu=menu, restaurant=restaurant, name='Ayran', price=Decimal('1.20')),
+        ]
+        customer = Customer.objects.create(first_name='Alice', email='alice@example.com')
+        for i in range(3):
+            order = Order.objects.create(customer=customer, restaurant=restaurant, total_amount=Decimal('19.70'), status=i % 3)
+            OrderItem.objects.create(order=order, dish=self.dishes[i], name='Pizza', unit_price=Decimal('8.50'), quantity=2, total_price=Decimal('17.00'))
+            # A dish that was deleted later leaves a NULL foreign key.
+            OrderItem.objects.create(order=order, dish=None, name='Retired', unit_price=Decimal('2.70'), quantity=1, total_price=Decimal('2.70'))
+            Payment.objects.create(order=order, provider='card' if i else None, amount=Decimal('19.70'), status=i % 3,
+                                   transaction_id=f'tx-{i}', paid_at=timezone.now() if i else None)
+
+    def assertSameAsSerializer(self, serializer_class, queryset, names=None):
+        plan = values_plan_for(serializer_class, names)
+        serializer = serializer_class(queryset, many=True)
+        if names:
+            for name in set(serializer.child.fields) - names:
+                serializer.child.fields.pop(name)
+        self.assertEqual(JSONRenderer().render(plan.render(plan.rows(queryset))), JSONRenderer().render(serializer.data))
+
+    def test_rows_match_the_model_serializers(self):
+        for serializer_class, model in ((DishSerializer, Dish), (OrderItemSerializer, OrderItem), (PaymentSerializer, Payment)):
+            with self.subTest(serializer=serializer_class.__name__):
+                queryset = model.objects.order_by('id')
+                self.assertSameAsSerializer(serializer_class, queryset)
+                self.assertSameAsSerializer(serializer_class, queryset, frozenset({'id', 'order', 'dish', 'restaurant', 'price', 'amount'}))
+
+    def test_serializers_needing_instances_have_no_plan(self):
+        self.assertIsNone(values_plan_for(CommentSerializer))
+
+    def test_list_endpoints_match_the_serializer_path(self):
+        requests = [
+            ('dish-list', {}), ('dish-list', {'search': 'pizza', 'page_size': 1}), ('dish-list', {'fields': 'id,name,restaurant'}),
+            ('order-item-list', {'page_size': 2}), ('order-item-list', {'fields': 'dish,quantity'}),
+            ('payment-list', {'page_size': 2}), ('payment-list', {'fields': 'order,paid_at'}),
+        ]
+        for url_name, params in requests:
+            with self.subTest(url=url_name, params=params):
+                url = reverse(url_name)
+                fast = self.client.get(url, params)
+                cache.clear()
+                with mock.patch('RastauranApp.mixins.values_plan_for', return_value=None):
+                    slow = self.client.get(url, params)
+                cache.clear()
+                self.assertEqual(fast.status_code, 200)
+                self.assertEqual(fast.content, slow.content)
+                if fast.data.get('next'):
+                    self.assertEqual(self.client.get(fast.data['next']).content, self.client.get(slow.data['next']).content)
+
+    def test_nested_shapes_come_from_one_query(self):
+        with self.assertNumQueries(1):
+            response = self.client.get(reverse('order-item-list'))
+        item = next(row for row in response.data['results'] if row['dish'] is not None)
+        self.assertEqual(set(item['order']), {'status'})
+        self.assertEqual(set(item['dish']), {'name'})
@@ -1,24 +1,27 @@
 from django.urls import path
 from .views import (
-    RestaurantList, RestaurantDetail,
+    RestaurantList, RestaurantDetail, RestaurantAnalyticsView, RestaurantMenuView,
     MenuList, MenuDetail,
     DishList, DishDetail,
     CustomerList, CustomerDetail,
     AddressList, AddressDetail,
-    DriverList, DriverDetail,
-    OrderList, OrderDetail,
+    DriverList, DriverDetail, DriverLocationIngestView, NearestDriversView,
+    OrderList, OrderDetail, OrderPlaceView, OrderTransitionView, OrderExportView,
     OrderItemList, OrderItemDetail,
-    DeliveryList, DeliveryDetail,
+    DeliveryList, DeliveryDetail, DeliveryEventStream,
     PaymentList, PaymentDetail,
     RestaurantCommentsListCreateView,
-    RestaurantRetrieveView,
     CommentReactView,
+    CatalogCacheStatsView,
+    ExportJobListCreateView, ExportJobDetail, ExportJobDownloadView,
 )
 
 
 urlpatterns = [
     path('restaurants/', RestaurantList.as_view(), name='restaurant-list'),
     path('restaurants/<int:pk>/', RestaurantDetail.as_view(), name='restaurant-detail'),
+    path('restaurants/<int:pk>/analytics/', RestaurantAnalyticsView.as_view(), name='restaurant-analytics'),
+    path('restaurants/<int:pk>/menu/', RestaurantMenuView.as_view(), name='restaurant-menu'),
     path('menus/', MenuList.as_view(), name='menu-list'),
     path('menus/<int:pk>/', MenuDetail.as_view(), name='menu-detail'),
     path('dishes/', DishList.as_view(), name='dish-list'),
@@ -29,15 +32,24 @@ urlpatterns = [
     path('addresses/<int:pk>/', AddressDetail.as_view(), name='address-detail'),
     path('drivers/', DriverList.as_view(), name='driver-list'),
     path('drivers/<int:pk>/', DriverDetail.as_view(), name='driver-detail'),
+    path('drivers/locations/', DriverLocationIngestView.as_view(), name='driver-locations'),
+    path('drivers/nearest/', NearestDriversView.as_view(), name='driver-nearest'),
     path('orders/', OrderList.as_view(), name='order-list'),
     path('orders/<int:pk>/', OrderDetail.as_view(), name='order-detail'),
+    path('orders/place/', OrderPlaceView.as_view(), name='order-place'),
+    path('orders/transition/', OrderTransitionView.as_view(), name='order-transition'),
+    path('orders/export/', OrderExportView.as_view(), name='order-export'),
     path('order-items/', OrderItemList.as_view(), name='order-item-list'),
     path('order-items/<int:pk>/', OrderItemDetail.as_view(), name='order-item-detail'),
     path('deliveries/', DeliveryList.as_view(), name='delivery-list'),
     path('deliveries/<int:pk>/', DeliveryDetail.as_view(), name='delivery-detail'),
+    path('deliveries/<int:pk>/events/', DeliveryEventStream.as_view(), name='delivery-events'),
     path('payments/', PaymentList.as_view(), name='payment-list'),
     path('payments/<int:pk>/', PaymentDetail.as_view(), name='payment-detail'),
-    path('restaurants/<int:pk>/', RestaurantRetrieveView.as_view(), name='restaurant-detail'),
     path('restaurants/<int:restaurant_id>/comments/', RestaurantCommentsListCreateView.as_view(), name='restaurant-comments'),
     path('comments/<int:comment_id>/react/', CommentReactView.as_view(), name='comment-react'),
+    path('exports/', ExportJobListCreateView.as_view(), name='export-job-list'),
+    path('exports/<int:pk>/', ExportJobDetail.as_view(), name='export-job-detail'),
+    path('exports/<int:pk>/download/', ExportJobDownloadView.as_view(), name='export-job-download'),
+    path('cache/stats/', CatalogCacheStatsView.as_view(), name='catalog-cache-stats'),
 ]
\ No newline at end of file
@@ -1,118 +1,440 @@
+import asyncio
+import hashlib
+import json
+
 from rest_framework import generics
 from rest_framework.response import Response
-from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated
-from django.db.models import Count
+from rest_framework.permissions import IsAuthenticatedOrReadOnly, IsAuthenticated, IsAdminUser
+from django.conf import settings
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.db.models import Count, F, OuterRef, Subquery
+from django.db.models.functions import Coalesce, Now
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.http import http_date
+from django.views import View
+from rest_framework.exceptions import ValidationError
 from rest_framework.views import APIView
-from .models import Restaurant, Menu, Dish, Customer, Address, Driver, Order, OrderItem, Delivery, Payment, Comment, Reaction
-from .serializers import RestaurantSerializer, MenuSerializer, DishSerializer, CustomerSerializer, AddressSerializer, DriverSerializer, OrderSerializer, OrderItemSerializer, DeliverySerializer, PaymentSerializer, CommentSerializer
+from .models import Restaurant, Menu, Dish, Customer, Address, Driver, Order, OrderItem, Delivery, Payment, Comment, Reaction, ExportJob, MenuDocument
+from .serializers import RestaurantSerializer, RestaurantDetailSerializer, MenuSerializer, DishSerializer, CustomerSerializer, AddressSerializer, DriverSerializer, OrderSerializer, OrderItemSerializer, DeliverySerializer, PaymentSerializer, CommentSerializer, CartSerializer, PlacedOrderSerializer, OrderTransitionSerializer, DriverLocationBatchSerializer, NearestDriverQuerySerializer, NearestDriverSerializer, RestaurantAnalyticsQuerySerializer, RestaurantAnalyticsSerializer, OrderExportFilter, ExportJobSerializer
+from .cache import CachedResponseMixin, stats as cache_stats
+from .mixins import ConditionalGetMixin, QueryPlanMixin, SparseFieldsMixin, ValuesListMixin
+from .pagination import OrderCursorPagination
+from .realtime import delivery_topic, driver_topic, get_broker
+from .search import FullTextSearchFilter
+from .services.export_jobs import read_export
+from .services.exports import FORMATS as EXPORT_FORMATS, ExportStreamingResponse, export_orders_response
+from .services.analytics import restaurant_analytics
+from .services.menus import rebuild_menu_documents
+from .services.drivers import nearest_drivers
+from .services.locations import location_buffer
+from .services.orders import place_orders, transition_orders
 from django_filters.rest_framework import DjangoFilterBackend
 from rest_framework import filters
 
-class RestaurantList(generics.ListAPIView):
+class RestaurantList(CachedResponseMixin, ConditionalGetMixin, SparseFieldsMixin, generics.ListAPIView):
     queryset = Restaurant.objects.all()
     serializer_class = RestaurantSerializer
-    filter_backends = [DjangoFilterBackend, filters.SearchFilter, filters.OrderingFilter]
+    cache_scopes = ["restaurants"]
+    filter_backends = [DjangoFilterBackend, FullTextSearchFilter, filters.OrderingFilter]
     filterset_fields = ['is_active', 'rating']
     search_fields = ['name', 'description', 'email']
     ordering_fields = ['name', 'rating', 'created_at']
     ordering = ['name']
 
     
-class RestaurantDetail(generics.RetrieveAPIView):
+def _per_restaurant(queryset, aggregate):
+    return Subquery(
+        queryset.filter(restaurant=OuterRef("pk")).order_by().values("restaurant").annotate(value=aggregate).values("value")
+    )
+
+
+class RestaurantDetail(CachedResponseMixin, ConditionalGetMixin, QueryPlanMixin, generics.RetrieveAPIView):
     queryset = Restaurant.objects.all()
-    serializer_class = RestaurantSerializer
+    serializer_class = RestaurantDetailSerializer
+    cache_scopes = ["restaurant:{pk}"]
+    validator_extra_fields = ["comments_count", "average_rating", "menus_count", "active_dishes_count"]
 
-class MenuList(generics.ListAPIView):
+    def get_queryset(self):
+        active_comments = Comment.objects.filter(is_active=True)
+        return super().get_queryset().annotate(
+            comments_count=Coalesce(_per_restaurant(active_comments, Count("pk")), 0),
+            average_rating=F("rating"),
+            menus_count=Coalesce(_per_restaurant(Menu.objects.all(), Count("pk")), 0),
+            active_dishes_count=Coalesce(
+                _per_restaurant(Dish.objects.filter(is_available=True, menu__is_active=True), Count("pk")), 0
+            ),
+        )
+
+    def get_object(self):
+        if not hasattr(self, "_object"):
+            self._object = super().get_object()
+        return self._object
+
+    def get_validator_state(self):
+        # The stats are part of the validator, so read the annotated row once
+        # and serialize that same instance rather than run the subqueries twice.
+        restaurant = self.get_object()
+        extra = ",".join(str(getattr(restaurant, name)) for name in self.validator_extra_fields)
+        return restaurant.updated_at, extra
+
+class RestaurantMenuView(APIView):
+    """
+    The restaurant with its active menus and their available dishes in one
+    document. The document is stored pre-rendered and rebuilt whenever the
+    restaurant, one of its menus or dishes changes (see ``services.menus``),
+    so a read is a single primary-key lookup; ``built_at`` backs the
+    ETag/Last-Modified validators.
+    """
+
+    def get(self, request, pk):
+        row = MenuDocument.objects.filter(restaurant_id=pk).values_list("document", "built_at").first()
+        if row is None:
+            # Restaurants from before the documents existed, or a rebuild that failed after commit.
+            rebuild_menu_documents([pk])
+            row = MenuDocument.objects.filter(restaurant_id=pk).values_list("document", "built_at").first()
+            if row is None:
+                raise Http404
+        document, built_at = row
+
+        raw = f"{built_at.isoformat()}|{request.accepted_media_type or ''}"
+        etag = quote_etag(hashlib.sha1(raw.encode()).hexdigest())
+        timestamp = int(built_at.timestamp())
+        response = get_conditional_response(request._request, etag=etag, last_modified=timestamp)
+        if response is None:
+            response = Response(document)
+        response["ETag"] = etag
+        response["Last-Modified"] = http_date(timestamp)
+        return response
+
+class MenuList(CachedResponseMixin, SparseFieldsMixin, generics.ListAPIView):
     queryset = Menu.objects.all()
     serializer_class = MenuSerializer
+    cache_scopes = ["menus"]
 
-class MenuDetail(generics.RetrieveAPIView):
+class MenuDetail(QueryPlanMixin, generics.RetrieveAPIView):
     queryset = Menu.objects.all()
     serializer_class = MenuSerializer
 
-class DishList(generics.ListAPIView):
+class DishList(CachedResponseMixin, ConditionalGetMixin, ValuesListMixin, generics.ListAPIView):
     queryset = Dish.objects.all()
     serializer_class = DishSerializer
+    cache_scopes = ["dishes"]
+    filter_backends = [FullTextSearchFilter]
+    search_fields = ['name']
 
-class DishDetail(generics.RetrieveAPIView):
+class DishDetail(ConditionalGetMixin, QueryPlanMixin, generics.RetrieveAPIView):
     queryset = Dish.objects.all()
     serializer_class = DishSerializer
 
-class CustomerList(generics.ListAPIView):
+class CustomerList(ConditionalGetMixin, SparseFieldsMixin, generics.ListAPIView):
     queryset = Customer.objects.all()
     serializer_class = CustomerSerializer
 
-class CustomerDetail(generics.RetrieveAPIView):
+class CustomerDetail(ConditionalGetMixin, QueryPlanMixin, generics.RetrieveAPIView):
     queryset = Customer.objects.all()
     serializer_class = CustomerSerializer
 
-class AddressList(generics.ListAPIView):
+class AddressList(SparseFieldsMixin, generics.ListAPIView):
     queryset = Address.objects.all()
     serializer_class = AddressSerializer
 
-class AddressDetail(generics.RetrieveAPIView):
+class AddressDetail(QueryPlanMixin, generics.RetrieveAPIView):
     queryset = Address.objects.all()
     serializer_class = AddressSerializer
 
-class DriverList(generics.ListAPIView):
+class DriverList(SparseFieldsMixin, generics.ListAPIView):
     queryset = Driver.objects.all()
     serializer_class = DriverSerializer
 
-class DriverDetail(generics.RetrieveAPIView):
+class DriverDetail(QueryPlanMixin, generics.RetrieveAPIView):
     queryset = Driver.objects.all()
     serializer_class = DriverSerializer
 
-class OrderList(generics.ListAPIView):
+class DriverLocationIngestView(APIView):
+    """
+    Accepts batches of driver pings. They are coalesced in memory to the
+    newest position per driver and written in bulk on the next flush, so the
+    response only confirms receipt.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def post(self, request):
+        serializer = DriverLocationBatchSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        received_at = timezone.now()
+        pings = serializer.validated_data["pings"]
+        for ping in pings:
+            # Device clocks can run ahead; a future timestamp would win the
+            # "newer than stored" guard and pin the driver there until then.
+            ping["recorded_at"] = min(ping.get("recorded_at", received_at), received_at)
+        location_buffer.add(pings)
+        return Response({"accepted": len(pings), "drivers": len({ping["driver"] for ping in pings})}, status=202)
+
+class RestaurantAnalyticsView(APIView):
+    """
+    Revenue, order count, average basket and top dishes for a restaurant over
+    ``?start=&end=`` (local dates, inclusive; the last 30 days by default),
+    read from the daily rollups maintained by ``manage.py refresh_analytics``.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request, pk):
+        query = RestaurantAnalyticsQuerySerializer(data=request.query_params)
+        query.is_valid(raise_exception=True)
+        restaurant = get_object_or_404(Restaurant.objects.only("id"), pk=pk)
+        report = restaurant_analytics(restaurant.pk, **query.validated_data)
+        return Response(RestaurantAnalyticsSerializer(report).data)
+
+class NearestDriversView(APIView):
+    """
+    The closest available drivers to a point, a restaurant's address or any
+    address: ``?latitude=&longitude=``, ``?restaurant=`` or ``?address=``,
+    with ``k``, ``radius_km`` and ``max_age`` (seconds since the last ping).
+    """
+    permission_classes = [IsAuthenticated]
+
+    def get(self, request):
+        serializer = NearestDriverQuerySerializer(data=request.query_params)
+        serializer.is_valid(raise_exception=True)
+        params = serializer.validated_data
+        if "latitude" in params:
+            origin = (params["latitude"], params["longitude"])
+        else:
+            addresses = Address.objects.filter(latitude__isnull=False, longitude__isnull=False)
+            if "restaurant" in params:
+                addresses = addresses.filter(restaurant_id=params["restaurant"], customer__isnull=True)
+            else:
+                addresses = addresses.filter(pk=params["address"])
+            origin = addresses.order_by("id").values_list("latitude", "longitude").first()
+            if origin is None:
+                raise ValidationError({"detail": ["No address with coordinates to search from."]})
+        drivers = nearest_drivers(
+            float(origin[0]), float(origin[1]), params["k"], params.get("radius_km"), params.get("max_age")
+        )
+        return Response(NearestDriverSerializer(drivers, many=True).data)
+
+class OrderList(ConditionalGetMixin, SparseFieldsMixin, generics.ListAPIView):
     queryset = Order.objects.all()
     serializer_class = OrderSerializer
+    pagination_class = OrderCursorPagination
 
-class OrderDetail(generics.RetrieveAPIView):
+class OrderPlaceView(APIView):
+    """
+    Checkout: accepts one cart, or a JSON list of carts from aggregator
+    partners, and places them in a single transaction.
+    """
+    permission_classes = [IsAuthenticated]
+    max_batch_size = 500
+
+    def post(self, request):
+        if isinstance(request.data, list):
+            serializer = CartSerializer(data=request.data, many=True, max_length=self.max_batch_size)
+            serializer.is_valid(raise_exception=True)
+            orders = place_orders(serializer.validated_data)
+            return Response(PlacedOrderSerializer(orders, many=True).data, status=201)
+
+        serializer = CartSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        try:
+            [order] = place_orders([serializer.validated_data])
+        except ValidationError as exc:
+            raise ValidationError(exc.detail[0])
+        return Response(PlacedOrderSerializer(order).data, status=201)
+
+class OrderTransitionView(APIView):
+    """
+    Bulk status change: ``{"order_ids": [...], "status": 1|2}``. Orders that
+    are not in the status the target may be reached from come back in
+    ``rejected`` and are left untouched.
+    """
+    permission_classes = [IsAdminUser]
+
+    def post(self, request):
+        serializer = OrderTransitionSerializer(data=request.data)
+        serializer.is_valid(raise_exception=True)
+        moved, rejected, deliveries_updated = transition_orders(
+            serializer.validated_data["order_ids"], serializer.validated_data["status"]
+        )
+        return Response({"updated": moved, "rejected": rejected, "deliveries_updated": deliveries_updated})
+
+class OrderExportView(APIView):
+    """
+    Streams orders as CSV or NDJSON (``?file_format=``), filtered by
+    ``placed_after``/``placed_before``, ``restaurant`` and ``status``.
+    """
+    permission_classes = [IsAuthenticated]
+
+    def perform_content_negotiation(self, request, force=False):
+        # The body is a file download, so don't 406 on Accept: text/csv.
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request):
+        fmt = request.query_params.get("file_format", "csv")
+        if fmt not in EXPORT_FORMATS:
+            raise ValidationError({"file_format": [f"Choose one of: {', '.join(EXPORT_FORMATS)}."]})
+        filterset = OrderExportFilter(request.query_params, queryset=Order.objects.all(), request=request)
+        if not filterset.is_valid():
+            raise ValidationError(filterset.errors)
+        return export_orders_response(filterset.qs, fmt)
+
+class ExportJobListCreateView(generics.ListCreateAPIView):
+    """
+    Queues an export of orders, order items or payments for the background
+    worker (``manage.py run_export_worker``) and lists the caller's jobs.
+    """
+    serializer_class = ExportJobSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return ExportJob.objects.filter(requested_by=self.request.user)
+
+    def perform_create(self, serializer):
+        serializer.save(requested_by=self.request.user)
+
+    def create(self, request, *args, **kwargs):
+        response = super().create(request, *args, **kwargs)
+        response.status_code = 202
+        return response
+
+class ExportJobDetail(generics.RetrieveAPIView):
+    serializer_class = ExportJobSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return ExportJob.objects.filter(requested_by=self.request.user)
+
+class ExportJobDownloadView(APIView):
+    permission_classes = [IsAuthenticated]
+
+    def perform_content_negotiation(self, request, force=False):
+        return super().perform_content_negotiation(request, force=True)
+
+    def get(self, request, pk):
+        job = get_object_or_404(ExportJob, pk=pk, requested_by=request.user)
+        if job.status != ExportJob.COMPLETED:
+            return Response({"detail": "Export is not finished yet."}, status=409)
+        response = ExportStreamingResponse(read_export(job), content_type="application/gzip")
+        response["Content-Disposition"] = f'attachment; filename="{job.kind}_export_{job.pk}.{job.file_format}.gz"'
+        return response
+
+class OrderDetail(ConditionalGetMixin, QueryPlanMixin, generics.RetrieveAPIView):
     queryset = Order.objects.all()
     serializer_class = OrderSerializer
 
-class OrderItemList(generics.ListAPIView):
+class OrderItemList(ValuesListMixin, generics.ListAPIView):
     queryset = OrderItem.objects.all()
     serializer_class = OrderItemSerializer
 
-class OrderItemDetail(generics.RetrieveAPIView):
+class OrderItemDetail(QueryPlanMixin, generics.RetrieveAPIView):
     queryset = OrderItem.objects.all()
     serializer_class = OrderItemSerializer
 
-class DeliveryList(generics.ListAPIView):
+class DeliveryList(ConditionalGetMixin, SparseFieldsMixin, generics.ListAPIView):
     queryset = Delivery.objects.all()
     serializer_class = DeliverySerializer
 
-class DeliveryDetail(generics.RetrieveAPIView):
+class DeliveryDetail(ConditionalGetMixin, QueryPlanMixin, generics.RetrieveAPIView):
     queryset = Delivery.objects.all()
     serializer_class = DeliverySerializer
 
-class PaymentList(generics.ListAPIView):
+def _event(name, data):
+    return f"event: {name}\ndata: {json.dumps(data, cls=DjangoJSONEncoder)}\n\n"
+
+
+class DeliveryEventStream(View):
+    """
+    Server-sent events for one delivery: a ``delivery`` snapshot first, then
+    ``delivery`` events for status/driver/ETA changes and ``location`` events
+    for the assigned driver's position, pushed by the realtime broker as the
+    writes commit. Follows reassignments and ends once the delivery is
+    delivered. Needs an ASGI server to hold many streams open.
+    """
+    snapshot_fields = (
+        "id", "status", "driver_id", "eta_minutes", "assigned_at", "picked_at", "delivered_at",
+        "driver__current_location_latitude", "driver__current_location_longitude", "driver__location_updated_at",
+    )
+
+    async def get(self, request, pk):
+        # Subscribe before reading, so nothing committed in between is missed.
+        subscription = get_broker().subscribe(delivery_topic(pk))
+        snapshot = await Delivery.objects.filter(pk=pk).values(*self.snapshot_fields).afirst()
+        if snapshot is None:
+            subscription.close()
+            raise Http404("No delivery matches the given query.")
+        response = StreamingHttpResponse(self.stream(subscription, snapshot), content_type="text/event-stream")
+        response["Cache-Control"] = "no-cache"
+        response["X-Accel-Buffering"] = "no"
+        return response
+
+    async def stream(self, subscription, snapshot):
+        driver_id = snapshot["driver_id"]
+        try:
+            if driver_id is not None:
+                subscription.listen(driver_topic(driver_id))
+            yield _event("delivery", {
+                "delivery": snapshot["id"], "status": snapshot["status"], "driver": driver_id,
+                "eta_minutes": snapshot["eta_minutes"], "assigned_at": snapshot["assigned_at"],
+                "picked_at": snapshot["picked_at"], "delivered_at": snapshot["delivered_at"],
+            })
+            if driver_id is not None and snapshot["driver__location_updated_at"] is not None:
+                yield _event("location", {
+                    "driver": driver_id, "latitude": float(snapshot["driver__current_location_latitude"]),
+                    "longitude": float(snapshot["driver__current_location_longitude"]),
+                    "recorded_at": snapshot["driver__location_updated_at"],
+                })
+            status = snapshot["status"]
+            while status != 3:
+                try:
+                    message = await subscription.get(settings.REALTIME_HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                message = dict(message)
+                name = message.pop("type")
+                if name == "delivery":
+                    status = message.get("status", status)
+                    if message.get("driver", driver_id) != driver_id:
+                        if driver_id is not None:
+                            subscription.unlisten(driver_topic(driver_id))
+                        driver_id = message["driver"]
+                        if driver_id is not None:
+                            subscription.listen(driver_topic(driver_id))
+                elif message["driver"] != driver_id:
+                    # Queued before a reassignment.
+                    continue
+                yield _event(name, message)
+        finally:
+            subscription.close()
+
+class PaymentList(ValuesListMixin, generics.ListAPIView):
     queryset = Payment.objects.all()
     serializer_class = PaymentSerializer
 
-class PaymentDetail(generics.RetrieveAPIView):
+class PaymentDetail(QueryPlanMixin, generics.RetrieveAPIView):
     queryset = Payment.objects.all()
     serializer_class = PaymentSerializer
 
-class RestaurantCommentsListCreateView(generics.ListCreateAPIView):
+class RestaurantCommentsListCreateView(ConditionalGetMixin, generics.ListCreateAPIView):
     serializer_class = CommentSerializer
     permission_classes = [IsAuthenticatedOrReadOnly]
+    # The author comes from a SerializerMethodField.
+    validator_related_lookups = ["customer__updated_at"]
 
     def get_queryset(self):
         restaurant_id = self.kwargs["restaurant_id"]
-        return Comment.objects.filter(restaurant_id=restaurant_id)
+        return (
+            Comment.objects.filter(restaurant_id=restaurant_id)
+            .select_related("customer")
+        )
 
     def perform_create(self, serializer):
         restaurant_id = self.kwargs["restaurant_id"]
         serializer.save(restaurant_id=restaurant_id)
 
-class RestaurantRetrieveView(generics.RetrieveAPIView):
-    serializer_class = RestaurantSerializer
-
-    def get_queryset(self):
-        return Restaurant.objects.annotate(comments_count=Count('comments'))
-
 class CommentReactView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -123,15 +445,33 @@ class CommentReactView(APIView):
         if not customer_id:
             return Response({"detail": "Нужно указать customer_id"}, status=400)
 
-        comment = get_object_or_404(Comment, id=comment_id)
         customer = get_object_or_404(Customer, id=customer_id)
 
-        existing_reaction = Reaction.objects.filter(customer=customer, comment=comment).first()
+        with transaction.atomic():
+            # Locking the comment serializes toggles on it, so the existence
+            # check below cannot race with a concurrent insert or delete.
+            comment = get_object_or_404(Comment.objects.select_for_update(), id=comment_id)
+            existing_reaction = Reaction.objects.filter(customer=customer, comment=comment).first()
 
-        if existing_reaction:
-            existing_reaction.delete()
-            return Response({"status": "reaction removed"})
+            if existing_reaction:
+                existing_reaction.delete()
+                self._bump_counter(comment.id, existing_reaction.is_like, -1)
+                return Response({"status": "reaction removed"})
+
+            reaction = Reaction.objects.create(customer=customer, comment=comment, is_like=bool(is_like))
+            self._bump_counter(comment.id, reaction.is_like, 1)
 
-        Reaction.objects.create(customer=customer, comment=comment, is_like=bool(is_like))
         action = "liked" if is_like else "disliked"
-        return Response({"status": action})
\ No newline at end of file
+        return Response({"status": action})
+
+    @staticmethod
+    def _bump_counter(comment_id, is_like, delta):
+        counter = "likes_count" if is_like else "dislikes_count"
+        # Touch updated_at so conditional GETs of the comment list see the change.
+        Comment.objects.filter(id=comment_id).update(**{counter: F(counter) + delta, "updated_at": Now()})
+
+class CatalogCacheStatsView(APIView):
+    permission_classes = [IsAdminUser]
+
+    def get(self, request):
+        return Response(cache_stats())
@@ -38,6 +38,7 @@ INSTALLED_APPS = [
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'django.contrib.postgres',
     'rest_framework',
     'django_filters',
     'RastauranApp.apps.RastauranappConfig'
@@ -88,6 +89,55 @@ DATABASES = {
 }
 
 
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'restauran-api',
+    }
+}
+
+# Seconds a cached catalog response (restaurants, menus, dishes) may be served.
+CATALOG_CACHE_TIMEOUT = 300
+
+# Background exports: gzip chunks are written under EXPORT_ROOT/<job id>/ by
+# `manage.py run_export_worker`.
+EXPORT_ROOT = BASE_DIR / 'exports'
+EXPORT_CHUNK_ROWS = 50000
+EXPORT_JOB_STALE_SECONDS = 300
+
+# Driver pings are coalesced per process and flushed in one UPDATE at most
+# this often (seconds); 0 writes each batch through.
+DRIVER_LOCATION_FLUSH_INTERVAL = 2.0
+DRIVER_LOCATION_BREADCRUMBS = True
+
+# Nearest-driver search starts at this radius (km) and doubles up to the limit.
+DRIVER_SEARCH_START_KM = 2
+DRIVER_SEARCH_RADIUS_KM = 20
+
+# Batch dispatch (`manage.py dispatch_deliveries`): "greedy" or "hungarian"
+# (the latter needs scipy).
+DISPATCH_BATCH_SIZE = 500
+DISPATCH_MAX_KM = 10
+DISPATCH_MATCHING = 'greedy'
+
+# Delivery ETAs, recomputed for all in-flight deliveries on every location flush.
+ETA_SPEED_KMH = 25
+ETA_ROUTE_FACTOR = 1.3
+ETA_DEFAULT_PREP_MINUTES = 15
+
+# Daily analytics rollups (`manage.py refresh_analytics`). Each run rescans
+# orders updated this many seconds before the previous run, to pick up
+# transactions that committed late.
+ANALYTICS_REFRESH_OVERLAP_SECONDS = 300
+
+# Live delivery tracking (/deliveries/<id>/events/, served under ASGI). The
+# in-process broker only reaches streams on the same process, so assignments
+# made by `manage.py dispatch_deliveries` or writes on other nodes are not
+# pushed; use 'RastauranApp.realtime.PostgresBroker' (LISTEN/NOTIFY) there.
+REALTIME_BROKER = 'RastauranApp.realtime.InProcessBroker'
+# Seconds between keep-alive comments on an idle event stream.
+REALTIME_HEARTBEAT_SECONDS = 15
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -138,4 +188,11 @@ REST_FRAMEWORK = {
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticatedOrReadOnly',
     ],
+    'DEFAULT_PAGINATION_CLASS': 'RastauranApp.pagination.StableCursorPagination',
+    # orjson-backed when installed, byte-compatible with DRF's JSONRenderer;
+    # put 'rest_framework.renderers.JSONRenderer' back to switch it off.
+    'DEFAULT_RENDERER_CLASSES': [
+        'RastauranApp.renderers.FastJSONRenderer',
+        'rest_framework.renderers.BrowsableAPIRenderer',
+    ],
 }
\ No newline at end of file
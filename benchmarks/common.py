@@ -0,0 +1,142 @@
+"""
+Shared helpers for the scripts in this directory. Every benchmark runs inside a
+throwaway ``test_*`` database so it never touches real data.
+"""
+import os
+import random
+import statistics
+import sys
+import time
+from contextlib import contextmanager
+from decimal import Decimal
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def setup_django():
+    sys.path.insert(0, ROOT)
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "RestauranAPI.settings")
+    import django
+
+    django.setup()
+
+
+@contextmanager
+def scratch_database():
+    from django.db import connection
+
+    old_name = connection.settings_dict["NAME"]
+    connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    try:
+        yield connection
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+
+
+def timed(fn, repeat=20):
+    """Median wall time of ``fn`` in milliseconds."""
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return statistics.median(samples) * 1000
+
+
+def _bulk(model, rows, batch_size):
+    model.objects.bulk_create(rows, batch_size=batch_size)
+    return list(model.objects.order_by("id").values_list("id", flat=True))
+
+
+def seed(restaurants=200, customers=2000, orders=50000, comments=20000, drivers=500, batch_size=5000, seed_value=1):
+    """
+    Fill the database with a synthetic catalog and order history. Timestamps are
+    spread over the last year so time-ordered indexes have something to do.
+    """
+    from django.db import connection
+    from RastauranApp.models import (
+        Restaurant, Menu, Dish, Customer, Address, Driver, Order, OrderItem, Delivery, Payment, Comment
+    )
+
+    rng = random.Random(seed_value)
+    restaurant_ids = _bulk(Restaurant, [
+        Restaurant(
+            name=f"Restaurant {i}", description="lorem ipsum " * 40,
+            rating=Decimal(rng.randint(100, 500)) / 100, is_active=rng.random() > 0.2,
+        )
+        for i in range(restaurants)
+    ], batch_size)
+    menu_ids = _bulk(Menu, [Menu(restaurant_id=rid, name="Main") for rid in restaurant_ids], batch_size)
+    dish_rows = [
+        Dish(
+            menu_id=mid, restaurant_id=rid, name=f"Dish {rid}-{n}", description="tasty " * 20,
+            price=Decimal(rng.randint(300, 3000)) / 100, prep_time_minutes=rng.randint(5, 40),
+        )
+        for rid, mid in zip(restaurant_ids, menu_ids)
+        for n in range(10)
+    ]
+    dishes = list(zip(_bulk(Dish, dish_rows, batch_size), (d.restaurant_id for d in dish_rows), (d.price for d in dish_rows)))
+    customer_ids = _bulk(Customer, [
+        Customer(first_name=f"Customer {i}", email=f"customer{i}@example.com") for i in range(customers)
+    ], batch_size)
+    address_ids = _bulk(Address, [
+        Address(
+            customer_id=cid, street=f"{cid} Main st", city="Tashkent",
+            latitude=Decimal("41.2") + Decimal(rng.randint(0, 20000)) / 100000,
+            longitude=Decimal("69.2") + Decimal(rng.randint(0, 20000)) / 100000,
+        )
+        for cid in customer_ids
+    ], batch_size)
+    driver_ids = _bulk(Driver, [
+        Driver(
+            first_name=f"Driver {i}", is_active=rng.random() > 0.1,
+            current_location_latitude=Decimal("41.2") + Decimal(rng.randint(0, 20000)) / 100000,
+            current_location_longitude=Decimal("69.2") + Decimal(rng.randint(0, 20000)) / 100000,
+        )
+        for i in range(drivers)
+    ], batch_size)
+
+    for start in range(0, orders, batch_size):
+        picks = [rng.randrange(len(customer_ids)) for _ in range(min(batch_size, orders - start))]
+        order_rows, basket = [], []
+        for pick in picks:
+            dish_id, restaurant_id, price = dishes[rng.randrange(len(dishes))]
+            quantity = rng.randint(1, 3)
+            order_rows.append(Order(
+                customer_id=customer_ids[pick], restaurant_id=restaurant_id, delivery_address_id=address_ids[pick],
+                total_amount=price * quantity, status=rng.choice((0, 1, 2, 2, 2, 2)), notes="ring the bell",
+            ))
+            basket.append((dish_id, price, quantity))
+        created = Order.objects.bulk_create(order_rows)
+        OrderItem.objects.bulk_create([
+            OrderItem(order=order, dish_id=dish_id, name="Dish", unit_price=price, quantity=quantity, total_price=price * quantity)
+            for order, (dish_id, price, quantity) in zip(created, basket)
+        ])
+        Delivery.objects.bulk_create([
+            Delivery(order=order, status=3 if order.status == 2 else 0,
+                     driver_id=driver_ids[rng.randrange(len(driver_ids))] if order.status == 2 else None)
+            for order in created
+        ])
+        Payment.objects.bulk_create([
+            Payment(order=order, provider=rng.choice(("card", "cash", "paypal")), amount=order.total_amount,
+                    status=rng.choice((0, 1, 1, 1, 2)))
+            for order in created
+        ])
+
+    for start in range(0, comments, batch_size):
+        Comment.objects.bulk_create([
+            Comment(
+                customer_id=customer_ids[rng.randrange(len(customer_ids))],
+                restaurant_id=restaurant_ids[rng.randrange(len(restaurant_ids))],
+                text="good food", rating=rng.randint(1, 5),
+            )
+            for _ in range(min(batch_size, comments - start))
+        ])
+
+    with connection.cursor() as cursor:
+        # auto_now_add stamps every row with the same instant; spread them out.
+        for table, column in (("orders", "placed_at"), ("comments", "created_at"), ("deliveries", "created_at"),
+                              ("payments", "created_at"), ("order_items", "created_at")):
+            cursor.execute(f"UPDATE {table} SET {column} = now() - (random() * interval '365 days')")
+        cursor.execute("ANALYZE")
+    return {"restaurant_ids": restaurant_ids, "customer_ids": customer_ids, "driver_ids": driver_ids}
@@ -0,0 +1,110 @@
+"""
+Times the batch dispatch engine on synthetic fleets: the NumPy cost matrix and
+matching alone for several fleet sizes, then a full dispatch_waiting() round
+(locking, matching and the bulk UPDATE) against a scratch database.
+
+    python benchmarks/dispatch_benchmark.py --sizes 100x1000 500x5000 2000x20000
+"""
+import argparse
+import random
+import time
+from decimal import Decimal
+
+from common import scratch_database, setup_django, timed
+
+setup_django()
+
+import numpy as np  # noqa: E402
+from RastauranApp.models import Restaurant, Customer, Address, Driver, Order, Delivery  # noqa: E402
+from RastauranApp.services import dispatch  # noqa: E402
+
+CITY = (41.2, 69.1)
+CITY_SPAN = 0.25  # degrees, roughly 25 km across
+
+
+def random_points(rng, count):
+    return np.column_stack([
+        CITY[0] + rng.random(count) * CITY_SPAN,
+        CITY[1] + rng.random(count) * CITY_SPAN,
+    ])
+
+
+def match_only(deliveries, drivers, max_km, repeat):
+    rng = np.random.default_rng(1)
+    origins, positions = random_points(rng, deliveries), random_points(rng, drivers)
+
+    def costs():
+        matrix = dispatch.distance_matrix(origins, positions)
+        matrix[matrix > max_km] = np.inf
+        return matrix
+
+    matrix = costs()
+    results = {"matrix": (timed(costs, repeat), None)}
+    for name, matcher in dispatch.MATCHERS.items():
+        if name == "hungarian" and dispatch.linear_sum_assignment is None:
+            continue
+        rows, columns = matcher(matrix)
+        results[name] = (timed(lambda: matcher(matrix), repeat), (len(rows), matrix[rows, columns].mean() if len(rows) else 0))
+    return results
+
+
+def seed_fleet(deliveries, drivers, restaurants=200, seed_value=1):
+    rng = random.Random(seed_value)
+
+    def coordinate(origin):
+        return Decimal(str(round(origin + rng.random() * CITY_SPAN, 6)))
+
+    Restaurant.objects.bulk_create([Restaurant(name=f"Restaurant {i}") for i in range(restaurants)])
+    restaurant_ids = list(Restaurant.objects.values_list("id", flat=True))
+    Address.objects.bulk_create([
+        Address(restaurant_id=rid, street="Main st", latitude=coordinate(CITY[0]), longitude=coordinate(CITY[1]))
+        for rid in restaurant_ids
+    ])
+    customer = Customer.objects.create(first_name="Bench", email="bench@example.com")
+    orders = Order.objects.bulk_create([
+        Order(customer=customer, restaurant_id=rng.choice(restaurant_ids), total_amount=Decimal("10.00"))
+        for _ in range(deliveries)
+    ], batch_size=5000)
+    Delivery.objects.bulk_create([Delivery(order=order) for order in orders], batch_size=5000)
+    Driver.objects.bulk_create([
+        Driver(first_name=f"Driver {i}", current_location_latitude=coordinate(CITY[0]), current_location_longitude=coordinate(CITY[1]))
+        for i in range(drivers)
+    ], batch_size=5000)
+
+
+def end_to_end(deliveries, drivers, max_km, repeat):
+    seed_fleet(deliveries, drivers)
+    samples, assigned = [], 0
+    for _ in range(repeat):
+        Delivery.objects.update(status=0, driver=None, assigned_at=None)
+        start = time.perf_counter()
+        assigned = len(dispatch.dispatch_waiting(batch_size=deliveries, max_km=max_km))
+        samples.append((time.perf_counter() - start) * 1000)
+    return sorted(samples)[len(samples) // 2], assigned
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", nargs="+", default=["100x1000", "500x5000", "1000x20000"],
+                        help="DELIVERIESxDRIVERS pairs for the in-memory runs.")
+    parser.add_argument("--db-size", default="500x10000", help="DELIVERIESxDRIVERS for the database round.")
+    parser.add_argument("--max-km", type=float, default=10)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    print(f"{'fleet':>12} {'step':>10} {'ms':>10} {'matched':>8} {'mean km':>8}")
+    for size in args.sizes:
+        deliveries, drivers = map(int, size.split("x"))
+        for step, (ms, outcome) in match_only(deliveries, drivers, args.max_km, args.repeat).items():
+            matched, mean_km = outcome if outcome else ("", "")
+            mean_km = f"{mean_km:.2f}" if outcome else ""
+            print(f"{size:>12} {step:>10} {ms:10.2f} {matched:>8} {mean_km:>8}")
+
+    deliveries, drivers = map(int, args.db_size.split("x"))
+    with scratch_database():
+        ms, assigned = end_to_end(deliveries, drivers, args.max_km, args.repeat)
+    print(f"\ndispatch_waiting() on {args.db_size}: {ms:.1f} ms median, {assigned} assigned per round")
+
+
+if __name__ == "__main__":
+    main()
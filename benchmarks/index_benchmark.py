@@ -0,0 +1,107 @@
+"""
+Seeds a scratch database and reports query plans and latencies for the API's hot
+filter/order paths without and with the indexes added by 0003_hot_path_indexes.
+The database is migrated to the current schema; only those indexes are dropped
+for the "before" run and rebuilt for the "after" run.
+
+    python benchmarks/index_benchmark.py --orders 500000 --comments 200000
+"""
+import argparse
+import time
+
+from common import scratch_database, seed, setup_django, timed
+
+setup_django()
+
+from django.apps import apps  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.db.migrations.loader import MigrationLoader  # noqa: E402
+from django.db.migrations.operations import AddIndex  # noqa: E402
+from RastauranApp.models import Restaurant, Order, Delivery, Payment, Comment  # noqa: E402
+
+MIGRATION = ("RastauranApp", "0003_hot_path_indexes")
+
+
+def indexes_under_test():
+    """(model, index) for every index the migration adds, against the current models."""
+    migration = MigrationLoader(connection, ignore_no_migrations=True).get_migration(*MIGRATION)
+    return [
+        (apps.get_model(MIGRATION[0], operation.model_name), operation.index)
+        for operation in migration.operations
+        if isinstance(operation, AddIndex)
+    ]
+
+
+def drop_indexes(indexes):
+    with connection.schema_editor(atomic=False) as editor:
+        for model, index in indexes:
+            editor.remove_index(model, index)
+
+
+def build_indexes(indexes):
+    with connection.schema_editor(atomic=False) as editor:
+        for model, index in indexes:
+            editor.add_index(model, index, concurrently=True)
+
+
+def hot_queries(restaurant_id):
+    return {
+        "restaurants: active by name": Restaurant.objects.filter(is_active=True).order_by("name", "id")[:51],
+        "restaurants: top rated": Restaurant.objects.order_by("-rating", "id")[:51],
+        "comments: restaurant page": Comment.objects.filter(restaurant_id=restaurant_id).order_by("-created_at", "id")[:51],
+        "orders: cursor page": Order.objects.order_by("-placed_at", "id")[:51],
+        "orders: restaurant + status": Order.objects.filter(restaurant_id=restaurant_id, status=1).order_by("-placed_at")[:51],
+        "orders: pending queue": Order.objects.filter(status=0).order_by("placed_at")[:100],
+        "deliveries: waiting": Delivery.objects.filter(status=0).order_by("created_at")[:100],
+        "payments: failed by provider": Payment.objects.filter(status=2, provider="paypal")[:100],
+    }
+
+
+def measure(restaurant_id, repeat):
+    results = {}
+    for label, queryset in hot_queries(restaurant_id).items():
+        plan = queryset.explain().splitlines()
+        latency = timed(lambda: list(queryset.all()), repeat)
+        results[label] = (latency, plan)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--restaurants", type=int, default=500)
+    parser.add_argument("--customers", type=int, default=20000)
+    parser.add_argument("--orders", type=int, default=200000)
+    parser.add_argument("--comments", type=int, default=100000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--plans", action="store_true", help="Print full query plans instead of scan/sort nodes.")
+    args = parser.parse_args()
+
+    with scratch_database():
+        indexes = indexes_under_test()
+        drop_indexes(indexes)
+        ids = seed(restaurants=args.restaurants, customers=args.customers, orders=args.orders, comments=args.comments)
+        busiest = ids["restaurant_ids"][0]
+
+        before = measure(busiest, args.repeat)
+        start = time.perf_counter()
+        build_indexes(indexes)
+        build_seconds = time.perf_counter() - start
+        with connection.cursor() as cursor:
+            cursor.execute("ANALYZE")
+        after = measure(busiest, args.repeat)
+
+    print(f"index build: {build_seconds:.2f}s\n")
+    print(f"{'query':32} {'before ms':>10} {'after ms':>10} {'speedup':>8}")
+    for label in before:
+        b, a = before[label][0], after[label][0]
+        print(f"{label:32} {b:10.2f} {a:10.2f} {b / a if a else float('inf'):7.1f}x")
+    print()
+    for label in before:
+        print(f"== {label}")
+        for name, (_, plan) in (("before", before[label]), ("after", after[label])):
+            lines = plan if args.plans else [line for line in plan if "Scan" in line or "Sort" in line]
+            print(f"  {name}: " + "\n          ".join(line.strip() for line in lines))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Compares DRF's JSONRenderer with RastauranApp.renderers.FastJSONRenderer on a
+10k-row OrderList payload (serializer output, mostly strings) and on the same
+orders as raw values() rows, where Decimals and datetimes reach the encoder.
+Both renderers must produce identical bytes.
+
+    python benchmarks/renderer_benchmark.py --orders 10000
+"""
+import argparse
+
+from common import scratch_database, seed, setup_django, timed
+
+setup_django()
+
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+from RastauranApp import renderers  # noqa: E402
+from RastauranApp.models import Order  # noqa: E402
+from RastauranApp.serializers import OrderSerializer  # noqa: E402
+
+
+def payloads(orders):
+    queryset = Order.objects.select_related("restaurant", "delivery_address").order_by("-placed_at", "id")[:orders]
+    return {
+        "OrderList": OrderSerializer(queryset, many=True).data,
+        "values()": list(queryset.values()),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--orders", type=int, default=10000)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+    if renderers.orjson is None:
+        print("orjson is not installed: FastJSONRenderer falls back to the stdlib and matches JSONRenderer.")
+
+    with scratch_database():
+        seed(restaurants=100, customers=1000, orders=args.orders, comments=0, drivers=10)
+        data = payloads(args.orders)
+
+    stock, fast = JSONRenderer(), renderers.FastJSONRenderer()
+    print(f"{'payload':>10} {'renderer':>16} {'ms':>9} {'MB/s':>8} {'speed-up':>9}")
+    for name, payload in data.items():
+        body = stock.render(payload)
+        assert fast.render(payload) == body, f"{name}: renderers disagree"
+        baseline = timed(lambda: stock.render(payload), args.repeat)
+        for label, renderer in (("JSONRenderer", stock), ("FastJSONRenderer", fast)):
+            ms = baseline if renderer is stock else timed(lambda: renderer.render(payload), args.repeat)
+            print(f"{name:>10} {label:>16} {ms:9.2f} {len(body) / ms / 1000:8.1f} {baseline / ms:8.1f}x")
+    print(f"\n{args.orders} rows, {len(body) / 1e6:.1f} MB per values() payload; outputs identical.")
+
+
+if __name__ == "__main__":
+    main()
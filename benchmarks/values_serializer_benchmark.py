@@ -0,0 +1,52 @@
+"""
+Rows per second for the DishList, OrderItemList and PaymentList read paths:
+the ModelSerializer over model instances versus the ValuesPlan compiled from
+the same serializer over values_list() rows. Fetch and serialization are timed
+together, since skipping model instantiation is part of the saving; outputs
+are checked to be identical.
+
+    python benchmarks/values_serializer_benchmark.py --rows 5000
+"""
+import argparse
+
+from common import scratch_database, seed, setup_django, timed
+
+setup_django()
+
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+from RastauranApp.mixins import plan_queryset, values_plan_for  # noqa: E402
+from RastauranApp.models import Dish, OrderItem, Payment  # noqa: E402
+from RastauranApp.serializers import DishSerializer, OrderItemSerializer, PaymentSerializer  # noqa: E402
+
+CASES = (("DishList", Dish, DishSerializer), ("OrderItemList", OrderItem, OrderItemSerializer), ("PaymentList", Payment, PaymentSerializer))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, default=5000, help="Rows per list, roughly a large export page.")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    with scratch_database():
+        seed(restaurants=max(args.rows // 10, 1), customers=1000, orders=args.rows, comments=0, drivers=10)
+        print(f"{'view':>14} {'path':>16} {'ms':>9} {'rows/s':>10} {'speed-up':>9}")
+        for name, model, serializer_class in CASES:
+            queryset = plan_queryset(model.objects.order_by("-created_at", "id"), serializer_class)[:args.rows]
+            plan = values_plan_for(serializer_class)
+
+            def serializer_path():
+                return serializer_class(queryset.all(), many=True).data
+
+            def values_path():
+                return plan.render(plan.rows(queryset.all()))
+
+            assert JSONRenderer().render(values_path()) == JSONRenderer().render(serializer_path()), f"{name}: outputs differ"
+            rows = len(values_path())
+            baseline = timed(serializer_path, args.repeat)
+            fast = timed(values_path, args.repeat)
+            for label, ms in (("ModelSerializer", baseline), ("ValuesPlan", fast)):
+                print(f"{name:>14} {label:>16} {ms:9.1f} {rows / ms * 1000:10.0f} {baseline / ms:8.1f}x")
+
+
+if __name__ == "__main__":
+    main()